@@ -0,0 +1,195 @@
+"""
+Analytics Module for Student Management System
+Grade distribution, percentiles and rankings computed over the marks column
+"""
+
+import math
+import threading
+from array import array
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional, Sequence
+
+from database import Database
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; fall back to array('d')
+    np = None
+
+DEFAULT_PERCENTILES = (10, 25, 50, 75, 90, 95, 99)
+
+
+class GradeAnalytics:
+    """
+    Class statistics computed in one pass over a compact marks array
+
+    Marks and roll numbers are streamed from the marks index (already
+    sorted by marks) into NumPy arrays when NumPy is installed, or into
+    array('d') / array('q') otherwise. Results are cached and reused until
+    the students table changes, detected through the version counter in
+    student_stats.
+    """
+
+    def __init__(self, db: Database, top_k: int = 5,
+                 percentiles: Sequence[float] = DEFAULT_PERCENTILES,
+                 use_numpy: Optional[bool] = None):
+        self.db = db
+        self.top_k = top_k
+        self.percentiles = tuple(percentiles)
+        self.use_numpy = np is not None if use_numpy is None else (use_numpy and np is not None)
+
+        self._lock = threading.Lock()
+        self._cached: Optional[Dict[str, Any]] = None
+        self._cached_version: Optional[int] = None
+
+    def invalidate(self):
+        """Forget the cached results"""
+        with self._lock:
+            self._cached = None
+            self._cached_version = None
+
+    def compute(self, force: bool = False) -> Dict[str, Any]:
+        """
+        Return count, mean, median, std_dev, min, max, percentiles,
+        grade_counts, top and bottom (lists of student tuples)
+        Cached results are returned while the table and grade scale are unchanged
+        """
+        # Read the version first: a write racing with the load only makes
+        # the cache look older than it is, never newer
+        version = (self.db.get_student_stats()["version"], id(self.db.grade_scale))
+        with self._lock:
+            if not force and self._cached is not None and self._cached_version == version:
+                return self._cached
+
+        rolls, marks = self._load()
+        if self.use_numpy:
+            result = self._compute_numpy(rolls, marks)
+        else:
+            result = self._compute_python(rolls, marks)
+
+        result["top"] = self.db.get_students_by_roll_nos(result.pop("top_roll_nos"))
+        result["bottom"] = self.db.get_students_by_roll_nos(result.pop("bottom_roll_nos"))
+        result["backend"] = "numpy" if self.use_numpy else "array"
+
+        with self._lock:
+            self._cached = result
+            self._cached_version = version
+        return result
+
+    # ==================== LOADING ====================
+
+    def _load(self):
+        """Stream (roll_no, marks) sorted by marks into two compact arrays"""
+        rolls = array('q')
+        marks = array('d')
+        for batch in self.db.iter_marks():
+            for roll_no, mark in batch:
+                rolls.append(roll_no)
+                marks.append(mark)
+
+        if self.use_numpy:
+            # Zero-copy views over the array buffers
+            return np.frombuffer(rolls, dtype=np.int64), np.frombuffer(marks, dtype=np.float64)
+        return rolls, marks
+
+    # ==================== COMPUTATION ====================
+
+    def _compute_numpy(self, rolls, marks) -> Dict[str, Any]:
+        count = len(marks)
+        if count == 0:
+            return self._empty()
+
+        # Grade band edges ascending: counts are differences of insertion points
+        scale = self.db.grade_scale
+        edges = np.array(scale.thresholds, dtype=np.float64)
+        positions = np.concatenate(([0], np.searchsorted(marks, edges, side="left"), [count]))
+        band_counts = np.diff(positions)
+        grades = scale.grades
+
+        percentile_values = np.percentile(marks, self.percentiles)
+
+        return {
+            "count": count,
+            "mean": float(marks.mean()),
+            "median": float(np.median(marks)),
+            "std_dev": float(marks.std()),
+            "min": float(marks[0]),
+            "max": float(marks[-1]),
+            "percentiles": {p: float(v) for p, v in zip(self.percentiles, percentile_values)},
+            "grade_counts": self._ordered_counts(grades, [int(c) for c in band_counts]),
+            "top_roll_nos": self._top_roll_nos(rolls, marks, np.searchsorted),
+            "bottom_roll_nos": [int(r) for r in rolls[:self.top_k]],
+        }
+
+    def _compute_python(self, rolls, marks) -> Dict[str, Any]:
+        count = len(marks)
+        if count == 0:
+            return self._empty()
+
+        scale = self.db.grade_scale
+        grades = scale.grades
+        band_counts = []
+        previous = 0
+        for threshold in scale.thresholds:
+            position = bisect_left(marks, threshold)
+            band_counts.append(position - previous)
+            previous = position
+        band_counts.append(count - previous)
+
+        mean = math.fsum(marks) / count
+        variance = math.fsum((m - mean) ** 2 for m in marks) / count
+
+        return {
+            "count": count,
+            "mean": mean,
+            "median": self._percentile(marks, 50),
+            "std_dev": math.sqrt(variance),
+            "min": marks[0],
+            "max": marks[-1],
+            "percentiles": {p: self._percentile(marks, p) for p in self.percentiles},
+            "grade_counts": self._ordered_counts(grades, band_counts),
+            "top_roll_nos": self._top_roll_nos(rolls, marks, bisect_left),
+            "bottom_roll_nos": list(rolls[:self.top_k]),
+        }
+
+    def _top_roll_nos(self, rolls, marks, find_first) -> List[int]:
+        """
+        Highest marks first, lowest roll number first on ties
+        Walks the sorted arrays backwards one group of equal marks at a time;
+        find_first(values, x) is bisect_left or np.searchsorted
+        """
+        result: List[int] = []
+        end = len(marks)
+        while end > 0 and len(result) < self.top_k:
+            start = int(find_first(marks, marks[end - 1]))
+            result.extend(int(r) for r in rolls[start:end])
+            end = start
+        return result[:self.top_k]
+
+    @staticmethod
+    def _percentile(sorted_marks, p: float) -> float:
+        """Linear interpolation between closest ranks (NumPy's default method)"""
+        rank = (len(sorted_marks) - 1) * p / 100
+        low = math.floor(rank)
+        high = min(low + 1, len(sorted_marks) - 1)
+        return sorted_marks[low] + (sorted_marks[high] - sorted_marks[low]) * (rank - low)
+
+    @staticmethod
+    def _ordered_counts(grades: List[str], counts: List[int]) -> Dict[str, int]:
+        """Grade counts keyed best grade first"""
+        return {grade: count for grade, count in reversed(list(zip(grades, counts)))}
+
+    def _empty(self) -> Dict[str, Any]:
+        grades = reversed(self.db.grade_scale.grades)
+        return {
+            "count": 0,
+            "mean": None,
+            "median": None,
+            "std_dev": None,
+            "min": None,
+            "max": None,
+            "percentiles": {p: None for p in self.percentiles},
+            "grade_counts": {grade: 0 for grade in grades},
+            "top_roll_nos": [],
+            "bottom_roll_nos": [],
+        }
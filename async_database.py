@@ -0,0 +1,273 @@
+"""
+Async Database Module for Student Management System
+Awaitable facade over database.Database for asyncio services
+"""
+
+import asyncio
+import contextvars
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from audit import AuditEntry
+from auth import AuthenticationError, Session
+from database import Database, GradeScale
+
+
+class AsyncDatabase:
+    """
+    asyncio version of Database
+
+    The Database's student, query, statistics, login, user and audit
+    operations are exposed as coroutines. Connection-level helpers
+    (transaction, diagnostics, pool and cache stats) are not; use them on
+    .db, from a worker thread if they touch the database. Reads run on a
+    bounded pool of reader threads and writes on a single writer thread, so
+    reads proceed concurrently while writes are serialized. Each thread keeps its
+    own SQLite connection through the Database connection pool, which is
+    sized to fit all worker threads. max_pending caps how many calls may be
+    queued at once; further callers wait instead of growing the queue.
+
+    use_session binds a login to the calling task (and tasks it creates
+    afterwards), not to the instance: each call carries its task's session
+    to the worker thread, so concurrent callers keep their own identity
+    for permission checks and the audit log.
+    """
+
+    def __init__(self, db_name: str = "students.db", max_readers: int = 4,
+                 max_pending: int = 64, database: Optional[Database] = None):
+        if max_readers < 1:
+            raise ValueError("max_readers must be at least 1")
+        self.db = database or Database(db_name, pool_size=max_readers + 1)
+        self.max_pending = max_pending
+
+        self._readers = ThreadPoolExecutor(max_workers=max_readers,
+                                           thread_name_prefix="async-db-read")
+        self._writer = ThreadPoolExecutor(max_workers=1,
+                                          thread_name_prefix="async-db-write")
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._closed = False
+        # Session of the current asyncio task (see use_session)
+        self._session: "contextvars.ContextVar[Optional[Session]]" = contextvars.ContextVar(
+            f"async_db_session_{id(self)}", default=None)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    # ==================== EXECUTION ====================
+
+    async def _run(self, executor: ThreadPoolExecutor, func: Callable, *args, **kwargs) -> Any:
+        if self._closed:
+            raise RuntimeError("AsyncDatabase is closed")
+        if self._slots is None:
+            # Created lazily so it binds to the running event loop
+            self._slots = asyncio.Semaphore(self.max_pending)
+
+        session = self._session.get()
+        async with self._slots:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                executor, functools.partial(self._call_as, session, func, *args, **kwargs))
+
+    def _call_as(self, session: Optional[Session], func: Callable, *args, **kwargs) -> Any:
+        # Worker threads are shared by all tasks; bind the caller's session per call
+        with self.db.bound_session(session):
+            return func(*args, **kwargs)
+
+    async def _read(self, func: Callable, *args, **kwargs) -> Any:
+        return await self._run(self._readers, func, *args, **kwargs)
+
+    async def _write(self, func: Callable, *args, **kwargs) -> Any:
+        return await self._run(self._writer, func, *args, **kwargs)
+
+    async def close(self):
+        """Wait for running calls to finish, then close the connection pool"""
+        if self._closed:
+            return
+        self._closed = True
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._shutdown)
+
+    def _shutdown(self):
+        self._writer.shutdown(wait=True)
+        self._readers.shutdown(wait=True)
+        self.db.close()
+
+    # ==================== AUTHENTICATION ====================
+
+    async def verify_login(self, username: str, password: str) -> bool:
+        """Verify admin login credentials"""
+        try:
+            await self._check_credentials(username, password)
+        except AuthenticationError:
+            return False
+        return True
+
+    async def login(self, username: str, password: str) -> Session:
+        """Verify credentials and start a session (see Database.login)"""
+        role = await self._check_credentials(username, password)
+        return self.db.sessions.create(username, role)
+
+    def get_session(self, token: Optional[str]) -> Optional[Session]:
+        """The live session for token, or None (in memory, no I/O)"""
+        return self.db.get_session(token)
+
+    def use_session(self, session: Optional[Session]):
+        """Check this task's later calls against session's role (see Database.use_session)"""
+        self._session.set(session)
+
+    def logout(self, token: Optional[str]):
+        """End the session for token (in memory, no I/O)"""
+        self.db.logout(token)
+        session = self._session.get()
+        if session is not None and session.token == token:
+            self._session.set(None)
+
+    async def _check_credentials(self, username: str, password: str) -> str:
+        # The hash check runs on a reader; upgrading a stored hash is a
+        # write, so it goes to the writer thread like every other write
+        role, upgrade = await self._read(self.db.verify_credentials, username, password)
+        if upgrade is not None:
+            await self._write(self.db.store_password_upgrade, upgrade)
+        return role
+
+    # ==================== USER MANAGEMENT ====================
+
+    async def list_users(self) -> List[Tuple[str, str, bool]]:
+        """All users as (username, role, disabled)"""
+        return await self._read(self.db.list_users)
+
+    async def create_user(self, username: str, password: str, role: str = "viewer") -> Tuple[bool, str]:
+        """Create a user; returns (success, message)"""
+        return await self._write(self.db.create_user, username, password, role)
+
+    async def set_user_role(self, username: str, role: str) -> Tuple[bool, str]:
+        """Change a user's role; returns (success, message)"""
+        return await self._write(self.db.set_user_role, username, role)
+
+    async def set_user_disabled(self, username: str, disabled: bool = True) -> Tuple[bool, str]:
+        """Disable (or re-enable) a user; returns (success, message)"""
+        return await self._write(self.db.set_user_disabled, username, disabled)
+
+    async def change_password(self, username: str, new_password: str) -> Tuple[bool, str]:
+        """Set a user's password; returns (success, message)"""
+        return await self._write(self.db.change_password, username, new_password)
+
+    # ==================== STUDENT CRUD OPERATIONS ====================
+
+    def calculate_grade(self, marks: float) -> str:
+        """Calculate grade based on marks (pure computation, no I/O)"""
+        return self.db.calculate_grade(marks)
+
+    async def add_student(self, roll_no: int, name: str, marks: float) -> Tuple[bool, str]:
+        """Add a new student; returns (success, message)"""
+        return await self._write(self.db.add_student, roll_no, name, marks)
+
+    async def update_student(self, roll_no: int, name: str, marks: float) -> Tuple[bool, str]:
+        """Update an existing student; returns (success, message)"""
+        return await self._write(self.db.update_student, roll_no, name, marks)
+
+    async def delete_student(self, roll_no: int) -> Tuple[bool, str]:
+        """Delete a student by roll number; returns (success, message)"""
+        return await self._write(self.db.delete_student, roll_no)
+
+    async def add_students_bulk(self, students, **kwargs):
+        """Insert many students in one transaction (see Database.add_students_bulk)"""
+        return await self._write(self.db.add_students_bulk, students, **kwargs)
+
+    async def search_student(self, roll_no: int) -> Optional[Tuple]:
+        """Find a student by roll number"""
+        return await self._read(self.db.search_student, roll_no)
+
+    async def search_by_name(self, query: str, limit: int = 20, fuzzy: bool = True) -> List[Tuple]:
+        """Find students by (partial) name, best matches first"""
+        return await self._read(self.db.search_by_name, query, limit, fuzzy)
+
+    async def student_exists(self, roll_no: int) -> bool:
+        """Check if a student with the roll number exists"""
+        return await self._read(self.db.student_exists, roll_no)
+
+    async def get_all_students(self) -> List[Tuple]:
+        """Get all students ordered by roll number"""
+        return await self._read(self.db.get_all_students)
+
+    async def get_students_page(self, after_roll_no: Optional[int] = None,
+                                limit: int = 100) -> List[Tuple]:
+        """Get a keyset page of students (see Database.get_students_page)"""
+        return await self._read(self.db.get_students_page, after_roll_no, limit)
+
+    async def get_students_window(self, offset: int, limit: int) -> List[Tuple]:
+        """Get limit students from position offset (see Database.get_students_window)"""
+        return await self._read(self.db.get_students_window, offset, limit)
+
+    async def iter_student_pages(self, page_size: int = 500):
+        """Async generator over pages of students ordered by roll number"""
+        after_roll_no = None
+        while True:
+            page = await self.get_students_page(after_roll_no, page_size)
+            if not page:
+                return
+            yield page
+            if len(page) < page_size:
+                return
+            after_roll_no = page[-1][0]
+
+    async def query_students(self, grades: Optional[Iterable[str]] = None,
+                             min_marks: Optional[float] = None, max_marks: Optional[float] = None,
+                             name_prefix: Optional[str] = None, sort_by: str = "roll_no",
+                             descending: bool = False, limit: Optional[int] = None,
+                             offset: int = 0) -> List[Tuple]:
+        """Filtered, sorted students (see Database.query_students)"""
+        return await self._read(self.db.query_students, grades, min_marks, max_marks,
+                                name_prefix, sort_by, descending, limit, offset)
+
+    async def count_students(self, grades: Optional[Iterable[str]] = None,
+                             min_marks: Optional[float] = None, max_marks: Optional[float] = None,
+                             name_prefix: Optional[str] = None) -> int:
+        """Number of students matching the filters (see Database.count_students)"""
+        return await self._read(self.db.count_students, grades, min_marks, max_marks, name_prefix)
+
+    async def get_student_count(self) -> int:
+        """Return the number of students"""
+        return await self._read(self.db.get_student_count)
+
+    async def get_class_average(self) -> Optional[float]:
+        """Return class average marks, or None if there are no students"""
+        return await self._read(self.db.get_class_average)
+
+    async def get_topper(self) -> Optional[Tuple]:
+        """Return the student with the highest marks, or None"""
+        return await self._read(self.db.get_topper)
+
+    async def get_student_stats(self) -> Dict[str, Any]:
+        """Return the running aggregates (see Database.get_student_stats)"""
+        return await self._read(self.db.get_student_stats)
+
+    async def rebuild_stats(self):
+        """Recompute the running aggregates from the students table"""
+        return await self._write(self.db.rebuild_stats)
+
+    async def set_grade_scale(self, grade_scale: GradeScale, regrade: bool = True) -> Tuple[bool, str]:
+        """Change the grading policy, by default regrading every student"""
+        return await self._write(self.db.set_grade_scale, grade_scale, regrade)
+
+    async def regrade_all(self) -> Tuple[bool, str]:
+        """Recompute every stored grade with the current grade scale"""
+        return await self._write(self.db.regrade_all)
+
+    # ==================== AUDIT LOG ====================
+
+    async def get_audit_log(self, **filters) -> List[AuditEntry]:
+        """Audit entries matching the filters, newest first (see Database.get_audit_log)"""
+        return await self._read(self.db.get_audit_log, **filters)
+
+    async def get_student_history(self, roll_no: int, limit: int = 100) -> List[AuditEntry]:
+        """Changes to one student, newest first"""
+        return await self._read(self.db.get_student_history, roll_no, limit)
+
+    def get_audit_stats(self) -> Dict[str, int]:
+        """Audit writer counters (in memory, no I/O)"""
+        return self.db.get_audit_stats()
@@ -0,0 +1,284 @@
+"""
+Audit Module for Student Management System
+Append-only log of student changes, written in batches by a background thread
+
+Every add, update, delete and regrade is recorded with the user who made
+it and the student's values before and after. Single changes are queued
+in memory and a writer thread inserts them in batched transactions, so a
+mutation does not wait for a second commit. The queue is bounded: when the
+writer falls behind, callers block until there is room (backpressure)
+instead of memory growing without limit. Bulk operations already hold
+the write lock for one long transaction and add their entries to it
+directly.
+
+Entries still queued when the process is killed are lost; Database.close()
+and normal interpreter exit flush them.
+"""
+
+import atexit
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+from typing import Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+AuditEntry = namedtuple("AuditEntry", [
+    "changed_at", "username", "action", "roll_no",
+    "old_name", "old_marks", "old_grade",
+    "new_name", "new_marks", "new_grade",
+])
+
+AUDIT_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS audit_log (
+        id INTEGER PRIMARY KEY,
+        changed_at REAL NOT NULL,
+        username TEXT,
+        action TEXT NOT NULL,
+        roll_no INTEGER NOT NULL,
+        old_name TEXT,
+        old_marks REAL,
+        old_grade TEXT,
+        new_name TEXT,
+        new_marks REAL,
+        new_grade TEXT
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_audit_roll_no ON audit_log (roll_no, changed_at)",
+    # Entries can be added, never changed or removed
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_audit_log_no_update BEFORE UPDATE ON audit_log
+    BEGIN
+        SELECT RAISE(ABORT, 'audit_log is append-only');
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_audit_log_no_delete BEFORE DELETE ON audit_log
+    BEGIN
+        SELECT RAISE(ABORT, 'audit_log is append-only');
+    END
+    """,
+]
+
+AUDIT_COLUMNS = ", ".join(AuditEntry._fields)
+
+INSERT_AUDIT_SQL = (
+    f"INSERT INTO audit_log ({AUDIT_COLUMNS}) "
+    f"VALUES ({', '.join('?' * len(AuditEntry._fields))})"
+)
+
+ACTIONS = ("insert", "update", "delete", "regrade")
+
+
+def make_entry(action: str, roll_no: int, username: Optional[str],
+               before: Optional[tuple] = None, after: Optional[tuple] = None,
+               changed_at: Optional[float] = None) -> AuditEntry:
+    """Entry from (name, marks, grade) tuples; before is None for inserts, after for deletes"""
+    old = tuple(before) if before is not None else (None, None, None)
+    new = tuple(after) if after is not None else (None, None, None)
+    return AuditEntry(changed_at if changed_at is not None else time.time(),
+                      username, action, roll_no, *old, *new)
+
+
+def write_entries(cursor, entries: Iterable[AuditEntry]):
+    """Insert entries using the caller's connection and transaction"""
+    cursor.executemany(INSERT_AUDIT_SQL, entries)
+
+
+class AuditLog:
+    """
+    Bounded queue of audit entries drained by a background writer
+    connect opens the writer's own sqlite3 connection. The thread starts
+    with the first entry. A batch is written when batch_size entries are
+    waiting or linger seconds after its first entry, whichever comes first.
+    """
+
+    def __init__(self, connect: Callable[[], sqlite3.Connection], max_queue: int = 10000,
+                 batch_size: int = 500, linger: float = 0.05, retries: int = 5):
+        self.connect = connect
+        self.batch_size = batch_size
+        self.linger = linger
+        self.retries = retries
+        self._queue: "queue.Queue[AuditEntry]" = queue.Queue(maxsize=max_queue)
+        # Entries queued but not yet committed (or dropped)
+        self._pending = 0
+        # Guards the counters and _closed; held while queueing, so close()
+        # cannot slip its sentinel in ahead of an entry being queued
+        self._done = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        # The writer's connection, opened (and reopened) by the writer thread
+        self._conn: Optional[sqlite3.Connection] = None
+        self._stats = {"queued": 0, "written": 0, "batches": 0, "blocked": 0,
+                       "failed_batches": 0, "connect_failures": 0, "dropped": 0,
+                       "direct": 0}
+
+    def record(self, entries: Iterable[AuditEntry]):
+        """
+        Queue entries for the writer
+        Blocks while the queue is full, so callers slow down to the
+        writer's pace rather than piling up entries. Once the log is closed,
+        or if the writer thread has died, entries are written directly.
+        """
+        entries = list(entries)
+        queued = 0
+        with self._done:
+            if not self._closed and self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+                self._thread.start()
+                atexit.register(self.close)
+            while queued < len(entries):
+                if self._closed or not self._thread.is_alive():
+                    break
+                try:
+                    self._queue.put_nowait(entries[queued])
+                except queue.Full:
+                    self._stats["blocked"] += 1
+                    # The writer notifies after every batch; waiting releases
+                    # the lock so it (and close) can get on
+                    self._done.wait(0.1)
+                    continue
+                queued += 1
+                self._pending += 1
+                self._stats["queued"] += 1
+        if queued < len(entries):
+            self._write_direct(entries[queued:])
+
+    def _write_direct(self, entries: List[AuditEntry]):
+        """Write entries on a connection of the caller's (no writer to hand them to)"""
+        conn = self.connect()
+        try:
+            with conn:
+                write_entries(conn, entries)
+        finally:
+            conn.close()
+        with self._done:
+            self._stats["direct"] += len(entries)
+
+    def _drain(self) -> List[AuditEntry]:
+        """Take every entry still in the queue, skipping close() sentinels"""
+        entries = []
+        while True:
+            try:
+                entry = self._queue.get_nowait()
+            except queue.Empty:
+                return entries
+            if entry is not None:
+                entries.append(entry)
+
+    def _run(self):
+        try:
+            while True:
+                entry = self._queue.get()
+                if entry is None:
+                    break
+                batch = [entry]
+                deadline = time.monotonic() + self.linger
+                stop = False
+                while len(batch) < self.batch_size:
+                    try:
+                        entry = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                    except queue.Empty:
+                        break
+                    if entry is None:
+                        stop = True
+                        break
+                    batch.append(entry)
+                self._write(batch)
+                if stop:
+                    break
+
+            # Entries queued after the sentinel still get written
+            leftovers = self._drain()
+            if leftovers:
+                self._write(leftovers)
+        finally:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            try:
+                self._conn = self.connect()
+            except sqlite3.Error:
+                with self._done:
+                    self._stats["connect_failures"] += 1
+                raise
+        return self._conn
+
+    def _write(self, batch: List[AuditEntry]):
+        """Commit batch, retrying with backoff; dropped (and counted) after the last retry"""
+        delay = 0.05
+        for attempt in range(self.retries + 1):
+            try:
+                conn = self._connection()
+                with conn:
+                    write_entries(conn, batch)
+                with self._done:
+                    self._stats["written"] += len(batch)
+                    self._stats["batches"] += 1
+                break
+            except sqlite3.Error as e:
+                with self._done:
+                    self._stats["failed_batches"] += 1
+                if attempt == self.retries:
+                    logger.error("Dropping %d audit entries after %d attempts: %s",
+                                 len(batch), attempt + 1, e)
+                    with self._done:
+                        self._stats["dropped"] += len(batch)
+                    break
+                time.sleep(delay)
+                delay = min(delay * 2, 2.0)
+            except Exception:
+                # Not a database error, so retrying would not help; keep the
+                # writer alive for the entries behind this batch
+                logger.exception("Dropping %d audit entries", len(batch))
+                with self._done:
+                    self._stats["failed_batches"] += 1
+                    self._stats["dropped"] += len(batch)
+                break
+        with self._done:
+            self._pending -= len(batch)
+            self._done.notify_all()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every queued entry is written; False on timeout"""
+        with self._done:
+            return self._done.wait_for(lambda: self._pending == 0, timeout)
+
+    def close(self, timeout: Optional[float] = 10.0):
+        """Write what is queued and stop the writer"""
+        with self._done:
+            if self._closed:
+                return
+            self._closed = True
+            thread = self._thread
+        atexit.unregister(self.close)
+        if thread is None:
+            return
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            pass
+        thread.join(timeout)
+        if thread.is_alive():
+            return
+        # The writer has stopped; write anything it left in the queue
+        leftovers = self._drain()
+        if leftovers:
+            try:
+                self._write_direct(leftovers)
+            finally:
+                with self._done:
+                    self._pending -= len(leftovers)
+                    self._done.notify_all()
+
+    def stats(self) -> Dict[str, int]:
+        with self._done:
+            return dict(self._stats, pending=self._pending, queue_size=self._queue.qsize(),
+                        max_queue=self._queue.maxsize)
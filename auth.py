@@ -0,0 +1,499 @@
+"""
+Authentication Module for Student Management System
+Salted password hashes, a per-username login throttle, in-process sessions
+and role-based permissions
+
+Stored passwords look like
+
+    scrypt$16384$8$1$<salt>$<hash>
+    pbkdf2_sha256$600000$<salt>$<hash>
+
+(salt and hash base64). Anything else is a legacy plaintext password; it
+still verifies, and is replaced by a hash on the next successful login.
+
+Hash cost trades login latency for resistance to offline guessing. Measure
+it on the target machine before changing the default:
+
+    python auth.py --benchmark --threads 1,4,8
+    python auth.py --benchmark --policy scrypt:n=32768 --target-ms 100
+"""
+
+import argparse
+import base64
+import binascii
+import functools
+import hashlib
+import hmac
+import os
+import secrets
+import statistics
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, FrozenSet, List, Optional
+
+SCRYPT_AVAILABLE = hasattr(hashlib, "scrypt")
+
+# Hash computations allowed at once. Each scrypt call holds n * r * 128
+# bytes and a CPU core, so extra concurrent logins queue for a slot
+# instead of all slowing down together.
+MAX_CONCURRENT_HASHES = os.cpu_count() or 1
+_hash_slots = threading.BoundedSemaphore(MAX_CONCURRENT_HASHES)
+
+
+# Permissions checked by Database methods and the dashboard buttons
+READ = "read"
+WRITE = "write"
+MANAGE_USERS = "manage_users"
+
+# Each role includes the permissions of the roles before it
+ROLES = ("viewer", "editor", "admin")
+ROLE_PERMISSIONS: Dict[str, FrozenSet[str]] = {
+    "viewer": frozenset({READ}),
+    "editor": frozenset({READ, WRITE}),
+    "admin": frozenset({READ, WRITE, MANAGE_USERS}),
+}
+
+# What callers without a session may do. Local scripts, benchmarks and the
+# CLI without --user read and change students; managing users always needs
+# a logged in admin unless the Database is explicitly created trusted=True.
+SESSIONLESS_PERMISSIONS: FrozenSet[str] = frozenset({READ, WRITE})
+ALL_PERMISSIONS: FrozenSet[str] = ROLE_PERMISSIONS["admin"]
+
+MIN_PASSWORD_LENGTH = 4
+
+
+def check_role(role: str) -> str:
+    if role not in ROLE_PERMISSIONS:
+        raise ValueError(f"Unknown role '{role}' (expected one of: {', '.join(ROLES)})")
+    return role
+
+
+class AuthenticationError(Exception):
+    """Wrong username or password"""
+
+
+class LoginThrottled(AuthenticationError):
+    """Too many failed logins for a username; retry_after is in seconds"""
+
+    def __init__(self, username: str, retry_after: float):
+        self.username = username
+        self.retry_after = retry_after
+        super().__init__(
+            f"Too many failed attempts for '{username}'. "
+            f"Try again in {max(1, round(retry_after))} seconds."
+        )
+
+
+def _b64(data: bytes) -> str:
+    return base64.b64encode(data).decode("ascii").rstrip("=")
+
+
+def _unb64(text: str) -> bytes:
+    return base64.b64decode(text + "=" * (-len(text) % 4))
+
+
+def is_hashed(stored: str) -> bool:
+    """True if stored is a password hash rather than a legacy plaintext password"""
+    return stored.startswith(("scrypt$", "pbkdf2_sha256$"))
+
+
+class HashPolicy:
+    """
+    How new passwords are hashed
+    scheme "scrypt" uses n, r, p; "pbkdf2_sha256" uses iterations.
+    Without hashlib.scrypt (OpenSSL < 1.1) scrypt falls back to PBKDF2.
+    """
+
+    def __init__(self, scheme: str = "scrypt", n: int = 2 ** 14, r: int = 8, p: int = 1,
+                 iterations: int = 600000, salt_bytes: int = 16, key_bytes: int = 32):
+        if scheme == "scrypt" and not SCRYPT_AVAILABLE:
+            scheme = "pbkdf2_sha256"
+        if scheme not in ("scrypt", "pbkdf2_sha256"):
+            raise ValueError(f"Unknown password hash scheme '{scheme}'")
+        if n < 2 or n & (n - 1):
+            raise ValueError("scrypt n must be a power of two")
+        self.scheme = scheme
+        self.n = n
+        self.r = r
+        self.p = p
+        self.iterations = iterations
+        self.salt_bytes = salt_bytes
+        self.key_bytes = key_bytes
+        self._dummy: Optional[str] = None
+
+    @classmethod
+    def parse(cls, text: str) -> "HashPolicy":
+        """
+        Policy from e.g. "scrypt", "scrypt:n=32768,r=8,p=1" or
+        "pbkdf2_sha256:iterations=600000"
+        """
+        scheme, _, options = text.partition(":")
+        kwargs = {}
+        for option in filter(None, options.split(",")):
+            key, _, value = option.partition("=")
+            if key.strip() not in ("n", "r", "p", "iterations"):
+                raise ValueError(f"Unknown password hash option '{key}'")
+            kwargs[key.strip()] = int(value)
+        return cls(scheme.strip() or "scrypt", **kwargs)
+
+    def describe(self) -> str:
+        if self.scheme == "scrypt":
+            return f"scrypt:n={self.n},r={self.r},p={self.p}"
+        return f"pbkdf2_sha256:iterations={self.iterations}"
+
+    @staticmethod
+    def _derive(password: str, scheme: str, params: List[int], salt: bytes, key_bytes: int) -> bytes:
+        secret = password.encode("utf-8")
+        with _hash_slots:
+            if scheme == "scrypt":
+                n, r, p = params
+                return hashlib.scrypt(secret, salt=salt, n=n, r=r, p=p, dklen=key_bytes,
+                                      maxmem=2 * 128 * n * r * p + (1 << 20))
+            return hashlib.pbkdf2_hmac("sha256", secret, salt, params[0], dklen=key_bytes)
+
+    def _params(self) -> List[int]:
+        return [self.n, self.r, self.p] if self.scheme == "scrypt" else [self.iterations]
+
+    def hash(self, password: str) -> str:
+        """Encoded salted hash of password, ready to store"""
+        salt = secrets.token_bytes(self.salt_bytes)
+        params = self._params()
+        key = self._derive(password, self.scheme, params, salt, self.key_bytes)
+        return "$".join([self.scheme] + [str(value) for value in params] + [_b64(salt), _b64(key)])
+
+    def verify(self, password: str, stored: Optional[str]) -> bool:
+        """
+        Check password against a stored hash (or legacy plaintext)
+        With stored None (unknown user) a dummy hash is still computed, so
+        the response time does not reveal which usernames exist
+        """
+        if stored is None:
+            if self._dummy is None:
+                self._dummy = self.hash(secrets.token_hex(8))
+            self.verify(password, self._dummy)
+            return False
+        if not is_hashed(stored):
+            return hmac.compare_digest(password.encode("utf-8"), stored.encode("utf-8"))
+
+        parts = stored.split("$")
+        scheme = parts[0]
+        try:
+            params = [int(value) for value in parts[1:-2]]
+            salt, expected = _unb64(parts[-2]), _unb64(parts[-1])
+            if len(params) != (3 if scheme == "scrypt" else 1):
+                return False
+            if scheme == "scrypt" and not SCRYPT_AVAILABLE:
+                return False
+            key = self._derive(password, scheme, params, salt, len(expected))
+        except (ValueError, binascii.Error):
+            # Corrupt or foreign hash: fail closed
+            return False
+        return hmac.compare_digest(key, expected)
+
+    def needs_rehash(self, stored: str) -> bool:
+        """True if stored is plaintext or was hashed with a different policy"""
+        if not is_hashed(stored):
+            return True
+        parts = stored.split("$")
+        return parts[0] != self.scheme or parts[1:-2] != [str(value) for value in self._params()]
+
+
+DEFAULT_HASH_POLICY = HashPolicy()
+
+
+class LoginThrottle:
+    """
+    Per-username failed login counter, held in memory
+    After max_failures failures within window seconds the username is
+    locked for lockout seconds, doubling with every further lockout up to
+    max_lockout. At most max_entries usernames are tracked (oldest first
+    out), so guessing random usernames cannot grow it without bound.
+    """
+
+    def __init__(self, max_failures: int = 5, window: float = 300.0, lockout: float = 30.0,
+                 max_lockout: float = 900.0, max_entries: int = 10000,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_failures = max_failures
+        self.window = window
+        self.lockout = lockout
+        self.max_lockout = max_lockout
+        self.max_entries = max_entries
+        self.clock = clock
+        # username -> [failures, first failure time, locked until, lockouts]
+        self._entries: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def check(self, username: str) -> float:
+        """Seconds until username may try again (0 if it may now)"""
+        with self._lock:
+            entry = self._entries.get(username)
+            if entry is None:
+                return 0.0
+            return max(0.0, entry[2] - self.clock())
+
+    def failure(self, username: str):
+        now = self.clock()
+        with self._lock:
+            entry = self._entries.pop(username, None)
+            if entry is None:
+                entry = [0, now, 0.0, 0]
+            elif now - entry[1] > self.window:
+                # New counting window; lockouts only escalate while the
+                # previous lockout ended less than a window ago
+                lockouts = entry[3] if now - entry[2] <= self.window else 0
+                entry = [0, now, entry[2], lockouts]
+            entry[0] += 1
+            if entry[0] >= self.max_failures:
+                entry[2] = now + min(self.lockout * 2 ** entry[3], self.max_lockout)
+                entry[3] += 1
+                entry[0] = 0
+                entry[1] = now
+            self._entries[username] = entry
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def success(self, username: str):
+        with self._lock:
+            self._entries.pop(username, None)
+
+    def stats(self) -> Dict[str, int]:
+        now = self.clock()
+        with self._lock:
+            locked = sum(1 for entry in self._entries.values() if entry[2] > now)
+            return {"tracked": len(self._entries), "locked": locked}
+
+
+class PermissionDenied(Exception):
+    """
+    The session's role does not allow the operation, the session ended, or
+    there is no session (session is None) and the operation needs one
+    """
+
+    def __init__(self, session: Optional["Session"], permission: str):
+        self.session = session
+        self.permission = permission
+        if session is None:
+            message = f"You must log in to {permission.replace('_', ' ')}"
+        elif not session.active:
+            message = "Your session has ended. Please log in again."
+        else:
+            message = f"'{session.username}' ({session.role}) is not allowed to {permission.replace('_', ' ')}"
+        super().__init__(message)
+
+
+class Session:
+    """
+    A verified login, identified by an unguessable token
+    The role's permissions are resolved once, at login, so allows() is a
+    set lookup; SessionManager updates or ends sessions when the user's
+    role, password or status changes
+    """
+
+    def __init__(self, token: str, username: str, role: str, created: float, expires: float,
+                 clock: Callable[[], float] = time.monotonic):
+        self.token = token
+        self.username = username
+        self.created = created
+        self.expires = expires
+        self.active = True
+        self._clock = clock
+        self.set_role(role)
+
+    def set_role(self, role: str):
+        self.role = check_role(role)
+        self.permissions = ROLE_PERMISSIONS[role]
+
+    def allows(self, permission: str) -> bool:
+        return self.active and permission in self.permissions and self._clock() < self.expires
+
+    def __repr__(self):
+        return f"Session(username={self.username!r}, role={self.role!r})"
+
+
+def requires(permission: str):
+    """
+    Method decorator for classes with session and sessionless_permissions
+    attributes (Database)
+    Calls are refused with PermissionDenied when the bound session does not
+    allow permission, or when no session is bound and permission is not in
+    sessionless_permissions (see SESSIONLESS_PERMISSIONS)
+    """
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            session = self.session
+            if session is None:
+                if permission not in self.sessionless_permissions:
+                    raise PermissionDenied(None, permission)
+            elif not session.allows(permission):
+                raise PermissionDenied(session, permission)
+            return func(self, *args, **kwargs)
+        return wrapper
+    return decorate
+
+
+class SessionManager:
+    """
+    In-process sessions: the password is checked once at login, later
+    privileged calls present the token instead of re-verifying
+    Sessions end after ttl seconds, or earlier after idle_timeout seconds
+    without use (if set)
+    """
+
+    def __init__(self, ttl: float = 8 * 3600.0, idle_timeout: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.ttl = ttl
+        self.idle_timeout = idle_timeout
+        self.clock = clock
+        self._sessions: Dict[str, Session] = {}
+        self._last_seen: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def create(self, username: str, role: str) -> Session:
+        now = self.clock()
+        session = Session(secrets.token_urlsafe(32), username, role, now, now + self.ttl, self.clock)
+        with self._lock:
+            self._expire_locked(now)
+            self._sessions[session.token] = session
+            self._last_seen[session.token] = now
+        return session
+
+    def get(self, token: Optional[str]) -> Optional[Session]:
+        """The live session for token, or None if unknown, revoked or expired"""
+        if not token:
+            return None
+        now = self.clock()
+        with self._lock:
+            session = self._sessions.get(token)
+            if session is None:
+                return None
+            if now >= session.expires or (
+                    self.idle_timeout is not None and now - self._last_seen[token] > self.idle_timeout):
+                self._drop_locked(token)
+                return None
+            self._last_seen[token] = now
+            return session
+
+    def revoke(self, token: Optional[str]):
+        with self._lock:
+            self._drop_locked(token)
+
+    def revoke_user(self, username: str, keep: Optional[str] = None):
+        """End every session of username except the one with token keep"""
+        with self._lock:
+            for token in [t for t, s in self._sessions.items() if s.username == username]:
+                if token != keep:
+                    self._drop_locked(token)
+
+    def update_role(self, username: str, role: str):
+        """Apply a role change to the user's live sessions"""
+        with self._lock:
+            for session in self._sessions.values():
+                if session.username == username:
+                    session.set_role(role)
+
+    def _drop_locked(self, token):
+        session = self._sessions.pop(token, None)
+        if session is not None:
+            session.active = False
+        self._last_seen.pop(token, None)
+
+    def _expire_locked(self, now: float):
+        for token in [t for t, s in self._sessions.items() if now >= s.expires]:
+            self._drop_locked(token)
+
+    def __len__(self):
+        return len(self._sessions)
+
+
+# ==================== BENCHMARK ====================
+
+def benchmark_policy(policy: HashPolicy, threads: int = 1, rounds: int = 5) -> Dict[str, Any]:
+    """
+    Verify latency of policy with threads concurrent logins, rounds each
+    Includes time spent waiting for a hash slot, as a user would see it
+    """
+    stored = policy.hash("benchmark-password")
+    latencies: List[float] = []
+    lock = threading.Lock()
+
+    def worker():
+        for _ in range(rounds):
+            start = time.perf_counter()
+            policy.verify("benchmark-password", stored)
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies.append(elapsed)
+
+    started = time.perf_counter()
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "policy": policy.describe(),
+        "threads": threads,
+        "logins": len(latencies),
+        "logins_per_sec": round(len(latencies) / wall, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 1),
+        "p95_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000, 1),
+        "max_ms": round(latencies[-1] * 1000, 1),
+    }
+
+
+def tune_scrypt(target_ms: float, r: int = 8, p: int = 1) -> HashPolicy:
+    """Largest scrypt n whose single-login latency stays within target_ms"""
+    best = HashPolicy("scrypt", n=2 ** 12, r=r, p=p)
+    n = 2 ** 12
+    while n <= 2 ** 20:
+        policy = HashPolicy("scrypt", n=n, r=r, p=p)
+        if benchmark_policy(policy, rounds=3)["p50_ms"] > target_ms:
+            break
+        best = policy
+        n *= 2
+    return best
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Password hashing tools for Student Management System")
+    parser.add_argument("--benchmark", action="store_true", help="measure login latency")
+    parser.add_argument("--policy", action="append", type=HashPolicy.parse,
+                        help="hash policy to measure, e.g. scrypt:n=16384 (repeatable)")
+    parser.add_argument("--threads", default="1,4",
+                        help="comma separated concurrent login counts (default 1,4)")
+    parser.add_argument("--rounds", type=int, default=5, help="logins per thread (default 5)")
+    parser.add_argument("--target-ms", type=float, default=None,
+                        help="also suggest the strongest scrypt cost within this latency")
+    parser.add_argument("--hash", metavar="PASSWORD", help="print the hash of PASSWORD")
+    args = parser.parse_args(argv)
+
+    policies = args.policy or [DEFAULT_HASH_POLICY]
+    if args.hash is not None:
+        print(policies[0].hash(args.hash))
+        return 0
+    if not args.benchmark and args.target_ms is None:
+        parser.print_help()
+        return 2
+
+    if args.benchmark:
+        print(f"{MAX_CONCURRENT_HASHES} hash slot(s)")
+        print(f"  {'policy':<32}{'threads':>8}{'logins/s':>10}{'p50 ms':>9}{'p95 ms':>9}{'max ms':>9}")
+        for policy in policies:
+            for threads in (int(t) for t in args.threads.split(",")):
+                result = benchmark_policy(policy, threads, args.rounds)
+                print(f"  {result['policy']:<32}{threads:>8}{result['logins_per_sec']:>10.1f}"
+                      f"{result['p50_ms']:>9.1f}{result['p95_ms']:>9.1f}{result['max_ms']:>9.1f}",
+                      flush=True)
+    if args.target_ms is not None:
+        print(f"Suggested policy for {args.target_ms:g} ms: {tune_scrypt(args.target_ms).describe()}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
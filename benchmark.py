@@ -0,0 +1,227 @@
+"""
+Benchmark Module for Student Management System
+Times database.Database operations against synthetic rosters of growing size
+
+Usage:
+    python benchmark.py --sizes 1000,10000,100000,1000000 --output bench.json
+
+Every run uses a fresh database file in a temporary directory, so it is
+safe to run anywhere (no display needed) and never touches students.db.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from database import DEFAULT_STORAGE_PROFILE, STORAGE_PROFILES, Database
+
+DEFAULT_SIZES = (1000, 10000, 100000)
+PERCENTILES = (50, 95, 99)
+
+FIRST_NAMES = ("Aarav", "Diya", "Ishaan", "Meera", "Kabir", "Ananya", "Rohan",
+               "Sara", "Vihaan", "Zara", "Arjun", "Nisha", "Dev", "Priya")
+LAST_NAMES = ("Sharma", "Patel", "Khan", "Iyer", "Reddy", "Gupta", "Das",
+              "Singh", "Nair", "Mehta", "Joshi", "Rao", "Bose", "Kapoor")
+
+
+def generate_students(count: int, seed: int = 0, start: int = 1) -> Iterator[Tuple[int, str, float]]:
+    """Yield count (roll_no, name, marks) rows with consecutive roll numbers"""
+    rng = random.Random(seed)
+    for roll_no in range(start, start + count):
+        name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+        marks = round(min(100.0, max(0.0, rng.gauss(65, 15))), 1)
+        yield (roll_no, name, marks)
+
+
+def percentile(sorted_values: Sequence[float], p: float) -> float:
+    """Linear interpolation between closest ranks"""
+    if not sorted_values:
+        return 0.0
+    rank = (len(sorted_values) - 1) * p / 100
+    low = int(rank)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (rank - low)
+
+
+def summarize(latencies: List[float]) -> Dict[str, Any]:
+    """Throughput and latency percentiles (milliseconds) for one operation"""
+    latencies = sorted(latencies)
+    total = sum(latencies)
+    summary = {
+        "calls": len(latencies),
+        "total_s": round(total, 6),
+        "ops_per_sec": round(len(latencies) / total, 1) if total > 0 else None,
+        "mean_ms": round(total / len(latencies) * 1000, 4) if latencies else None,
+    }
+    for p in PERCENTILES:
+        summary[f"p{p}_ms"] = round(percentile(latencies, p) * 1000, 4)
+    summary["max_ms"] = round(latencies[-1] * 1000, 4) if latencies else None
+    return summary
+
+
+def time_calls(func: Callable, arguments: Sequence[tuple]) -> List[float]:
+    """Call func once per argument tuple; returns per-call latencies in seconds"""
+    latencies = []
+    clock = time.perf_counter
+    for args in arguments:
+        start = clock()
+        func(*args)
+        latencies.append(clock() - start)
+    return latencies
+
+
+# ==================== SCENARIO ====================
+
+def benchmark_size(size: int, ops: int = 1000, heavy_ops: int = 5, seed: int = 0,
+                   profile: str = DEFAULT_STORAGE_PROFILE, cache_size: int = 0,
+                   directory: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Populate a temporary database with size students and time each operation
+    Point operations run ops times; full-table reads and logins run heavy_ops times
+    """
+    rng = random.Random(seed)
+    with tempfile.TemporaryDirectory(prefix="sms-bench-", dir=directory) as tmp:
+        db = Database(os.path.join(tmp, "bench.db"), profile=profile, cache_size=cache_size)
+        try:
+            start = time.perf_counter()
+            result = db.add_students_bulk(generate_students(size, seed), batch_size=1000)
+            populate_s = time.perf_counter() - start
+            if not result["success"]:
+                raise RuntimeError(f"Populating the benchmark database failed: {result['message']}")
+
+            existing = [(rng.randint(1, size),) for _ in range(ops)]
+            new_roll_nos = range(size + 1, size + ops + 1)
+            new_rows = [(roll_no, f"Bench {roll_no}", rng.uniform(0, 100)) for roll_no in new_roll_nos]
+            updates = [(roll_no, f"Updated {roll_no}", rng.uniform(0, 100)) for (roll_no,) in existing]
+            prefixes = [(rng.choice(LAST_NAMES)[:3],) for _ in range(ops)]
+            pages = [(rng.randint(0, size), 100) for _ in range(ops)]
+
+            # Writes come last but deletes remove the added rows again,
+            # so reads and writes all see a roster of the requested size
+            operations = [
+                ("search_student", db.search_student, existing),
+                ("student_exists", db.student_exists, existing),
+                # Password hashing is deliberately slow (see auth.py --benchmark)
+                ("verify_login", db.verify_login, [("admin", "1234")] * heavy_ops),
+                ("get_class_average", db.get_class_average, [()] * ops),
+                ("get_topper", db.get_topper, [()] * ops),
+                ("get_student_count", db.get_student_count, [()] * ops),
+                ("get_students_page", db.get_students_page, pages),
+                ("search_by_name", db.search_by_name, prefixes),
+                ("get_all_students", db.get_all_students, [()] * heavy_ops),
+                ("add_student", db.add_student, new_rows),
+                ("update_student", db.update_student, updates),
+                ("delete_student", db.delete_student, [(row[0],) for row in new_rows]),
+            ]
+
+            timings = {}
+            for name, func, arguments in operations:
+                timings[name] = summarize(time_calls(func, arguments))
+
+            file_size = os.path.getsize(db.db_name)
+        finally:
+            db.close()
+
+    return {
+        "students": size,
+        "populate_s": round(populate_s, 6),
+        "populate_rows_per_sec": round(size / populate_s, 1) if populate_s > 0 else None,
+        "db_bytes": file_size,
+        "operations": timings,
+    }
+
+
+def run_benchmarks(sizes: Sequence[int] = DEFAULT_SIZES, ops: int = 1000, heavy_ops: int = 5,
+                   seed: int = 0, profile: str = DEFAULT_STORAGE_PROFILE, cache_size: int = 0,
+                   directory: Optional[str] = None,
+                   progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+    """Benchmark every roster size; progress, if given, receives each finished run"""
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "profile": profile,
+            "cache_size": cache_size,
+            "ops": ops,
+            "heavy_ops": heavy_ops,
+            "seed": seed,
+        },
+        "runs": [],
+    }
+    for size in sizes:
+        run = benchmark_size(size, ops=ops, heavy_ops=heavy_ops, seed=seed, profile=profile,
+                             cache_size=cache_size, directory=directory)
+        report["runs"].append(run)
+        if progress is not None:
+            progress(run)
+    return report
+
+
+# ==================== COMMAND LINE ====================
+
+def format_run(run: Dict[str, Any]) -> str:
+    """Human readable table for one roster size"""
+    lines = [
+        f"\n{run['students']:,} students "
+        f"(populated in {run['populate_s']:.2f}s, {run['db_bytes'] / 1048576:.1f} MiB)",
+        f"  {'operation':<20}{'calls':>7}{'ops/s':>12}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}",
+    ]
+    for name, stats in run["operations"].items():
+        lines.append(
+            f"  {name:<20}{stats['calls']:>7}{stats['ops_per_sec'] or 0:>12,.1f}"
+            f"{stats['p50_ms']:>10.3f}{stats['p95_ms']:>10.3f}{stats['p99_ms']:>10.3f}"
+        )
+    return "\n".join(lines)
+
+
+def parse_sizes(text: str) -> List[int]:
+    sizes = []
+    for part in text.split(","):
+        part = part.strip().lower().replace("_", "")
+        multiplier = 1
+        if part.endswith("k"):
+            part, multiplier = part[:-1], 1000
+        elif part.endswith("m"):
+            part, multiplier = part[:-1], 1000000
+        sizes.append(int(float(part) * multiplier))
+    return sizes
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark Student Management System database operations")
+    parser.add_argument("--sizes", type=parse_sizes, default=list(DEFAULT_SIZES),
+                        help="comma separated roster sizes, e.g. 1k,10k,100k,1m")
+    parser.add_argument("--ops", type=int, default=1000,
+                        help="calls per point operation (default 1000)")
+    parser.add_argument("--heavy-ops", type=int, default=5,
+                        help="calls per full-table read (default 5)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--profile", choices=list(STORAGE_PROFILES), default=DEFAULT_STORAGE_PROFILE)
+    parser.add_argument("--cache-size", type=int, default=0,
+                        help="lookup cache size; 0 (default) measures SQLite itself")
+    parser.add_argument("--dir", default=None, help="directory for the temporary database")
+    parser.add_argument("--output", "-o", default=None, help="write the JSON report here")
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(args.sizes, ops=args.ops, heavy_ops=args.heavy_ops, seed=args.seed,
+                            profile=args.profile, cache_size=args.cache_size, directory=args.dir,
+                            progress=lambda run: print(format_run(run), flush=True))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as out:
+            json.dump(report, out, indent=2)
+        print(f"\nReport written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,490 @@
+"""
+Command Line Interface for Student Management System
+Headless access to the student database (no tkinter, no display needed)
+
+Examples:
+    python cli.py add 101 "Asha Rao" 88.5
+    python cli.py list --grade B --scope above --sort marks --desc
+    python cli.py --output csv list > students.csv
+    python cli.py import roster.jsonl --upsert
+    python cli.py history 101
+    python cli.py --batch < nightly.txt
+    SMS_PASSWORD=... python cli.py --user admin --batch < nightly.txt
+
+In --batch mode every line of stdin is one command (same syntax, without
+the program name; blank lines and # comments are skipped). All commands
+run on one connection in a single transaction that is committed at the
+end; with --atomic any failed command rolls the whole batch back.
+
+With --user the password is checked once (from SMS_PASSWORD, or prompted
+for) and every command in the run uses the resulting session: the user's
+role decides which commands are allowed. Without --user students can be
+read and changed, but the user commands (users, user-*, passwd) refuse to
+run. New passwords for user-add and passwd come from SMS_NEW_PASSWORD, or
+are prompted for.
+"""
+
+import argparse
+import csv
+import getpass
+import json
+import os
+import shlex
+import sys
+import time
+from itertools import islice
+from typing import IO, Iterable, List, Optional, Tuple
+
+from audit import ACTIONS, AuditEntry
+from auth import MANAGE_USERS, READ, ROLES, AuthenticationError, PermissionDenied, Session
+from database import DEFAULT_STORAGE_PROFILE, STORAGE_PROFILES, SORT_COLUMNS, Database
+from import_export import FIELDS, FORMATS, export_students, import_students
+
+OUTPUT_FORMATS = ("table", "csv", "jsonl")
+
+
+class CommandError(Exception):
+    """Invalid command line (usage error)"""
+
+
+class CommandParser(argparse.ArgumentParser):
+    """ArgumentParser that raises CommandError instead of exiting"""
+
+    def error(self, message):
+        raise CommandError(message)
+
+
+class Output:
+    """Writes rows and messages in the chosen format, row by row"""
+
+    def __init__(self, fmt: str = "table", out: IO[str] = None, err: IO[str] = None):
+        self.fmt = fmt
+        self.out = out or sys.stdout
+        self.err = err or sys.stderr
+        # Set to "line N: " while running a --batch line, for error messages
+        self.prefix = ""
+
+    def rows(self, rows: Iterable[Tuple], header: bool = True) -> int:
+        count = 0
+        if self.fmt == "csv":
+            writer = csv.writer(self.out)
+            if header:
+                writer.writerow(FIELDS)
+            for row in rows:
+                writer.writerow(row)
+                count += 1
+        elif self.fmt == "jsonl":
+            for row in rows:
+                self.out.write(json.dumps(dict(zip(FIELDS, row)), ensure_ascii=False) + "\n")
+                count += 1
+        else:
+            if header:
+                self.out.write(f"{'Roll No':>8}  {'Name':<30} {'Marks':>6}  Grade\n")
+            for roll_no, name, marks, grade in rows:
+                self.out.write(f"{roll_no:>8}  {name:<30} {marks:>6.1f}  {grade}\n")
+                count += 1
+        self.out.flush()
+        return count
+
+    def message(self, text: str):
+        self.out.write(f"{text}\n")
+
+    def error(self, text: str):
+        self.err.write(f"{self.prefix}{text}\n")
+
+
+# ==================== COMMANDS ====================
+
+def _student_args(db: Database, args) -> Tuple[int, str, float]:
+    """Validated (roll_no, name, marks); raises ValueError with a user message"""
+    return db.parse_student_row((args.roll_no, args.name, args.marks))
+
+
+def _report(out: Output, result: Tuple[bool, str]) -> bool:
+    success, message = result
+    if success:
+        out.message(message)
+    else:
+        out.error(message)
+    return success
+
+
+def cmd_add(db: Database, args, out: Output) -> bool:
+    return _report(out, db.add_student(*_student_args(db, args)))
+
+
+def cmd_update(db: Database, args, out: Output) -> bool:
+    return _report(out, db.update_student(*_student_args(db, args)))
+
+
+def cmd_delete(db: Database, args, out: Output) -> bool:
+    return _report(out, db.delete_student(args.roll_no))
+
+
+def cmd_search(db: Database, args, out: Output) -> bool:
+    student = db.search_student(args.roll_no)
+    if student is None:
+        out.error(f"No student found with Roll No: {args.roll_no}")
+        return False
+    out.rows([student])
+    return True
+
+
+def cmd_list(db: Database, args, out: Output) -> bool:
+    grades = None
+    if args.grade:
+        if args.grade not in db.grade_scale.grades:
+            raise ValueError(f"Unknown grade '{args.grade}'")
+        grades = ([args.grade] if args.scope == "only"
+                  else db.grade_scale.grades_from(args.grade, args.scope))
+
+    rows = db.iter_query_students(grades=grades, min_marks=args.min_marks,
+                                  max_marks=args.max_marks, name_prefix=args.name_prefix,
+                                  sort_by=args.sort, descending=args.desc)
+    try:
+        out.rows(islice(rows, args.limit) if args.limit is not None else rows,
+                 header=not args.no_header)
+    finally:
+        rows.close()
+    return True
+
+
+def cmd_average(db: Database, args, out: Output) -> bool:
+    average = db.get_class_average()
+    if average is None:
+        out.error("No students in database!")
+        return False
+    out.message(f"{average:.2f}")
+    return True
+
+
+def cmd_topper(db: Database, args, out: Output) -> bool:
+    topper = db.get_topper()
+    if topper is None:
+        out.error("No students in database!")
+        return False
+    out.rows([topper])
+    return True
+
+
+def cmd_import(db: Database, args, out: Output) -> bool:
+    if args.path == "-" and args.batch_input:
+        raise ValueError("Cannot import from stdin in --batch mode")
+    source = sys.stdin if args.path == "-" else args.path
+    fmt = args.format or ("csv" if args.path == "-" else None)
+
+    progress = None
+    if args.progress:
+        progress = lambda count: out.err.write(f"{out.prefix}{count} rows read\n")
+
+    result = import_students(db, source, fmt=fmt, batch_size=args.batch_size,
+                             upsert=args.upsert, progress=progress)
+    for row_number, roll_no, message in result["failed"]:
+        out.error(f"row {row_number} (roll no {roll_no}): {message}")
+    if not result["success"]:
+        out.error(result["message"])
+        return False
+    out.message(result["message"])
+    return not result["failed"]
+
+
+def cmd_export(db: Database, args, out: Output) -> bool:
+    target = out.out if args.path == "-" else args.path
+    fmt = args.format or ("csv" if args.path == "-" else None)
+    count = export_students(db, target, fmt=fmt, batch_size=args.batch_size)
+    if args.path != "-":
+        out.message(f"{count} students exported to {args.path}")
+    return True
+
+
+def _new_password(username: str) -> str:
+    password = os.environ.get("SMS_NEW_PASSWORD")
+    if password is None:
+        password = getpass.getpass(f"New password for {username}: ")
+    return password
+
+
+def _check_user_admin(args, username: Optional[str] = None):
+    """
+    User management needs --user with an admin account (or, for passwd,
+    the user themselves); checked before any new password is prompted for
+    """
+    session = args.session
+    if session is None:
+        raise PermissionDenied(None, MANAGE_USERS)
+    if not session.allows(MANAGE_USERS) and not (username == session.username
+                                                 and session.allows(READ)):
+        raise PermissionDenied(session, MANAGE_USERS)
+
+
+def cmd_users(db: Database, args, out: Output) -> bool:
+    _check_user_admin(args)
+    for username, role, disabled in db.list_users():
+        out.message(f"{username:<24} {role:<8} {'disabled' if disabled else 'active'}")
+    return True
+
+
+def cmd_user_add(db: Database, args, out: Output) -> bool:
+    _check_user_admin(args)
+    return _report(out, db.create_user(args.username, _new_password(args.username), args.role))
+
+
+def cmd_user_role(db: Database, args, out: Output) -> bool:
+    _check_user_admin(args)
+    return _report(out, db.set_user_role(args.username, args.role))
+
+
+def cmd_user_disable(db: Database, args, out: Output) -> bool:
+    _check_user_admin(args)
+    return _report(out, db.set_user_disabled(args.username, True))
+
+
+def cmd_user_enable(db: Database, args, out: Output) -> bool:
+    _check_user_admin(args)
+    return _report(out, db.set_user_disabled(args.username, False))
+
+
+def cmd_passwd(db: Database, args, out: Output) -> bool:
+    _check_user_admin(args, args.username)
+    return _report(out, db.change_password(args.username, _new_password(args.username)))
+
+
+def cmd_history(db: Database, args, out: Output) -> bool:
+    entries = db.get_audit_log(roll_no=args.roll_no, username=args.user_name,
+                               action=args.action, limit=args.limit)
+    if out.fmt == "jsonl":
+        for entry in entries:
+            out.out.write(json.dumps(entry._asdict(), ensure_ascii=False) + "\n")
+    elif out.fmt == "csv":
+        writer = csv.writer(out.out)
+        writer.writerow(AuditEntry._fields)
+        writer.writerows(entries)
+    else:
+        for entry in entries:
+            when = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(entry.changed_at))
+            old = f"{entry.old_name}, {entry.old_marks}, {entry.old_grade}" if entry.old_name else "-"
+            new = f"{entry.new_name}, {entry.new_marks}, {entry.new_grade}" if entry.new_name else "-"
+            out.message(f"{when}  {entry.username or '(local)':<12} {entry.action:<8} "
+                        f"{entry.roll_no:>8}  {old} -> {new}")
+    out.out.flush()
+    return True
+
+
+# ==================== PARSING ====================
+
+def add_commands(parser: argparse.ArgumentParser):
+    """Register the subcommands shared by the command line and --batch lines"""
+    commands = parser.add_subparsers(dest="command", metavar="COMMAND",
+                                     parser_class=CommandParser)
+
+    for name, handler, help_text in (("add", cmd_add, "add a student"),
+                                     ("update", cmd_update, "update a student")):
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument("roll_no")
+        command.add_argument("name")
+        command.add_argument("marks")
+        command.set_defaults(handler=handler)
+
+    command = commands.add_parser("delete", help="delete a student")
+    command.add_argument("roll_no", type=int)
+    command.set_defaults(handler=cmd_delete)
+
+    command = commands.add_parser("search", help="show a student by roll number")
+    command.add_argument("roll_no", type=int)
+    command.set_defaults(handler=cmd_search)
+
+    command = commands.add_parser("list", help="stream students, optionally filtered")
+    command.add_argument("--grade", help="only students with this grade (see --scope)")
+    command.add_argument("--scope", choices=("only", "below", "above"), default="only",
+                         help="with --grade: that grade only, or it and all below/above")
+    command.add_argument("--min-marks", type=float)
+    command.add_argument("--max-marks", type=float)
+    command.add_argument("--name-prefix")
+    command.add_argument("--sort", choices=list(SORT_COLUMNS), default="roll_no")
+    command.add_argument("--desc", action="store_true", help="sort descending")
+    command.add_argument("--limit", type=int)
+    command.add_argument("--no-header", action="store_true")
+    command.set_defaults(handler=cmd_list)
+
+    command = commands.add_parser("average", help="print the class average")
+    command.set_defaults(handler=cmd_average)
+
+    command = commands.add_parser("topper", help="show the class topper")
+    command.set_defaults(handler=cmd_topper)
+
+    command = commands.add_parser("import", help="import students from CSV or JSONL")
+    command.add_argument("path", help="file to read, - for stdin")
+    command.add_argument("--format", choices=FORMATS)
+    command.add_argument("--upsert", action="store_true", help="update existing roll numbers")
+    command.add_argument("--batch-size", type=int, default=500)
+    command.add_argument("--progress", action="store_true", help="report progress on stderr")
+    command.set_defaults(handler=cmd_import)
+
+    command = commands.add_parser("export", help="export all students to CSV or JSONL")
+    command.add_argument("path", help="file to write, - for stdout")
+    command.add_argument("--format", choices=FORMATS)
+    command.add_argument("--batch-size", type=int, default=1000)
+    command.set_defaults(handler=cmd_export)
+
+    command = commands.add_parser("history", help="show recorded changes, newest first")
+    command.add_argument("roll_no", type=int, nargs="?", help="only this student's changes")
+    command.add_argument("--by", dest="user_name", help="only changes made by this user")
+    command.add_argument("--action", choices=ACTIONS)
+    command.add_argument("--limit", type=int, default=50)
+    command.set_defaults(handler=cmd_history)
+
+    command = commands.add_parser("users", help="list users and their roles")
+    command.set_defaults(handler=cmd_users)
+
+    command = commands.add_parser("user-add", help="create a user")
+    command.add_argument("username")
+    command.add_argument("role", choices=ROLES)
+    command.set_defaults(handler=cmd_user_add)
+
+    command = commands.add_parser("user-role", help="change a user's role")
+    command.add_argument("username")
+    command.add_argument("role", choices=ROLES)
+    command.set_defaults(handler=cmd_user_role)
+
+    for name, handler, help_text in (("user-disable", cmd_user_disable, "disable a user"),
+                                     ("user-enable", cmd_user_enable, "enable a user"),
+                                     ("passwd", cmd_passwd, "change a user's password")):
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument("username")
+        command.set_defaults(handler=handler)
+
+
+def build_parser() -> CommandParser:
+    parser = CommandParser(prog="cli.py", description="Student Management System command line")
+    parser.add_argument("--db", default="students.db", help="database file (default students.db)")
+    parser.add_argument("--profile", choices=list(STORAGE_PROFILES), default=DEFAULT_STORAGE_PROFILE,
+                        help="storage profile")
+    parser.add_argument("--output", choices=OUTPUT_FORMATS, default="table",
+                        help="format for student rows (default table)")
+    parser.add_argument("--user", help="log in as this admin (password from SMS_PASSWORD or a prompt)")
+    parser.add_argument("--batch", action="store_true",
+                        help="read commands from stdin and run them in one transaction")
+    parser.add_argument("--atomic", action="store_true",
+                        help="with --batch: roll back all commands if any fails")
+    add_commands(parser)
+    return parser
+
+
+def build_batch_parser() -> CommandParser:
+    parser = CommandParser(prog="", add_help=False)
+    add_commands(parser)
+    return parser
+
+
+# ==================== RUNNING ====================
+
+def authenticate(db: Database, username: str) -> Session:
+    """Log in once for the whole run; raises AuthenticationError"""
+    password = os.environ.get("SMS_PASSWORD")
+    if password is None:
+        password = getpass.getpass(f"Password for {username}: ")
+    return db.login(username, password)
+
+
+def run_command(db: Database, args, out: Output) -> bool:
+    """Run one parsed command; returns True on success"""
+    try:
+        return args.handler(db, args, out)
+    except BrokenPipeError:
+        raise
+    except PermissionDenied as e:
+        out.error(f"Error: {e}" + (" (use --user)" if e.session is None else ""))
+        return False
+    except (ValueError, OSError) as e:
+        out.error(f"Error: {e}")
+        return False
+
+
+class BatchAborted(Exception):
+    """Raised inside the batch transaction to roll it back"""
+
+
+def run_batch(db: Database, lines: Iterable[str], out: Output, atomic: bool = False,
+              session: Optional[Session] = None) -> bool:
+    """
+    Run one command per line in a single transaction
+    Returns True if every command succeeded
+    """
+    parser = build_batch_parser()
+    ok = True
+    try:
+        with db.transaction():
+            for line_number, line in enumerate(lines, 1):
+                out.prefix = f"line {line_number}: "
+                try:
+                    words = shlex.split(line, comments=True)
+                    if not words:
+                        continue
+                    args = parser.parse_args(words)
+                except (CommandError, ValueError) as e:
+                    out.error(f"Error: {e}")
+                    succeeded = False
+                except SystemExit:
+                    # "-h" on a batch line printed its help
+                    continue
+                else:
+                    if args.command is None:
+                        continue
+                    args.batch_input = True
+                    args.session = session
+                    succeeded = run_command(db, args, out)
+
+                if not succeeded:
+                    ok = False
+                    if atomic:
+                        raise BatchAborted()
+    except BatchAborted:
+        out.prefix = ""
+        out.error("Batch rolled back")
+    finally:
+        out.prefix = ""
+    return ok
+
+
+def main(argv: Optional[List[str]] = None, stdin: IO[str] = None) -> int:
+    parser = build_parser()
+    try:
+        args = parser.parse_args(argv)
+        if not args.batch and args.command is None:
+            raise CommandError("a command is required (or --batch)")
+    except CommandError as e:
+        parser.print_usage(sys.stderr)
+        sys.stderr.write(f"{parser.prog}: error: {e}\n")
+        return 2
+
+    out = Output(args.output)
+    db = Database(args.db, profile=args.profile)
+    try:
+        session = None
+        if args.user:
+            try:
+                session = authenticate(db, args.user)
+            except AuthenticationError as e:
+                out.error(f"Error: {e}")
+                return 1
+            db.use_session(session)
+
+        if args.batch:
+            ok = run_batch(db, stdin or sys.stdin, out, atomic=args.atomic, session=session)
+        else:
+            args.batch_input = False
+            args.session = session
+            ok = run_command(db, args, out)
+    except BrokenPipeError:
+        # Output piped into e.g. head, which stopped reading; keep the
+        # interpreter from failing again when it flushes stdout at exit
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        return 0
+    finally:
+        db.close()
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,290 @@
+"""
+Connection Pool Module for Student Management System
+Keeps SQLite connections open between calls and hands them out per thread
+"""
+
+import itertools
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+
+class PooledConnection:
+    """
+    Thin wrapper around a pooled sqlite3 connection
+    close() returns the connection to the pool instead of closing it,
+    so existing "connect, use, close" code works unchanged
+    """
+
+    def __init__(self, pool: "ConnectionPool", conn: sqlite3.Connection):
+        self._pool = pool
+        self._conn = conn
+        self._released = False
+
+    def __getattr__(self, name):
+        # Delegate everything else (cursor, execute, commit, ...) to sqlite3
+        return getattr(self._conn, name)
+
+    def __enter__(self):
+        self._conn.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return self._conn.__exit__(exc_type, exc_value, traceback)
+
+    @property
+    def raw(self) -> sqlite3.Connection:
+        """The underlying sqlite3 connection"""
+        return self._conn
+
+    def close(self):
+        """Release the connection back to the pool (safe to call twice)"""
+        if self._released:
+            return
+        self._released = True
+        self._pool.release(self._conn)
+
+
+class SavepointConnection:
+    """
+    One call's view of a connection held open by a longer transaction
+    Everything runs inside a savepoint of its own: commit() releases it,
+    rollback() undoes only this call's changes, and close() rolls back
+    whatever was not committed (like releasing a pooled connection), while
+    the connection and the outer transaction stay open
+    """
+
+    _names = itertools.count(1)
+
+    def __init__(self, conn: sqlite3.Connection):
+        self._conn = conn
+        self._name = f"call_{next(self._names)}"
+        self._open = True
+        conn.execute(f"SAVEPOINT {self._name}")
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.rollback()
+        return False
+
+    @property
+    def raw(self) -> sqlite3.Connection:
+        """The underlying sqlite3 connection"""
+        return self._conn
+
+    def commit(self):
+        if self._open:
+            self._open = False
+            self._conn.execute(f"RELEASE {self._name}")
+
+    def rollback(self):
+        if self._open:
+            self._open = False
+            self._conn.execute(f"ROLLBACK TO {self._name}")
+            self._conn.execute(f"RELEASE {self._name}")
+
+    def close(self):
+        self.rollback()
+
+
+class ConnectionPool:
+    """
+    Pool of long-lived SQLite connections
+
+    Idle connections are remembered together with the thread that released
+    them, and a thread asking for a connection gets its own idle one back
+    first. At most max_size connections are open at once; when the limit is
+    reached an idle connection of another thread is recycled, otherwise the
+    caller waits until a connection is released. Idle connections older than
+    idle_timeout seconds are closed.
+    """
+
+    def __init__(self, db_name: str, max_size: int = 5, idle_timeout: float = 60.0,
+                 connect: Optional[Callable[[], sqlite3.Connection]] = None):
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self.db_name = db_name
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self._connect = connect or self._default_connect
+
+        self._lock = threading.Lock()
+        self._available = threading.Condition(self._lock)
+        # Idle connections as [thread_id, connection, released_at]
+        self._idle: List[list] = []
+        self._open = 0
+        self._closed = False
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "waits": 0,
+            "opens": 0,
+            "closes": 0,
+            "evictions": 0,
+            "expired": 0,
+        }
+
+    def _default_connect(self) -> sqlite3.Connection:
+        # Connections may be closed by whichever thread recycles them
+        return sqlite3.connect(self.db_name, check_same_thread=False)
+
+    # ==================== ACQUIRE / RELEASE ====================
+
+    def acquire(self, timeout: Optional[float] = None) -> PooledConnection:
+        """
+        Get a connection for the calling thread
+        Raises TimeoutError if no connection became free within timeout
+        """
+        thread_id = threading.get_ident()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        waited = False
+        to_close = []
+
+        with self._available:
+            while True:
+                if self._closed:
+                    raise sqlite3.ProgrammingError("Connection pool is closed")
+
+                to_close.extend(self._expire_idle_locked())
+
+                # Prefer a connection this thread used before
+                for i in range(len(self._idle) - 1, -1, -1):
+                    if self._idle[i][0] == thread_id:
+                        conn = self._idle.pop(i)[1]
+                        self._stats["hits"] += 1
+                        break
+                else:
+                    conn = None
+
+                if conn is not None:
+                    break
+
+                if self._open < self.max_size:
+                    self._open += 1
+                    self._stats["misses"] += 1
+                    break
+
+                if self._idle:
+                    # Recycle the least recently used idle connection
+                    to_close.append(self._idle.pop(0)[1])
+                    self._open -= 1
+                    self._stats["evictions"] += 1
+                    continue
+
+                if not waited:
+                    self._stats["waits"] += 1
+                    waited = True
+
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    self._close_all(to_close)
+                    raise TimeoutError("Timed out waiting for a database connection")
+                self._available.wait(remaining)
+
+        self._close_all(to_close)
+
+        if conn is None:
+            try:
+                conn = self._connect()
+            except Exception:
+                with self._available:
+                    self._open -= 1
+                    self._available.notify()
+                raise
+            with self._lock:
+                self._stats["opens"] += 1
+
+        return PooledConnection(self, conn)
+
+    def release(self, conn: sqlite3.Connection):
+        """Return a connection to the pool, discarding any open transaction"""
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            # Broken connection, drop it instead of pooling it
+            self._discard(conn)
+            return
+
+        with self._available:
+            if self._closed:
+                self._open -= 1
+                close_now = True
+            else:
+                self._idle.append([threading.get_ident(), conn, time.monotonic()])
+                close_now = False
+            self._available.notify()
+
+        if close_now:
+            self._close_all([conn])
+
+    def _discard(self, conn: sqlite3.Connection):
+        with self._available:
+            self._open -= 1
+            self._available.notify()
+        self._close_all([conn])
+
+    # ==================== HOUSEKEEPING ====================
+
+    def _expire_idle_locked(self) -> List[sqlite3.Connection]:
+        """Remove idle connections past idle_timeout (lock must be held)"""
+        if self.idle_timeout is None or not self._idle:
+            return []
+
+        cutoff = time.monotonic() - self.idle_timeout
+        expired = [entry[1] for entry in self._idle if entry[2] < cutoff]
+        if expired:
+            self._idle = [entry for entry in self._idle if entry[2] >= cutoff]
+            self._open -= len(expired)
+            self._stats["expired"] += len(expired)
+        return expired
+
+    def _close_all(self, connections: List[sqlite3.Connection]):
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+        if connections:
+            with self._lock:
+                self._stats["closes"] += len(connections)
+
+    def prune(self):
+        """Close idle connections that exceeded the idle timeout"""
+        with self._lock:
+            expired = self._expire_idle_locked()
+        self._close_all(expired)
+
+    def close_idle(self):
+        """Close every idle connection (in-use connections are untouched)"""
+        with self._available:
+            idle = [entry[1] for entry in self._idle]
+            self._idle = []
+            self._open -= len(idle)
+            self._available.notify_all()
+        self._close_all(idle)
+
+    def close(self):
+        """Close the pool; in-use connections are closed when released"""
+        with self._available:
+            self._closed = True
+        self.close_idle()
+
+    def stats(self) -> Dict[str, int]:
+        """Return a snapshot of pool counters"""
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot["open"] = self._open
+            snapshot["idle"] = len(self._idle)
+            snapshot["in_use"] = self._open - len(self._idle)
+            snapshot["max_size"] = self.max_size
+        return snapshot
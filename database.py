@@ -3,105 +3,1047 @@ Database Module for Student Management System
 Handles all database operations including student CRUD and authentication
 """
 
+import re
 import sqlite3
-from typing import Optional, List, Tuple
+import threading
+import time
+from bisect import bisect_right
+from contextlib import contextmanager
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, List, Tuple
 
+from audit import (ACTIONS, AUDIT_COLUMNS, AUDIT_SCHEMA, AuditEntry, AuditLog, make_entry,
+                   write_entries)
+from auth import (ALL_PERMISSIONS, DEFAULT_HASH_POLICY, MANAGE_USERS, MIN_PASSWORD_LENGTH,
+                  READ, ROLES, SESSIONLESS_PERMISSIONS, WRITE, AuthenticationError, HashPolicy,
+                  LoginThrottle, LoginThrottled, PermissionDenied, Session, SessionManager,
+                  requires)
+from connection_pool import ConnectionPool, SavepointConnection
+from diagnostics import QueryDiagnostics
+from instrumentation import instrument_methods
+from migrations import (DEFAULT_CHUNK_SIZE, DEFAULT_PAUSE, ChunkedStep, FunctionStep, Migration,
+                        Migrator, SQLStep, add_column)
+from student_cache import MISSING, LRUCache
+
+_numpy: Any = None
+
+
+def optional_numpy():
+    """
+    NumPy if it is installed, else None
+    Imported on first use rather than at import time, which keeps it off
+    the startup path of the GUI and the command line
+    """
+    global _numpy
+    if _numpy is None:
+        try:
+            import numpy
+        except ImportError:  # NumPy is optional; batch grading falls back to bisect
+            numpy = False
+        _numpy = numpy
+    return _numpy or None
+
+INSERT_STUDENT_SQL = "INSERT INTO students (roll_no, name, marks, grade) VALUES (?, ?, ?, ?)"
+
+UPSERT_STUDENT_SQL = (
+    "INSERT INTO students (roll_no, name, marks, grade) VALUES (?, ?, ?, ?) "
+    "ON CONFLICT(roll_no) DO UPDATE SET "
+    "name = excluded.name, marks = excluded.marks, grade = excluded.grade"
+)
+
+# Connection settings applied to every new connection. All profiles use WAL so
+# readers never block the writer; they trade durability for write speed:
+#   safe      - fsync on every commit
+#   balanced  - fsync at WAL checkpoints only; a power cut may lose the last
+#               commits but never corrupts the database
+#   bulk-load - no fsync at all, large cache; for one-off imports
+STORAGE_PROFILES = {
+    "safe": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "cache_size": -8192,          # KiB (negative = size, not pages)
+        "mmap_size": 0,
+        "temp_store": "DEFAULT",
+    },
+    "balanced": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -32768,
+        "mmap_size": 64 * 1024 * 1024,
+        "temp_store": "MEMORY",
+    },
+    "bulk-load": {
+        "journal_mode": "WAL",
+        "synchronous": "OFF",
+        "cache_size": -262144,
+        "mmap_size": 256 * 1024 * 1024,
+        "temp_store": "MEMORY",
+    },
+}
+
+DEFAULT_STORAGE_PROFILE = "balanced"
+
+# Minimum marks for each grade, highest band first; anything lower is FAIL_GRADE
+GRADE_BANDS = [
+    (90, "A+"),
+    (80, "A"),
+    (70, "B+"),
+    (60, "B"),
+    (50, "C"),
+    (40, "D"),
+]
+
+FAIL_GRADE = "F"
+
+
+class GradeScale:
+    """
+    Grading policy as a table of (minimum marks, grade) bands
+    Marks below the lowest band get fail_grade. Lookups bisect the sorted
+    thresholds; grade_many uses NumPy searchsorted when available.
+    """
+    
+    def __init__(self, bands: Iterable[Tuple[float, str]] = GRADE_BANDS,
+                 fail_grade: str = FAIL_GRADE):
+        ascending = sorted((float(min_marks), grade) for min_marks, grade in bands)
+        self.thresholds = [min_marks for min_marks, _ in ascending]
+        if len(set(self.thresholds)) != len(self.thresholds):
+            raise ValueError("Grade bands must have distinct minimum marks")
+        
+        # grades[i] applies to marks in [thresholds[i - 1], thresholds[i])
+        self.grades = [fail_grade] + [grade for _, grade in ascending]
+        self.fail_grade = fail_grade
+        self._np_thresholds = None
+    
+    @property
+    def bands(self) -> List[Tuple[float, str]]:
+        """(minimum marks, grade) pairs, highest band first"""
+        return list(zip(reversed(self.thresholds), reversed(self.grades[1:])))
+    
+    def grade(self, marks: float) -> str:
+        """Grade for a single mark"""
+        return self.grades[bisect_right(self.thresholds, marks)]
+    
+    def grade_many(self, marks: Iterable[float]) -> List[str]:
+        """Grades for a batch of marks"""
+        np = optional_numpy()
+        if np is not None:
+            if self._np_thresholds is None:
+                self._np_thresholds = np.array(self.thresholds)
+            positions = np.searchsorted(self._np_thresholds,
+                                        np.fromiter(marks, dtype=np.float64), side="right")
+            grades = self.grades
+            return [grades[i] for i in positions.tolist()]
+        
+        thresholds, grades = self.thresholds, self.grades
+        return [grades[bisect_right(thresholds, m)] for m in marks]
+    
+    def case_sql(self, column: str = "marks") -> Tuple[str, List]:
+        """SQL CASE expression (and its parameters) that grades column in SQLite"""
+        clauses = " ".join(f"WHEN {column} >= ? THEN ?" for _ in self.thresholds)
+        params: List = []
+        for min_marks, grade in self.bands:
+            params.extend((min_marks, grade))
+        params.append(self.fail_grade)
+        return f"CASE {clauses} ELSE ? END", params
+    
+    def grades_from(self, grade: str, direction: str = "below") -> List[str]:
+        """
+        grade together with every grade below it (direction="below")
+        or above it (direction="above"), e.g. "B+" below -> B+, B, C, D, F
+        """
+        if grade not in self.grades:
+            raise ValueError(f"Unknown grade '{grade}'")
+        position = self.grades.index(grade)
+        if direction == "below":
+            return self.grades[:position + 1]
+        if direction == "above":
+            return self.grades[position:]
+        raise ValueError("direction must be 'below' or 'above'")
+
+
+# Lowest roll number among the students with the highest marks; both lookups
+# are index seeks on idx_students_marks
+TOPPER_SUBQUERY = (
+    "(SELECT MIN(roll_no) FROM students "
+    "WHERE marks = (SELECT MAX(marks) FROM students))"
+)
+
+# student_stats holds one row (id = 1) of running aggregates kept current by
+# triggers, so average/topper/count never scan the students table. version is
+# bumped on every change to students and can be used to invalidate caches.
+STATS_TABLE_SCHEMA = [
+    "CREATE INDEX IF NOT EXISTS idx_students_marks ON students (marks)",
+    """
+    CREATE TABLE IF NOT EXISTS student_stats (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        student_count INTEGER NOT NULL,
+        marks_total REAL NOT NULL,
+        min_marks REAL,
+        max_marks REAL,
+        topper_roll_no INTEGER,
+        version INTEGER NOT NULL DEFAULT 0
+    )
+    """,
+]
+
+STATS_FILL = f"""
+    INSERT OR IGNORE INTO student_stats
+        (id, student_count, marks_total, min_marks, max_marks, topper_roll_no)
+    SELECT 1, COUNT(*), COALESCE(SUM(marks), 0), MIN(marks), MAX(marks), {TOPPER_SUBQUERY}
+    FROM students
+"""
+
+STATS_TRIGGERS = [
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_students_stats_insert AFTER INSERT ON students
+    BEGIN
+        UPDATE student_stats SET
+            student_count = student_count + 1,
+            marks_total = marks_total + NEW.marks,
+            min_marks = CASE WHEN min_marks IS NULL OR NEW.marks < min_marks
+                             THEN NEW.marks ELSE min_marks END,
+            max_marks = CASE WHEN max_marks IS NULL OR NEW.marks > max_marks
+                             THEN NEW.marks ELSE max_marks END,
+            topper_roll_no = CASE
+                WHEN max_marks IS NULL OR NEW.marks > max_marks THEN NEW.roll_no
+                WHEN NEW.marks = max_marks AND NEW.roll_no < topper_roll_no THEN NEW.roll_no
+                ELSE topper_roll_no END,
+            version = version + 1
+        WHERE id = 1;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_students_stats_delete AFTER DELETE ON students
+    BEGIN
+        UPDATE student_stats SET
+            student_count = student_count - 1,
+            marks_total = marks_total - OLD.marks,
+            min_marks = CASE WHEN OLD.marks <= min_marks
+                             THEN (SELECT MIN(marks) FROM students) ELSE min_marks END,
+            max_marks = CASE WHEN OLD.marks >= max_marks
+                             THEN (SELECT MAX(marks) FROM students) ELSE max_marks END,
+            topper_roll_no = CASE WHEN OLD.roll_no = topper_roll_no
+                                  THEN {TOPPER_SUBQUERY} ELSE topper_roll_no END,
+            version = version + 1
+        WHERE id = 1;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_students_stats_update AFTER UPDATE ON students
+    BEGIN
+        UPDATE student_stats SET
+            marks_total = marks_total - OLD.marks + NEW.marks,
+            min_marks = CASE WHEN NEW.marks = OLD.marks THEN min_marks
+                             ELSE (SELECT MIN(marks) FROM students) END,
+            max_marks = CASE WHEN NEW.marks = OLD.marks THEN max_marks
+                             ELSE (SELECT MAX(marks) FROM students) END,
+            topper_roll_no = CASE WHEN NEW.marks = OLD.marks AND NEW.roll_no = OLD.roll_no
+                                  THEN topper_roll_no ELSE {TOPPER_SUBQUERY} END,
+            version = version + 1
+        WHERE id = 1;
+    END
+    """,
+]
+
+STATS_SCHEMA = STATS_TABLE_SCHEMA + [STATS_FILL] + STATS_TRIGGERS
+
+# While the initial migration fills student_stats and the name indexes chunk
+# by chunk, other programs may not change students: a row written ahead of
+# the fill would be counted by the triggers and again by the fill
+UPGRADE_WRITE_GUARD = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_students_upgrading_{event.lower()} BEFORE {event} ON students
+    BEGIN
+        SELECT RAISE(ABORT, 'The students table is being upgraded, try again shortly');
+    END
+    """
+    for event in ("INSERT", "UPDATE", "DELETE")
+]
+
+
+def name_index_schema(table: str, options: str) -> List[str]:
+    """
+    DDL for an external-content FTS5 index over students.name, kept in sync
+    with the students table by triggers (roll_no is the FTS rowid)
+    """
+    return [
+        f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS {table} USING fts5(
+            name, content='students', content_rowid='roll_no', {options}
+        )
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_{table}_insert AFTER INSERT ON students
+        BEGIN
+            INSERT INTO {table} (rowid, name) VALUES (NEW.roll_no, NEW.name);
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_{table}_delete AFTER DELETE ON students
+        BEGIN
+            INSERT INTO {table} ({table}, rowid, name) VALUES ('delete', OLD.roll_no, OLD.name);
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_{table}_update AFTER UPDATE OF roll_no, name ON students
+        BEGIN
+            INSERT INTO {table} ({table}, rowid, name) VALUES ('delete', OLD.roll_no, OLD.name);
+            INSERT INTO {table} (rowid, name) VALUES (NEW.roll_no, NEW.name);
+        END
+        """,
+    ]
+
+
+# Word-prefix index for as-you-type search; prefix indexes make 1-3 letter
+# prefix queries index lookups instead of term scans
+NAME_INDEX_TABLE = "students_fts"
+NAME_INDEX_OPTIONS = "prefix='1 2 3', tokenize='unicode61 remove_diacritics 2'"
+
+# Trigram index for fuzzy (typo-tolerant, substring) matches
+TRIGRAM_INDEX_TABLE = "students_trigram"
+TRIGRAM_INDEX_OPTIONS = "tokenize='trigram'"
+
+# Secondary indexes for filtered queries: grade filters (optionally with a
+# marks range or marks ordering) and case-insensitive name prefixes/sorting
+FILTER_INDEX_SCHEMA = [
+    "CREATE INDEX IF NOT EXISTS idx_students_grade ON students (grade, marks)",
+    "CREATE INDEX IF NOT EXISTS idx_students_name ON students (name COLLATE NOCASE)",
+]
+
+# Sort keys accepted by query_students; roll_no breaks ties so pages are stable.
+# Grades are bands of marks, so grade rank order is marks order (F first
+# ascending, A+ last) and can use idx_students_marks; sorting the grade
+# letters as text would put A before A+.
+SORT_COLUMNS = {
+    "roll_no": "roll_no",
+    "name": "name COLLATE NOCASE",
+    "marks": "marks",
+    "grade": "marks",
+}
+
+# Name searches rank (bm25) at most this many matches, so a one-letter prefix
+# matching half the roster stays as fast as a precise query
+RANK_CANDIDATES = 1000
+
+_fts_support: Optional[Tuple[bool, bool]] = None
+
+
+def fts_support() -> Tuple[bool, bool]:
+    """Return (fts5 available, trigram tokenizer available) for this SQLite build"""
+    global _fts_support
+    if _fts_support is None:
+        probe = sqlite3.connect(":memory:")
+        try:
+            probe.execute("CREATE VIRTUAL TABLE probe USING fts5(x)")
+            fts5 = True
+        except sqlite3.OperationalError:
+            fts5 = False
+        try:
+            probe.execute("CREATE VIRTUAL TABLE probe_trigram USING fts5(x, tokenize='trigram')")
+            trigram = True
+        except sqlite3.OperationalError:
+            trigram = False
+        probe.close()
+        _fts_support = (fts5, fts5 and trigram)
+    return _fts_support
+
+
+def _create_name_index(cursor, table: str, options: str):
+    """Create an FTS name index and fill it from existing students if new"""
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,))
+    exists = cursor.fetchone() is not None
+    
+    for statement in name_index_schema(table, options):
+        cursor.execute(statement)
+    
+    if not exists:
+        cursor.execute(f"INSERT INTO {table} ({table}) VALUES ('rebuild')")
+
+
+def _create_tables(cursor):
+    """Create the students and admin tables"""
+    # Create students table
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS students (
+            roll_no INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            marks REAL NOT NULL,
+            grade TEXT NOT NULL
+        )
+    """)
+    
+    # Create admin table
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS admin (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT UNIQUE NOT NULL,
+            password TEXT NOT NULL
+        )
+    """)
+
+
+def create_schema(conn):
+    """Create the students and admin tables with their indexes and triggers"""
+    cursor = conn.cursor()
+    _create_tables(cursor)
+    
+    # Running aggregates for average/topper/count
+    for statement in STATS_SCHEMA:
+        cursor.execute(statement)
+    
+    # Indexes backing query_students filters and sort keys
+    for statement in FILTER_INDEX_SCHEMA:
+        cursor.execute(statement)
+    
+    # Full-text name indexes, when this SQLite build has FTS5
+    fts5, trigram = fts_support()
+    if fts5:
+        _create_name_index(cursor, NAME_INDEX_TABLE, NAME_INDEX_OPTIONS)
+    if trigram:
+        _create_name_index(cursor, TRIGRAM_INDEX_TABLE, TRIGRAM_INDEX_OPTIONS)
+
+
+def create_empty_schema(conn):
+    """
+    Create the tables, indexes and triggers of create_schema, leaving the
+    student_stats row and the name indexes empty for the chunked fill steps
+    of the initial migration; writes to students are refused until
+    finish_initial_fill
+    """
+    cursor = conn.cursor()
+    _create_tables(cursor)
+    
+    for statement in UPGRADE_WRITE_GUARD:
+        cursor.execute(statement)
+    
+    # An unversioned file may already have a filled stats row or name index;
+    # start both over, so the fill steps count every student exactly once
+    for statement in STATS_TABLE_SCHEMA + STATS_TRIGGERS:
+        cursor.execute(statement)
+    cursor.execute("DELETE FROM student_stats")
+    cursor.execute("INSERT INTO student_stats (id, student_count, marks_total) VALUES (1, 0, 0)")
+    
+    for statement in FILTER_INDEX_SCHEMA:
+        cursor.execute(statement)
+    
+    fts5, trigram = fts_support()
+    indexes = [(NAME_INDEX_TABLE, NAME_INDEX_OPTIONS)] if fts5 else []
+    if trigram:
+        indexes.append((TRIGRAM_INDEX_TABLE, TRIGRAM_INDEX_OPTIONS))
+    for table, options in indexes:
+        cursor.execute(f"DROP TABLE IF EXISTS {table}")
+        for statement in name_index_schema(table, options):
+            cursor.execute(statement)
+
+
+def add_to_student_stats(conn, rows):
+    """Add a chunk of (roll_no, marks) rows to the student_stats aggregates"""
+    marks = [row[1] for row in rows]
+    low, high = min(marks), max(marks)
+    conn.execute(
+        """
+        UPDATE student_stats SET
+            student_count = student_count + ?,
+            marks_total = marks_total + ?,
+            min_marks = MIN(COALESCE(min_marks, ?), ?),
+            max_marks = MAX(COALESCE(max_marks, ?), ?)
+        WHERE id = 1
+        """,
+        (len(marks), sum(marks), low, low, high, high)
+    )
+
+
+def fill_name_index(table: str) -> Callable[[Any, List[tuple]], None]:
+    """ChunkedStep apply adding a chunk of (roll_no, name) rows to an FTS name index"""
+    def apply(conn, rows):
+        conn.executemany(f"INSERT INTO {table} (rowid, name) VALUES (?, ?)", rows)
+    return apply
+
+
+def name_index_exists(table: str) -> str:
+    """
+    ChunkedStep where clause that is false when this SQLite build could not
+    create the index, so the fill step finds no rows
+    """
+    return f"EXISTS (SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = '{table}')"
+
+
+def finish_initial_fill(conn):
+    """Set the topper once every student is counted and accept writes again"""
+    conn.execute(f"UPDATE student_stats SET topper_roll_no = {TOPPER_SUBQUERY} WHERE id = 1")
+    for event in ("insert", "update", "delete"):
+        conn.execute(f"DROP TRIGGER IF EXISTS trg_students_upgrading_{event}")
+
+
+def create_default_admin(conn):
+    """Create default admin account (admin/1234) if it doesn't exist"""
+    conn.execute(
+        "INSERT OR IGNORE INTO admin (username, password) VALUES (?, ?)",
+        ("admin", "1234")
+    )
+
+
+def hash_plaintext_passwords(conn, rows):
+    """Replace legacy plaintext admin passwords with salted hashes"""
+    conn.executemany(
+        "UPDATE admin SET password = ? WHERE id = ?",
+        [(DEFAULT_HASH_POLICY.hash(password), admin_id) for admin_id, password in rows]
+    )
+
+
+def add_user_role_columns(conn):
+    """Roles and an enabled flag for admin users; existing users stay admins"""
+    add_column(conn, "admin", "role", "TEXT NOT NULL DEFAULT 'admin'")
+    add_column(conn, "admin", "disabled", "INTEGER NOT NULL DEFAULT 0")
+
+
+# Schema history, applied in order by migrations.Migrator; the version
+# reached is stored in PRAGMA user_version. Released migrations must not
+# change: add a new one for every schema change, using a ChunkedStep for
+# anything that rewrites the students table.
+MIGRATIONS = [
+    Migration(1, "Initial schema", [
+        # Index builds are single statements; filling the aggregates and name
+        # indexes from an existing roster is chunked to keep each lock short
+        FunctionStep("students and admin tables, indexes, triggers", create_empty_schema),
+        ChunkedStep("fill student_stats", "students", ["marks"], add_to_student_stats,
+                    key="roll_no"),
+        ChunkedStep(f"fill {NAME_INDEX_TABLE}", "students", ["name"],
+                    fill_name_index(NAME_INDEX_TABLE), key="roll_no",
+                    where=name_index_exists(NAME_INDEX_TABLE)),
+        ChunkedStep(f"fill {TRIGRAM_INDEX_TABLE}", "students", ["name"],
+                    fill_name_index(TRIGRAM_INDEX_TABLE), key="roll_no",
+                    where=name_index_exists(TRIGRAM_INDEX_TABLE)),
+        FunctionStep("topper, accept writes to students", finish_initial_fill),
+        FunctionStep("default admin account", create_default_admin),
+    ]),
+    Migration(2, "Hash admin passwords", [
+        # Hashing is deliberately slow, so keep each chunk's write lock short
+        ChunkedStep("hash plaintext passwords", "admin", ["password"], hash_plaintext_passwords,
+                    key="id", where="password NOT LIKE 'scrypt$%' AND password NOT LIKE 'pbkdf2_sha256$%'",
+                    chunk_size=8),
+    ]),
+    Migration(3, "User roles", [
+        FunctionStep("role and disabled columns on admin", add_user_role_columns),
+    ]),
+    Migration(4, "Audit log", [
+        SQLStep("audit_log table, index and append-only triggers", AUDIT_SCHEMA),
+    ]),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1].version
+
+
+@instrument_methods("db", exclude=("calculate_grade", "parse_student_row"))
 class Database:
     """Handles all database operations for the Student Management System"""
     
-    def __init__(self, db_name: str = "students.db"):
-        """Initialize database connection and create tables if they don't exist"""
+    def __init__(self, db_name: str = "students.db", pool_size: int = 5,
+                 idle_timeout: float = 60.0, profile: str = DEFAULT_STORAGE_PROFILE,
+                 grade_scale: Optional[GradeScale] = None,
+                 cache_size: int = 1024, cache_ttl: Optional[float] = 30.0,
+                 password_policy: Optional[HashPolicy] = None, audit_queue_size: int = 10000,
+                 trusted: bool = False):
+        """
+        Initialize database connection pool and create tables if they don't exist
+        (skipped when the schema version shows they already do)
+        pool_size limits open connections, idle_timeout closes unused ones (seconds),
+        profile names an entry of STORAGE_PROFILES, grade_scale sets the grading policy,
+        cache_size/cache_ttl size the roll number lookup cache (0 disables it),
+        password_policy sets the password hash cost (see auth.py),
+        audit_queue_size bounds the audit entries waiting to be written,
+        trusted lets callers without a session manage users (admin scripts)
+        """
         self.db_name = db_name
-        self.create_tables()
-        self.create_default_admin()
+        self.grade_scale = grade_scale or GradeScale()
+        self.profile = self._check_profile(profile)
+        self.pool = ConnectionPool(db_name, max_size=pool_size, idle_timeout=idle_timeout,
+                                   connect=self._connect)
+        self.cache = LRUCache(maxsize=cache_size, ttl=cache_ttl)
+        self.diagnostics: Optional[QueryDiagnostics] = None
+        self.password_policy = password_policy or DEFAULT_HASH_POLICY
+        self.throttle = LoginThrottle()
+        self.sessions = SessionManager()
+        # What calls made without a session (use_session) may do
+        self.sessionless_permissions = ALL_PERMISSIONS if trusted else SESSIONLESS_PERMISSIONS
+        self.audit = AuditLog(self._connect, max_queue=audit_queue_size)
+        # Connection pinned by transaction() and the bound session, per thread
+        self._local = threading.local()
+        self.ensure_schema()
+    
+    @staticmethod
+    def _check_profile(profile: str) -> str:
+        if profile not in STORAGE_PROFILES:
+            raise ValueError(
+                f"Unknown storage profile '{profile}' "
+                f"(expected one of: {', '.join(STORAGE_PROFILES)})"
+            )
+        return profile
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Open a new connection configured for the active storage profile"""
+        conn = sqlite3.connect(self.db_name, check_same_thread=False)
+        settings = STORAGE_PROFILES[self.profile]
+        # journal_mode is stored in the database file, the rest is per connection
+        conn.execute(f"PRAGMA journal_mode = {settings['journal_mode']}")
+        conn.execute(f"PRAGMA synchronous = {settings['synchronous']}")
+        conn.execute(f"PRAGMA cache_size = {int(settings['cache_size'])}")
+        conn.execute(f"PRAGMA mmap_size = {int(settings['mmap_size'])}")
+        conn.execute(f"PRAGMA temp_store = {settings['temp_store']}")
+        return conn
+    
+    def get_storage_profile(self) -> Dict[str, Any]:
+        """Return the active storage profile name and its settings"""
+        return dict(STORAGE_PROFILES[self.profile], name=self.profile)
+    
+    def set_storage_profile(self, profile: str):
+        """
+        Switch storage profile, e.g. to "bulk-load" around a large import
+        Idle connections are reopened with the new settings; connections
+        currently in use keep the old ones until they are next opened
+        """
+        self.profile = self._check_profile(profile)
+        self.pool.close_idle()
     
     def get_connection(self):
-        """Create and return a database connection"""
-        return sqlite3.connect(self.db_name)
+        """
+        Get a pooled database connection
+        Calling close() on it returns it to the pool for reuse
+        Inside transaction() it is a savepoint on the transaction's connection
+        """
+        pinned = getattr(self._local, "conn", None)
+        conn = SavepointConnection(pinned) if pinned is not None else self.pool.acquire()
+        if self.diagnostics is not None:
+            return self.diagnostics.wrap(conn)
+        return conn
+    
+    @contextmanager
+    def transaction(self):
+        """
+        Run every Database call made by this thread in the with block on one
+        connection and in one transaction, committed when the block exits
+        (rolled back if it raises). Each call still succeeds or fails on its
+        own: a failed call only undoes its own changes.
+        """
+        if getattr(self._local, "conn", None) is not None:
+            # Already inside a transaction on this thread
+            yield self
+            return
+        
+        pooled = self.pool.acquire()
+        conn = pooled.raw
+        conn.execute("BEGIN")
+        self._local.conn = conn
+        # Audit entries wait for the commit; a rollback discards them
+        self._local.audit = staged = []
+        try:
+            yield self
+        except BaseException:
+            self._local.conn = None
+            self._local.audit = None
+            conn.rollback()
+            raise
+        else:
+            self._local.conn = None
+            self._local.audit = None
+            conn.commit()
+            if staged:
+                self.audit.record(staged)
+        finally:
+            pooled.close()
+            # Calls inside the block may have cached uncommitted rows, and
+            # other threads may have cached rows this transaction replaced
+            self.cache.clear()
+    
+    def get_pool_stats(self) -> Dict[str, int]:
+        """Return connection pool counters (hits, waits, opens, ...)"""
+        return self.pool.stats()
+    
+    def get_cache_stats(self) -> Dict[str, int]:
+        """Return lookup cache counters (hits, misses, evictions, ...)"""
+        return self.cache.stats()
+    
+    def clear_cache(self):
+        """
+        Forget all cached lookups
+        Needed only if another process changed the database and waiting
+        for cache_ttl is not acceptable
+        """
+        self.cache.clear()
+    
+    def enable_diagnostics(self, slow_ms: float = 50.0, max_slow: int = 200) -> QueryDiagnostics:
+        """
+        Start capturing query plans and timings of every statement run
+        Statements taking at least slow_ms go to the slow-query log
+        (the newest max_slow are kept). Returns the collector.
+        """
+        self.diagnostics = QueryDiagnostics(slow_ms=slow_ms, max_slow=max_slow)
+        return self.diagnostics
+    
+    def disable_diagnostics(self):
+        """Stop capturing query plans (connections in use finish their statements)"""
+        self.diagnostics = None
+    
+    def get_diagnostics_report(self) -> Optional[Dict[str, Any]]:
+        """Plans, full scans and slow queries captured so far, or None if disabled"""
+        if self.diagnostics is None:
+            return None
+        return self.diagnostics.report()
+    
+    def close(self):
+        """Write pending audit entries and close all pooled connections"""
+        self.audit.close()
+        self.pool.close()
+    
+    def get_schema_version(self) -> int:
+        """Schema version stored in the database file (PRAGMA user_version)"""
+        conn = self.get_connection()
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        conn.close()
+        return version
+    
+    def ensure_schema(self) -> bool:
+        """
+        Apply pending MIGRATIONS, so a normal start reads one PRAGMA instead
+        of running every CREATE ... IF NOT EXISTS again
+        Returns True if the schema had to be upgraded
+        """
+        if self.get_schema_version() >= SCHEMA_VERSION:
+            return False
+        
+        self.get_migrator().migrate()
+        self.cache.clear()
+        return True
+    
+    def get_migrator(self, chunk_size: int = DEFAULT_CHUNK_SIZE, pause: float = DEFAULT_PAUSE,
+                     progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> Migrator:
+        """
+        Migrator for this database file, on a connection of its own
+        (use it for dry runs, progress reporting or a specific target version)
+        """
+        return Migrator(self._connect, MIGRATIONS, chunk_size=chunk_size,
+                        pause=pause, progress=progress)
     
     def create_tables(self):
         """Create students and admin tables if they don't exist"""
         conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        # Create students table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS students (
-                roll_no INTEGER PRIMARY KEY,
-                name TEXT NOT NULL,
-                marks REAL NOT NULL,
-                grade TEXT NOT NULL
-            )
-        """)
-        
-        # Create admin table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS admin (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                username TEXT UNIQUE NOT NULL,
-                password TEXT NOT NULL
-            )
-        """)
-        
+        create_schema(conn)
         conn.commit()
         conn.close()
     
     def create_default_admin(self):
         """Create default admin account (admin/1234) if it doesn't exist"""
         conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        try:
-            cursor.execute(
-                "INSERT INTO admin (username, password) VALUES (?, ?)",
-                ("admin", "1234")
-            )
-            conn.commit()
-        except sqlite3.IntegrityError:
-            # Admin already exists
-            pass
-        finally:
-            conn.close()
+        create_default_admin(conn)
+        conn.commit()
+        conn.close()
     
     # ==================== AUTHENTICATION ====================
     
     def verify_login(self, username: str, password: str) -> bool:
         """
         Verify admin login credentials
-        Returns True if credentials are valid, False otherwise
+        Returns True if credentials are valid, False otherwise (including
+        while the username is throttled after repeated failures)
+        """
+        try:
+            self._check_credentials(username, password)
+        except AuthenticationError:
+            return False
+        return True
+    
+    def login(self, username: str, password: str) -> Session:
+        """
+        Verify credentials once and start an in-process session
+        Raises LoginThrottled after too many failures for the username,
+        AuthenticationError for a wrong username or password or a
+        disabled account
+        """
+        role = self._check_credentials(username, password)
+        return self.sessions.create(username, role)
+    
+    def get_session(self, token: Optional[str]) -> Optional[Session]:
+        """The live session for token, or None if it expired or was ended"""
+        return self.sessions.get(token)
+    
+    @property
+    def session(self) -> Optional[Session]:
+        """The session bound to the calling thread (use_session), or None"""
+        return getattr(self._local, "session", None)
+    
+    def use_session(self, session: Optional[Session]):
+        """
+        Check the calling thread's write and user management calls against
+        session's role from now on, and credit its changes in the audit log
+        to the session's user. Other threads keep their own session; None
+        leaves the thread with sessionless_permissions.
+        """
+        self._local.session = session
+    
+    @contextmanager
+    def bound_session(self, session: Optional[Session]):
+        """Use session on the calling thread for the duration of the block"""
+        previous = self.session
+        self._local.session = session
+        try:
+            yield session
+        finally:
+            self._local.session = previous
+    
+    def logout(self, token: Optional[str]):
+        """End the session for token"""
+        self.sessions.revoke(token)
+        if self.session is not None and self.session.token == token:
+            self._local.session = None
+    
+    # ==================== AUDIT LOG ====================
+    
+    def _audit_user(self) -> Optional[str]:
+        """Username recorded with changes (None for unauthenticated local scripts)"""
+        return self.session.username if self.session is not None else None
+    
+    def _audit(self, action: str, roll_no: int, before: Optional[tuple] = None,
+               after: Optional[tuple] = None):
+        """
+        Queue an audit entry for a committed change
+        Inside transaction() the entry waits until the whole transaction commits
+        """
+        entry = make_entry(action, roll_no, self._audit_user(), before, after)
+        staged = getattr(self._local, "audit", None)
+        if staged is not None:
+            staged.append(entry)
+        else:
+            self.audit.record([entry])
+    
+    def get_student_history(self, roll_no: int, limit: int = 100) -> List[AuditEntry]:
+        """Changes to one student, newest first"""
+        return self.get_audit_log(roll_no=roll_no, limit=limit)
+    
+    def get_audit_log(self, roll_no: Optional[int] = None, username: Optional[str] = None,
+                      action: Optional[str] = None, since: Optional[float] = None,
+                      until: Optional[float] = None, limit: int = 100) -> List[AuditEntry]:
+        """
+        Audit entries matching every given filter, newest first
+        since and until are Unix timestamps. Queued entries are written
+        first, so the result includes changes made just before the call
+        (changes inside an open transaction() appear once it commits).
+        """
+        if action is not None and action not in ACTIONS:
+            raise ValueError(f"Unknown action '{action}'")
+        self.audit.flush(timeout=5.0)
+        
+        clauses, params = [], []
+        for clause, value in (("roll_no = ?", roll_no), ("username = ?", username),
+                              ("action = ?", action), ("changed_at >= ?", since),
+                              ("changed_at < ?", until)):
+            if value is not None:
+                clauses.append(clause)
+                params.append(value)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute(
+            f"SELECT {AUDIT_COLUMNS} FROM audit_log {where} "
+            f"ORDER BY changed_at DESC, id DESC LIMIT ?",
+            params + [limit]
+        )
+        entries = [AuditEntry(*row) for row in cursor.fetchall()]
+        conn.close()
+        return entries
+    
+    def get_audit_stats(self) -> Dict[str, int]:
+        """Audit writer counters: queued, written, batches, blocked, dropped, pending, ..."""
+        return self.audit.stats()
+    
+    def _check_credentials(self, username: str, password: str) -> str:
+        """Returns the user's role; raises AuthenticationError"""
+        role, upgrade = self.verify_credentials(username, password)
+        if upgrade is not None:
+            self.store_password_upgrade(upgrade)
+        return role
+    
+    def verify_credentials(self, username: str, password: str) -> Tuple[str, Optional[Tuple]]:
+        """
+        Check a login without writing to the database
+        Returns (role, upgrade): upgrade is None, or a new hash for a
+        plaintext or outdated one, to be saved with store_password_upgrade.
+        Raises LoginThrottled or AuthenticationError like login().
         """
+        retry_after = self.throttle.check(username)
+        if retry_after > 0:
+            raise LoginThrottled(username, retry_after)
+        
         conn = self.get_connection()
         cursor = conn.cursor()
         
         cursor.execute(
-            "SELECT * FROM admin WHERE username = ? AND password = ?",
-            (username, password)
+            "SELECT id, password, role, disabled FROM admin WHERE username = ?",
+            (username,)
         )
         
         result = cursor.fetchone()
         conn.close()
         
-        return result is not None
+        stored = result[1] if result else None
+        if not self.password_policy.verify(password, stored):
+            self.throttle.failure(username)
+            raise AuthenticationError("Invalid username or password!")
+        self.throttle.success(username)
+        
+        if result[3]:
+            raise AuthenticationError(f"The account '{username}' is disabled")
+        
+        # Upgrade plaintext rows and hashes made under an older cost setting
+        upgrade = None
+        if self.password_policy.needs_rehash(stored):
+            upgrade = (result[0], stored, self.password_policy.hash(password))
+        return result[2], upgrade
+    
+    def store_password_upgrade(self, upgrade: Tuple):
+        """
+        Save a rehashed password from verify_credentials, unless the
+        password was changed in the meantime
+        """
+        admin_id, old_hash, new_hash = upgrade
+        conn = self.get_connection()
+        conn.execute("UPDATE admin SET password = ? WHERE id = ? AND password = ?",
+                     (new_hash, admin_id, old_hash))
+        conn.commit()
+        conn.close()
+    
+    # ==================== USER MANAGEMENT ====================
+    
+    @requires(MANAGE_USERS)
+    def list_users(self) -> List[Tuple[str, str, bool]]:
+        """All users as (username, role, disabled), by username"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute("SELECT username, role, disabled FROM admin ORDER BY username")
+        
+        users = [(username, role, bool(disabled)) for username, role, disabled in cursor.fetchall()]
+        conn.close()
+        return users
+    
+    @requires(MANAGE_USERS)
+    def create_user(self, username: str, password: str, role: str = "viewer") -> Tuple[bool, str]:
+        """
+        Add a user who can log in with password
+        Returns (success: bool, message: str)
+        """
+        username = username.strip()
+        if not username:
+            return (False, "Username cannot be empty!")
+        if role not in ROLES:
+            return (False, f"Unknown role '{role}' (expected one of: {', '.join(ROLES)})")
+        if len(password) < MIN_PASSWORD_LENGTH:
+            return (False, f"Password must be at least {MIN_PASSWORD_LENGTH} characters!")
+        
+        password_hash = self.password_policy.hash(password)
+        conn = self.get_connection()
+        
+        try:
+            conn.execute(
+                "INSERT INTO admin (username, password, role) VALUES (?, ?, ?)",
+                (username, password_hash, role)
+            )
+            conn.commit()
+            conn.close()
+            return (True, f"User '{username}' created as {role}!")
+        except sqlite3.IntegrityError:
+            conn.close()
+            return (False, f"User '{username}' already exists!")
+        except Exception as e:
+            conn.close()
+            return (False, f"Error: {str(e)}")
+    
+    @requires(MANAGE_USERS)
+    def set_user_role(self, username: str, role: str) -> Tuple[bool, str]:
+        """Change a user's role; live sessions pick it up immediately"""
+        if role not in ROLES:
+            return (False, f"Unknown role '{role}' (expected one of: {', '.join(ROLES)})")
+        result = self._update_user(username, "role = ?", (role,),
+                                   removes_admin=role != "admin")
+        if result[0]:
+            self.sessions.update_role(username, role)
+            return (True, f"User '{username}' is now {role}!")
+        return result
+    
+    @requires(MANAGE_USERS)
+    def set_user_disabled(self, username: str, disabled: bool = True) -> Tuple[bool, str]:
+        """Disable (or re-enable) a user; disabling ends their sessions"""
+        result = self._update_user(username, "disabled = ?", (int(disabled),),
+                                   removes_admin=disabled)
+        if result[0]:
+            if disabled:
+                self.sessions.revoke_user(username)
+            return (True, f"User '{username}' {'disabled' if disabled else 'enabled'}!")
+        return result
+    
+    def change_password(self, username: str, new_password: str) -> Tuple[bool, str]:
+        """
+        Set a user's password. Users may change their own; changing anyone
+        else's needs the admin role, and without a session a trusted
+        Database. Other sessions of the user are ended.
+        """
+        session = self.session
+        if session is None:
+            if MANAGE_USERS not in self.sessionless_permissions:
+                raise PermissionDenied(None, MANAGE_USERS)
+        elif not (session.username == username and session.allows(READ)) \
+                and not session.allows(MANAGE_USERS):
+            raise PermissionDenied(session, MANAGE_USERS)
+        if len(new_password) < MIN_PASSWORD_LENGTH:
+            return (False, f"Password must be at least {MIN_PASSWORD_LENGTH} characters!")
+        
+        result = self._update_user(username, "password = ?",
+                                   (self.password_policy.hash(new_password),))
+        if result[0]:
+            self.sessions.revoke_user(username, keep=session.token if session is not None else None)
+            self.throttle.success(username)
+            return (True, f"Password changed for '{username}'!")
+        return result
+    
+    def _update_user(self, username: str, assignment: str, values: tuple,
+                     removes_admin: bool = False) -> Tuple[bool, str]:
+        """
+        UPDATE one admin row, refusing to leave no enabled admin behind
+        when removes_admin (the change demotes or disables the user)
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        try:
+            if removes_admin:
+                cursor.execute(
+                    "SELECT COUNT(*) FROM admin WHERE role = 'admin' AND disabled = 0 "
+                    "AND username != ?",
+                    (username,)
+                )
+                if cursor.fetchone()[0] == 0:
+                    conn.close()
+                    return (False, "At least one enabled admin must remain!")
+            
+            cursor.execute(f"UPDATE admin SET {assignment} WHERE username = ?", values + (username,))
+            if cursor.rowcount == 0:
+                conn.close()
+                return (False, f"No user named '{username}'!")
+            conn.commit()
+            conn.close()
+            return (True, "")
+        except Exception as e:
+            conn.close()
+            return (False, f"Error: {str(e)}")
     
     # ==================== STUDENT CRUD OPERATIONS ====================
     
     def calculate_grade(self, marks: float) -> str:
         """Calculate grade based on marks"""
-        if marks >= 90:
-            return "A+"
-        elif marks >= 80:
-            return "A"
-        elif marks >= 70:
-            return "B+"
-        elif marks >= 60:
-            return "B"
-        elif marks >= 50:
-            return "C"
-        elif marks >= 40:
-            return "D"
-        else:
-            return "F"
+        return self.grade_scale.grade(marks)
     
+    @requires(WRITE)
     def add_student(self, roll_no: int, name: str, marks: float) -> Tuple[bool, str]:
         """
         Add a new student to the database
@@ -112,12 +1054,11 @@ class Database:
         
         try:
             grade = self.calculate_grade(marks)
-            cursor.execute(
-                "INSERT INTO students (roll_no, name, marks, grade) VALUES (?, ?, ?, ?)",
-                (roll_no, name, marks, grade)
-            )
+            cursor.execute(INSERT_STUDENT_SQL, (roll_no, name, marks, grade))
             conn.commit()
             conn.close()
+            self.cache.invalidate(roll_no)
+            self._audit("insert", roll_no, after=(name, marks, grade))
             return (True, "Student added successfully!")
         except sqlite3.IntegrityError:
             conn.close()
@@ -126,6 +1067,7 @@ class Database:
             conn.close()
             return (False, f"Error: {str(e)}")
     
+    @requires(WRITE)
     def update_student(self, roll_no: int, name: str, marks: float) -> Tuple[bool, str]:
         """
         Update existing student record
@@ -136,22 +1078,26 @@ class Database:
         
         try:
             grade = self.calculate_grade(marks)
+            before = self._stored_values(conn, cursor, roll_no)
+            if before is None:
+                conn.close()
+                return (False, f"Roll number {roll_no} not found!")
+            
             cursor.execute(
                 "UPDATE students SET name = ?, marks = ?, grade = ? WHERE roll_no = ?",
                 (name, marks, grade, roll_no)
             )
             
-            if cursor.rowcount == 0:
-                conn.close()
-                return (False, f"Roll number {roll_no} not found!")
-            
             conn.commit()
             conn.close()
+            self.cache.invalidate(roll_no)
+            self._audit("update", roll_no, before=before, after=(name, marks, grade))
             return (True, "Student updated successfully!")
         except Exception as e:
             conn.close()
             return (False, f"Error: {str(e)}")
     
+    @requires(WRITE)
     def delete_student(self, roll_no: int) -> Tuple[bool, str]:
         """
         Delete student by roll number
@@ -161,24 +1107,44 @@ class Database:
         cursor = conn.cursor()
         
         try:
-            cursor.execute("DELETE FROM students WHERE roll_no = ?", (roll_no,))
-            
-            if cursor.rowcount == 0:
+            before = self._stored_values(conn, cursor, roll_no)
+            if before is None:
                 conn.close()
                 return (False, f"Roll number {roll_no} not found!")
             
+            cursor.execute("DELETE FROM students WHERE roll_no = ?", (roll_no,))
+            
             conn.commit()
             conn.close()
+            self.cache.invalidate(roll_no)
+            self._audit("delete", roll_no, before=before)
             return (True, "Student deleted successfully!")
         except Exception as e:
             conn.close()
             return (False, f"Error: {str(e)}")
     
+    @staticmethod
+    def _stored_values(conn, cursor, roll_no: int) -> Optional[Tuple]:
+        """
+        (name, marks, grade) of a student about to be changed, read under
+        the write lock so the audit log's "before" values are exact
+        """
+        if not conn.in_transaction:
+            cursor.execute("BEGIN IMMEDIATE")
+        cursor.execute("SELECT name, marks, grade FROM students WHERE roll_no = ?", (roll_no,))
+        return cursor.fetchone()
+    
     def search_student(self, roll_no: int) -> Optional[Tuple]:
         """
         Search for student by roll number
         Returns student data tuple or None if not found
+        Served from the lookup cache when possible; misses are cached too
         """
+        result = self.cache.get(roll_no)
+        if result is not MISSING:
+            return result
+        
+        token = self.cache.begin()
         conn = self.get_connection()
         cursor = conn.cursor()
         
@@ -186,8 +1152,204 @@ class Database:
         result = cursor.fetchone()
         conn.close()
         
+        self.cache.put(roll_no, result, token)
         return result
     
+    def search_by_name(self, query: str, limit: int = 20, fuzzy: bool = True) -> List[Tuple]:
+        """
+        Find students by (partial) name, best matches first
+        Every word of the query is matched as a word prefix ("ra sh" finds
+        "Rahul Sharma"). With fuzzy=True, remaining slots are filled from the
+        trigram index, which tolerates typos and matches inside words.
+        Only the first RANK_CANDIDATES matches of each index are ranked.
+        Falls back to a LIKE scan when SQLite lacks FTS5.
+        """
+        words = re.findall(r"\w+", query.lower())
+        if not words:
+            return []
+        
+        fts5, trigram = fts_support()
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        if not fts5:
+            escaped = query.strip().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            pattern = f"%{escaped}%"
+            cursor.execute(
+                "SELECT * FROM students WHERE name LIKE ? ESCAPE '\\' ORDER BY name LIMIT ?",
+                (pattern, limit)
+            )
+            results = cursor.fetchall()
+            conn.close()
+            return results
+        
+        # Quoted terms so user input can't inject FTS5 query syntax
+        prefix_query = " AND ".join(f'"{word}"*' for word in words)
+        cursor.execute(self._ranked_match_sql(NAME_INDEX_TABLE), (prefix_query, limit))
+        results = cursor.fetchall()
+        
+        text = " ".join(words)
+        if fuzzy and trigram and len(results) < limit and len(text) >= 3:
+            # Any shared trigram matches; bm25 ranks names sharing more first
+            trigrams = {text[i:i + 3] for i in range(len(text) - 2)}
+            fuzzy_query = " OR ".join(f'"{gram}"' for gram in sorted(trigrams))
+            seen = {row[0] for row in results}
+            cursor.execute(self._ranked_match_sql(TRIGRAM_INDEX_TABLE),
+                           (fuzzy_query, limit + len(seen)))
+            for row in cursor.fetchall():
+                if row[0] not in seen and len(results) < limit:
+                    results.append(row)
+        
+        conn.close()
+        return results
+    
+    # ==================== FILTERED QUERIES ====================
+    
+    def _filter_sql(self, grades: Optional[Iterable[str]] = None,
+                    min_marks: Optional[float] = None, max_marks: Optional[float] = None,
+                    name_prefix: Optional[str] = None) -> Tuple[str, List]:
+        """
+        WHERE clause and parameters for the given filters
+        Conditions are always added in the same order, so the same set of
+        filters always produces the same SQL text (and reuses its plan)
+        """
+        conditions = []
+        params: List = []
+        
+        if grades is not None:
+            grades = list(grades)
+            if not grades:
+                return " WHERE 0", []
+            conditions.append(f"grade IN ({', '.join('?' * len(grades))})")
+            params.extend(grades)
+        if min_marks is not None:
+            conditions.append("marks >= ?")
+            params.append(float(min_marks))
+        if max_marks is not None:
+            conditions.append("marks <= ?")
+            params.append(float(max_marks))
+        if name_prefix:
+            escaped = name_prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            # Case-insensitive LIKE 'x%' can seek idx_students_name (NOCASE)
+            conditions.append("name LIKE ? ESCAPE '\\'")
+            params.append(f"{escaped}%")
+        
+        if not conditions:
+            return "", params
+        return " WHERE " + " AND ".join(conditions), params
+    
+    def query_students(self, grades: Optional[Iterable[str]] = None,
+                       min_marks: Optional[float] = None, max_marks: Optional[float] = None,
+                       name_prefix: Optional[str] = None, sort_by: str = "roll_no",
+                       descending: bool = False, limit: Optional[int] = None,
+                       offset: int = 0) -> List[Tuple]:
+        """
+        Get students matching all given filters, sorted by sort_by
+        grades: allowed grades, e.g. grade_scale.grades_from("B+", "below")
+        min_marks / max_marks: inclusive marks range
+        name_prefix: case-insensitive start of the name
+        sort_by: one of SORT_COLUMNS (roll_no, name, marks, grade; grade
+        orders by grade rank, lowest first unless descending)
+        """
+        sql, params = self._query_sql(grades, min_marks, max_marks, name_prefix,
+                                      sort_by, descending)
+        
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute(f"{sql} LIMIT ? OFFSET ?", params + [-1 if limit is None else limit, offset])
+        results = cursor.fetchall()
+        conn.close()
+        
+        return results
+    
+    def iter_query_students(self, grades: Optional[Iterable[str]] = None,
+                            min_marks: Optional[float] = None, max_marks: Optional[float] = None,
+                            name_prefix: Optional[str] = None, sort_by: str = "roll_no",
+                            descending: bool = False, batch_size: int = 1000) -> Iterator[Tuple]:
+        """
+        Stream the students query_students would return, without a limit
+        Rows are pulled with fetchmany; the connection is held until the
+        generator is exhausted or closed
+        """
+        sql, params = self._query_sql(grades, min_marks, max_marks, name_prefix,
+                                      sort_by, descending)
+        
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(sql, params)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            conn.close()
+    
+    def _query_sql(self, grades, min_marks, max_marks, name_prefix,
+                   sort_by: str, descending: bool) -> Tuple[str, List]:
+        """SELECT statement (without LIMIT) and parameters for query_students"""
+        if sort_by not in SORT_COLUMNS:
+            raise ValueError(
+                f"Unknown sort key '{sort_by}' (expected one of: {', '.join(SORT_COLUMNS)})"
+            )
+        
+        where_sql, params = self._filter_sql(grades, min_marks, max_marks, name_prefix)
+        direction = "DESC" if descending else "ASC"
+        order_sql = f" ORDER BY {SORT_COLUMNS[sort_by]} {direction}"
+        if sort_by != "roll_no":
+            order_sql += f", roll_no {direction}"
+        return f"SELECT * FROM students{where_sql}{order_sql}", params
+    
+    def count_students(self, grades: Optional[Iterable[str]] = None,
+                       min_marks: Optional[float] = None, max_marks: Optional[float] = None,
+                       name_prefix: Optional[str] = None) -> int:
+        """Count students matching the same filters as query_students"""
+        where_sql, params = self._filter_sql(grades, min_marks, max_marks, name_prefix)
+        if not where_sql:
+            return self.get_student_count()
+        
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute(f"SELECT COUNT(*) FROM students{where_sql}", params)
+        result = cursor.fetchone()
+        conn.close()
+        
+        return result[0]
+    
+    @staticmethod
+    def _ranked_match_sql(table: str) -> str:
+        """Students matching an FTS query on table, best first (params: query, limit)"""
+        return (
+            f"SELECT students.* FROM ("
+            f"SELECT rowid, rank FROM {table} WHERE {table} MATCH ? LIMIT {RANK_CANDIDATES}"
+            f") AS matches JOIN students ON students.roll_no = matches.rowid "
+            f"ORDER BY matches.rank LIMIT ?"
+        )
+    
+    def get_students_by_roll_nos(self, roll_nos: Iterable[int]) -> List[Tuple]:
+        """
+        Get the students with the given roll numbers, in the order given
+        Unknown roll numbers are skipped
+        """
+        roll_nos = list(roll_nos)
+        found = {}
+        
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        # Stay well below SQLite's bound-parameter limit
+        for start in range(0, len(roll_nos), 500):
+            part = roll_nos[start:start + 500]
+            placeholders = ", ".join("?" * len(part))
+            cursor.execute(f"SELECT * FROM students WHERE roll_no IN ({placeholders})", part)
+            found.update((row[0], row) for row in cursor.fetchall())
+        conn.close()
+        
+        return [found[roll_no] for roll_no in roll_nos if roll_no in found]
+    
     def get_all_students(self) -> List[Tuple]:
         """
         Get all students from database
@@ -202,6 +1364,109 @@ class Database:
         
         return results
     
+    def get_students_page(self, after_roll_no: Optional[int] = None,
+                          limit: int = 100) -> List[Tuple]:
+        """
+        Get up to limit students ordered by roll number, starting after
+        after_roll_no (keyset pagination; None starts from the beginning)
+        Pass the last roll number of a page to get the next one
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        if after_roll_no is None:
+            cursor.execute("SELECT * FROM students ORDER BY roll_no LIMIT ?", (limit,))
+        else:
+            cursor.execute(
+                "SELECT * FROM students WHERE roll_no > ? ORDER BY roll_no LIMIT ?",
+                (after_roll_no, limit)
+            )
+        results = cursor.fetchall()
+        conn.close()
+        
+        return results
+    
+    def iter_student_pages(self, page_size: int = 500,
+                           after_roll_no: Optional[int] = None) -> Iterator[List[Tuple]]:
+        """
+        Yield successive pages of students ordered by roll number
+        Each page is a separate keyset query, so no connection is held between pages
+        """
+        while True:
+            page = self.get_students_page(after_roll_no, page_size)
+            if not page:
+                return
+            yield page
+            if len(page) < page_size:
+                return
+            after_roll_no = page[-1][0]
+    
+    def get_students_window(self, offset: int, limit: int) -> List[Tuple]:
+        """
+        Get up to limit students ordered by roll number, skipping the first offset
+        Used for random access (e.g. dragging a scrollbar); prefer
+        get_students_page for sequential reads
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute(
+            "SELECT * FROM students ORDER BY roll_no LIMIT ? OFFSET ?",
+            (limit, offset)
+        )
+        results = cursor.fetchall()
+        conn.close()
+        
+        return results
+    
+    def get_student_count(self) -> int:
+        """Return the number of students"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute("SELECT student_count FROM student_stats WHERE id = 1")
+        result = cursor.fetchone()
+        conn.close()
+        
+        return result[0]
+    
+    def iter_students(self, batch_size: int = 1000) -> Iterator[Tuple]:
+        """
+        Stream all students ordered by roll number
+        Rows are pulled from the cursor with fetchmany, so memory stays
+        constant regardless of table size. The connection is held until the
+        generator is exhausted or closed.
+        """
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT * FROM students ORDER BY roll_no")
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            conn.close()
+    
+    def iter_marks(self, batch_size: int = 5000) -> Iterator[List[Tuple[int, float]]]:
+        """
+        Stream (roll_no, marks) pairs ordered by marks then roll number
+        idx_students_marks covers this query and already has that order, so
+        neither student rows nor a sort are needed
+        """
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT roll_no, marks FROM students ORDER BY marks, roll_no")
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield rows
+        finally:
+            conn.close()
+    
     def get_class_average(self) -> Optional[float]:
         """
         Calculate and return class average marks
@@ -210,7 +1475,11 @@ class Database:
         conn = self.get_connection()
         cursor = conn.cursor()
         
-        cursor.execute("SELECT AVG(marks) FROM students")
+        # Served from the running totals in student_stats
+        cursor.execute(
+            "SELECT CASE WHEN student_count > 0 THEN marks_total / student_count END "
+            "FROM student_stats WHERE id = 1"
+        )
         result = cursor.fetchone()
         conn.close()
         
@@ -218,13 +1487,18 @@ class Database:
     
     def get_topper(self) -> Optional[Tuple]:
         """
-        Get the student with highest marks
+        Get the student with highest marks (lowest roll number on ties)
         Returns student data tuple or None if no students
         """
         conn = self.get_connection()
         cursor = conn.cursor()
         
-        cursor.execute("SELECT * FROM students ORDER BY marks DESC LIMIT 1")
+        # The topper's roll number is maintained in student_stats
+        cursor.execute(
+            "SELECT students.* FROM student_stats "
+            "JOIN students ON students.roll_no = student_stats.topper_roll_no "
+            "WHERE student_stats.id = 1"
+        )
         result = cursor.fetchone()
         conn.close()
         
@@ -232,4 +1506,301 @@ class Database:
     
     def student_exists(self, roll_no: int) -> bool:
         """Check if student with given roll number exists"""
-        return self.search_student(roll_no) is not None
\ No newline at end of file
+        return self.search_student(roll_no) is not None
+    
+    def get_student_stats(self) -> Dict[str, Any]:
+        """
+        Return the running aggregates: count, total, min, max, average,
+        topper roll number and the change version
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute(
+            "SELECT student_count, marks_total, min_marks, max_marks, topper_roll_no, version "
+            "FROM student_stats WHERE id = 1"
+        )
+        count, total, min_marks, max_marks, topper, version = cursor.fetchone()
+        conn.close()
+        
+        return {
+            "count": count,
+            "total": total,
+            "min": min_marks,
+            "max": max_marks,
+            "average": total / count if count else None,
+            "topper_roll_no": topper,
+            "version": version,
+        }
+    
+    @requires(WRITE)
+    def rebuild_stats(self):
+        """
+        Recompute student_stats from the students table
+        Normally unnecessary; clears any floating point drift in marks_total
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute(f"""
+            UPDATE student_stats SET
+                student_count = (SELECT COUNT(*) FROM students),
+                marks_total = (SELECT COALESCE(SUM(marks), 0) FROM students),
+                min_marks = (SELECT MIN(marks) FROM students),
+                max_marks = (SELECT MAX(marks) FROM students),
+                topper_roll_no = {TOPPER_SUBQUERY},
+                version = version + 1
+            WHERE id = 1
+        """)
+        conn.commit()
+        conn.close()
+    
+    # ==================== GRADING POLICY ====================
+    
+    @requires(WRITE)
+    def set_grade_scale(self, grade_scale: GradeScale, regrade: bool = True) -> Tuple[bool, str]:
+        """
+        Change the grading policy, by default regrading every stored student
+        Returns (success: bool, message: str)
+        """
+        self.grade_scale = grade_scale
+        if not regrade:
+            return (True, "Grade scale updated")
+        return self.regrade_all()
+    
+    @requires(WRITE)
+    def regrade_all(self) -> Tuple[bool, str]:
+        """
+        Recompute every stored grade with the current grade scale
+        Runs as one set-based UPDATE that only touches rows whose grade changes
+        Returns (success: bool, message: str)
+        """
+        case_sql, params = self.grade_scale.case_sql("marks")
+        
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        try:
+            # Audit rows for the changed grades go into the same transaction,
+            # straight from SQL, however many students change
+            cursor.execute(
+                f"INSERT INTO audit_log ({AUDIT_COLUMNS}) "
+                f"SELECT ?, ?, 'regrade', roll_no, name, marks, grade, name, marks, {case_sql} "
+                f"FROM students WHERE grade IS NOT {case_sql}",
+                [time.time(), self._audit_user()] + params + params
+            )
+            cursor.execute(
+                f"UPDATE students SET grade = {case_sql} WHERE grade IS NOT {case_sql}",
+                params + params
+            )
+            changed = cursor.rowcount
+            conn.commit()
+            conn.close()
+            if changed:
+                self.cache.clear()
+            return (True, f"{changed} grade(s) updated")
+        except Exception as e:
+            conn.close()
+            return (False, f"Error: {str(e)}")
+    
+    # ==================== BULK OPERATIONS ====================
+    
+    def parse_student_row(self, row: Any) -> Tuple[int, str, float]:
+        """
+        Convert a (roll_no, name, marks) sequence or a dict with those keys
+        into typed values. Raises ValueError with a user-facing message.
+        """
+        try:
+            if isinstance(row, dict):
+                roll_no, name, marks = row["roll_no"], row["name"], row["marks"]
+            else:
+                roll_no, name, marks = row[0], row[1], row[2]
+        except (KeyError, IndexError, TypeError):
+            raise ValueError("Row must contain roll_no, name and marks!")
+        
+        try:
+            roll_no = int(roll_no)
+        except (TypeError, ValueError):
+            raise ValueError("Roll number must be a valid integer!")
+        if roll_no <= 0:
+            raise ValueError("Roll number must be positive!")
+        
+        name = str(name).strip() if name is not None else ""
+        if not name:
+            raise ValueError("Name is required!")
+        
+        try:
+            marks = float(marks)
+        except (TypeError, ValueError):
+            raise ValueError("Marks must be a valid number!")
+        if marks < 0 or marks > 100:
+            raise ValueError("Marks must be between 0 and 100!")
+        
+        return (roll_no, name, marks)
+    
+    @requires(WRITE)
+    def add_students_bulk(self, students: Iterable, batch_size: int = 500,
+                          upsert: bool = False,
+                          progress: Optional[Callable[[int], None]] = None) -> Dict[str, Any]:
+        """
+        Insert many students in a single transaction
+        Rows are consumed lazily from the iterable and written in batches with
+        executemany. Invalid rows and duplicate roll numbers are reported per row
+        without aborting the rest of the import. With upsert=True, existing roll
+        numbers are updated like update_student instead of failing.
+        progress, if given, is called with the number of rows read after each batch.
+        Returns dict with success, message, inserted, updated and failed
+        (a list of (row_number, roll_no, message) tuples, row_number is 1-based)
+        """
+        result = {"success": True, "message": "", "inserted": 0, "updated": 0, "failed": []}
+        rows = iter(students)
+        row_number = 0
+        
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        try:
+            if not conn.in_transaction:
+                cursor.execute("BEGIN")
+            while True:
+                chunk = list(islice(rows, batch_size))
+                if not chunk:
+                    break
+                
+                parsed = []
+                for row in chunk:
+                    row_number += 1
+                    try:
+                        parsed.append((row_number, self.parse_student_row(row)))
+                    except ValueError as e:
+                        result["failed"].append((row_number, self._raw_roll_no(row), str(e)))
+                
+                # Grade the whole batch at once
+                grades = self.grade_scale.grade_many(values[2] for _, values in parsed)
+                batch = [
+                    (number, (roll_no, name, marks, grade))
+                    for (number, (roll_no, name, marks)), grade in zip(parsed, grades)
+                ]
+                
+                if batch:
+                    self._write_student_batch(cursor, batch, upsert, result)
+                
+                if progress is not None:
+                    progress(row_number)
+            
+            conn.commit()
+            conn.close()
+        except Exception as e:
+            conn.rollback()
+            conn.close()
+            result.update(success=False, inserted=0, updated=0,
+                          message=f"Error: {str(e)}")
+            return result
+        
+        if result["inserted"] or result["updated"]:
+            # One clear is cheaper than tracking every written roll number
+            self.cache.clear()
+        result["failed"].sort(key=lambda failure: failure[0])
+        result["message"] = (
+            f"{result['inserted']} added, {result['updated']} updated, "
+            f"{len(result['failed'])} failed"
+        )
+        return result
+    
+    def _write_student_batch(self, cursor, batch: List[Tuple[int, Tuple]], upsert: bool,
+                             result: Dict[str, Any]):
+        """
+        Write one batch inside a savepoint with a single executemany
+        If the batch hits a constraint error it is replayed row by row so only
+        the offending rows are reported. The batch's audit entries are written
+        in the same transaction, since the import already holds the write lock
+        """
+        sql = UPSERT_STUDENT_SQL if upsert else INSERT_STUDENT_SQL
+        params = [values for _, values in batch]
+        existing = self._existing_roll_nos(cursor, params) if upsert else {}
+        
+        cursor.execute("SAVEPOINT student_batch")
+        try:
+            cursor.executemany(sql, params)
+            cursor.execute("RELEASE student_batch")
+            write_entries(cursor, self._count_batch(params, existing, upsert, result))
+            return
+        except sqlite3.IntegrityError:
+            cursor.execute("ROLLBACK TO student_batch")
+            cursor.execute("RELEASE student_batch")
+        
+        entries = []
+        for row_number, values in batch:
+            try:
+                cursor.execute(sql, values)
+            except sqlite3.IntegrityError as e:
+                message = (f"Error: {str(e)}" if upsert
+                           else f"Roll number {values[0]} already exists!")
+                result["failed"].append((row_number, values[0], message))
+                continue
+            entries.extend(self._count_batch([values], existing, upsert, result))
+        write_entries(cursor, entries)
+    
+    def _existing_roll_nos(self, cursor, params: List[Tuple]) -> Dict[int, Tuple]:
+        """Return the stored (name, marks, grade) of a batch's roll numbers, by roll number"""
+        roll_nos = [values[0] for values in params]
+        existing = {}
+        # Stay well below SQLite's bound-parameter limit
+        for start in range(0, len(roll_nos), 500):
+            part = roll_nos[start:start + 500]
+            placeholders = ", ".join("?" * len(part))
+            cursor.execute(
+                f"SELECT roll_no, name, marks, grade FROM students WHERE roll_no IN ({placeholders})",
+                part
+            )
+            existing.update((row[0], row[1:]) for row in cursor.fetchall())
+        return existing
+    
+    def _count_batch(self, params: List[Tuple], existing: Dict[int, Tuple], upsert: bool,
+                     result: Dict[str, Any]) -> List[AuditEntry]:
+        """
+        Tally inserted/updated rows and return their audit entries
+        Updates existing as rows land, so a roll number repeated in the
+        import is audited against the values it was given just before
+        """
+        username = self._audit_user()
+        changed_at = time.time()
+        entries = []
+        for values in params:
+            roll_no, after = values[0], values[1:]
+            before = existing.get(roll_no)
+            if before is not None:
+                result["updated"] += 1
+                entries.append(make_entry("update", roll_no, username, before, after, changed_at))
+            else:
+                result["inserted"] += 1
+                entries.append(make_entry("insert", roll_no, username, None, after, changed_at))
+            if upsert:
+                existing[roll_no] = after
+        return entries
+    
+    @staticmethod
+    def _raw_roll_no(row: Any):
+        """Best-effort roll number of an unparseable row, for error reports"""
+        try:
+            return row["roll_no"] if isinstance(row, dict) else row[0]
+        except (KeyError, IndexError, TypeError):
+            return None
+
+
+_shared_databases: Dict[str, Database] = {}
+_shared_lock = threading.Lock()
+
+
+def shared_database(db_name: str = "students.db", **kwargs) -> Database:
+    """
+    The process-wide Database for db_name, created on first use
+    The login window and the dashboard share it, so the connection pool,
+    lookup cache and schema check are set up once per process; kwargs only
+    apply when it is created
+    """
+    with _shared_lock:
+        db = _shared_databases.get(db_name)
+        if db is None:
+            db = _shared_databases[db_name] = Database(db_name, **kwargs)
+        return db
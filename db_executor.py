@@ -0,0 +1,196 @@
+"""
+DB Executor Module for Student Management System
+Runs database calls off the Tk event thread and hands results back to it
+"""
+
+import itertools
+import queue
+import threading
+from typing import Any, Callable, Dict, Optional
+
+from instrumentation import callback_name, instrumentation, no_rows
+
+
+class Task:
+    """A submitted database call; cancelled tasks never deliver a result"""
+
+    def __init__(self, task_id: int, func: Callable, args: tuple, kwargs: dict,
+                 on_success: Optional[Callable[[Any], None]],
+                 on_error: Optional[Callable[[Exception], None]],
+                 key: Optional[str]):
+        self.id = task_id
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.on_success = on_success
+        self.on_error = on_error
+        self.key = key
+        self.cancelled = False
+
+    def cancel(self):
+        """Skip the call if it hasn't started, and drop its result otherwise"""
+        self.cancelled = True
+
+
+class DBExecutor:
+    """
+    Worker thread(s) for Database calls from a Tk application
+
+    Calls run on background threads; results are queued and picked up by a
+    root.after poll, so callbacks always run on the Tk thread and the worker
+    never touches Tk. Submitting with a key cancels any earlier task with the
+    same key that is still queued or running, so only the latest request for
+    e.g. the table contents is delivered. The default single worker keeps
+    database calls in submission order. initializer, if given, runs first
+    on every worker thread (e.g. to bind the user's session to it).
+    """
+
+    def __init__(self, root, workers: int = 1, poll_interval: int = 20,
+                 on_busy_change: Optional[Callable[[bool], None]] = None,
+                 on_error: Optional[Callable[[Exception], None]] = None,
+                 initializer: Optional[Callable[[], None]] = None):
+        self.root = root
+        self.initializer = initializer
+        self.poll_interval = poll_interval
+        self.on_busy_change = on_busy_change
+        self.on_error = on_error
+
+        self._tasks: "queue.Queue[Optional[Task]]" = queue.Queue()
+        self._results: "queue.Queue[tuple]" = queue.Queue()
+        self._ids = itertools.count(1)
+        self._latest: Dict[str, Task] = {}
+        self._pending = 0
+        self._poll_id = None
+        self._busy_reported = False
+        self._shutdown = False
+
+        self._threads = [
+            threading.Thread(target=self._worker, name=f"db-worker-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    @property
+    def busy(self) -> bool:
+        """True while any submitted task hasn't been delivered yet"""
+        return self._pending > 0
+
+    # ==================== SUBMISSION (Tk thread) ====================
+
+    def submit(self, func: Callable, *args,
+               on_success: Optional[Callable[[Any], None]] = None,
+               on_error: Optional[Callable[[Exception], None]] = None,
+               key: Optional[str] = None, **kwargs) -> Task:
+        """
+        Run func(*args, **kwargs) on a worker thread
+        on_success(result) or on_error(exception) is called on the Tk thread
+        """
+        if self._shutdown:
+            raise RuntimeError("DBExecutor has been shut down")
+
+        task = Task(next(self._ids), func, args, kwargs, on_success, on_error, key)
+        if key is not None:
+            self.cancel(key)
+            self._latest[key] = task
+
+        self._pending += 1
+        self._report_busy(True)
+
+        self._tasks.put(task)
+        if self._poll_id is None:
+            self._poll_id = self.root.after(self.poll_interval, self._poll)
+        return task
+
+    def cancel(self, key: str):
+        """Cancel the latest task submitted under key, if any"""
+        task = self._latest.pop(key, None)
+        if task is not None:
+            task.cancel()
+
+    def shutdown(self):
+        """Stop the workers; queued tasks are dropped"""
+        if self._shutdown:
+            return
+        self._shutdown = True
+        for task in list(self._latest.values()):
+            task.cancel()
+        self._latest.clear()
+        for _ in self._threads:
+            self._tasks.put(None)
+        if self._poll_id is not None:
+            try:
+                self.root.after_cancel(self._poll_id)
+            except Exception:
+                pass
+            self._poll_id = None
+
+    # ==================== WORKER ====================
+
+    def _worker(self):
+        if self.initializer is not None:
+            self.initializer()
+        while True:
+            task = self._tasks.get()
+            if task is None:
+                return
+            if task.cancelled:
+                self._results.put((task, False, None))
+                continue
+            try:
+                value = task.func(*task.args, **task.kwargs)
+            except Exception as e:
+                self._results.put((task, False, e))
+            else:
+                self._results.put((task, True, value))
+
+    # ==================== DELIVERY (Tk thread) ====================
+
+    def _poll(self):
+        self._poll_id = None
+        if self._shutdown:
+            return
+
+        try:
+            self._deliver_results()
+        finally:
+            # Keep polling even if a callback raised
+            if not self._shutdown:
+                if self._pending > 0:
+                    if self._poll_id is None:
+                        self._poll_id = self.root.after(self.poll_interval, self._poll)
+                else:
+                    self._report_busy(False)
+
+    def _report_busy(self, busy: bool):
+        if busy != self._busy_reported:
+            self._busy_reported = busy
+            if self.on_busy_change is not None:
+                self.on_busy_change(busy)
+
+    def _deliver_results(self):
+        while not self._shutdown:
+            try:
+                task, ok, value = self._results.get_nowait()
+            except queue.Empty:
+                return
+
+            self._pending -= 1
+            if task.key is not None and self._latest.get(task.key) is task:
+                del self._latest[task.key]
+            if task.cancelled:
+                continue
+
+            if ok:
+                if task.on_success is not None:
+                    self._call(task.on_success, value)
+            else:
+                handler = task.on_error or self.on_error
+                if handler is not None:
+                    self._call(handler, value)
+
+    @staticmethod
+    def _call(callback: Callable, value: Any):
+        # Callbacks are timed separately from the database call itself
+        instrumentation.call(f"gui.callback.{callback_name(callback)}", callback,
+                             (value,), {}, no_rows)
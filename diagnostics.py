@@ -0,0 +1,432 @@
+"""
+Diagnostics Module for Student Management System
+Query plans and a slow-query log for the statements Database runs
+
+    diag = db.enable_diagnostics(slow_ms=20)
+    ...
+    print(format_report(db.get_diagnostics_report()))
+
+Command line report (runs the read queries once against a database file):
+
+    python diagnostics.py students.db --slow-ms 5
+"""
+
+import argparse
+import json
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional, Sequence
+
+# Only these statements have a query plan worth keeping
+EXPLAINABLE = ("SELECT", "INSERT", "UPDATE", "DELETE", "REPLACE", "WITH")
+
+# "SCAN students" without an index is a full table scan; index scans read
+# "SCAN students USING [COVERING] INDEX ..."
+FULL_SCAN_PATTERN = re.compile(r"^SCAN (?:TABLE )?students\b(?!.*\bUSING\b)")
+
+# A scan under a LIMIT, with no ORDER BY or one on the rowid (roll_no), walks
+# the table in rowid order and stops after LIMIT (+ OFFSET) rows: paging
+# reads like get_students_window, reported apart from unbounded scans (a
+# WHERE clause can still make it read further to fill the LIMIT)
+LIMIT_PATTERN = re.compile(r"\bLIMIT\b", re.IGNORECASE)
+ORDER_BY_PATTERN = re.compile(r"\bORDER BY\s+(.*?)(?=\bLIMIT\b|\)|$)", re.IGNORECASE)
+ROWID_ORDER_PATTERN = re.compile(r"^(?:students\.)?(?:roll_no|rowid)(?:\s+(?:ASC|DESC))?$",
+                                 re.IGNORECASE)
+
+
+def normalize_sql(sql: str) -> str:
+    """Collapse whitespace so the same statement always has the same key"""
+    return " ".join(sql.split())
+
+
+class StatementStats:
+    """Plan and timings of one distinct statement"""
+
+    def __init__(self, sql: str):
+        self.sql = sql
+        self.plan: List[tuple] = []
+        self.plan_error: Optional[str] = None
+        self.full_scan = False
+        self.bounded_scan = False
+        self.temp_btree = False
+        self.calls = 0
+        self.total_s = 0.0
+        self.max_s = 0.0
+        self.slow_calls = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "sql": self.sql,
+            "calls": self.calls,
+            "total_ms": round(self.total_s * 1000, 3),
+            "mean_ms": round(self.total_s / self.calls * 1000, 3) if self.calls else None,
+            "max_ms": round(self.max_s * 1000, 3),
+            "slow_calls": self.slow_calls,
+            "full_scan": self.full_scan,
+            "bounded_scan": self.bounded_scan,
+            "temp_btree": self.temp_btree,
+            "plan": [detail for _, _, detail in self.plan],
+            "plan_text": format_plan(self.plan),
+            "plan_error": self.plan_error,
+        }
+
+
+class QueryDiagnostics:
+    """
+    Collects EXPLAIN QUERY PLAN output and timings per distinct statement
+
+    A statement is timed from execute() until the cursor is reused, closed
+    or its connection is returned to the pool, so fetching the rows counts.
+    Statements slower than slow_ms are kept, with their parameters and
+    plan, in a bounded slow-query log. Plans mentioning a full scan of
+    students are flagged; scans cut short by a LIMIT in rowid order are
+    flagged separately as bounded scans.
+    """
+
+    def __init__(self, slow_ms: float = 50.0, max_slow: int = 200):
+        self.slow_ms = slow_ms
+        self._lock = threading.Lock()
+        self._statements: Dict[str, StatementStats] = {}
+        self._slow: "deque[Dict[str, Any]]" = deque(maxlen=max_slow)
+
+    def wrap(self, conn) -> "TracedConnection":
+        """Wrap a (pooled) connection so its statements are observed"""
+        return TracedConnection(conn, self)
+
+    # ==================== COLLECTION ====================
+
+    def observe(self, conn, sql: str, params: Any, elapsed: float):
+        """Record one finished statement run on conn"""
+        key = normalize_sql(sql)
+        with self._lock:
+            stats = self._statements.get(key)
+            is_new = stats is None
+            if is_new:
+                stats = self._statements[key] = StatementStats(key)
+
+        if is_new:
+            # The plan only depends on the statement text (and the schema)
+            self._explain(conn, stats, sql, params)
+
+        with self._lock:
+            stats.calls += 1
+            stats.total_s += elapsed
+            stats.max_s = max(stats.max_s, elapsed)
+            if elapsed * 1000 >= self.slow_ms:
+                stats.slow_calls += 1
+                self._slow.append({
+                    "sql": key,
+                    "params": _printable(params),
+                    "elapsed_ms": round(elapsed * 1000, 3),
+                    "at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                    "full_scan": stats.full_scan,
+                    "plan": [detail for _, _, detail in stats.plan],
+                })
+
+    def _explain(self, conn, stats: StatementStats, sql: str, params: Any):
+        if not key_starts_with(stats.sql, EXPLAINABLE):
+            return
+        if params is None:
+            params = ()
+        try:
+            # A separate cursor, so the caller's pending rows are untouched
+            plan = conn.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+        except (sqlite3.Error, ValueError, TypeError) as e:
+            stats.plan_error = str(e)
+            return
+        stats.plan = [tuple(row[:2]) + (row[-1],) for row in plan]
+        scan = any(FULL_SCAN_PATTERN.match(detail) for _, _, detail in stats.plan)
+        stats.temp_btree = any(detail.startswith("USE TEMP B-TREE") for _, _, detail in stats.plan)
+        # A sort (temp b-tree) has to read every row before the LIMIT applies
+        stats.bounded_scan = scan and not stats.temp_btree and is_bounded_scan(stats.sql)
+        stats.full_scan = scan and not stats.bounded_scan
+
+    def explain(self, conn, sql: str, params: Sequence = ()) -> List[str]:
+        """EXPLAIN QUERY PLAN a statement without running or recording it"""
+        stats = StatementStats(normalize_sql(sql))
+        self._explain(conn, stats, sql, params)
+        if stats.plan_error:
+            raise sqlite3.OperationalError(stats.plan_error)
+        return [detail for _, _, detail in stats.plan]
+
+    # ==================== REPORTING ====================
+
+    def report(self) -> Dict[str, Any]:
+        """Statements (slowest total first), full scans and the slow-query log"""
+        with self._lock:
+            statements = sorted(self._statements.values(), key=lambda s: s.total_s, reverse=True)
+            statements = [s.to_dict() for s in statements]
+            slow = list(self._slow)
+        return {
+            "slow_ms": self.slow_ms,
+            "statements": statements,
+            "full_scans": [s["sql"] for s in statements if s["full_scan"]],
+            "bounded_scans": [s["sql"] for s in statements if s["bounded_scan"]],
+            "slow_queries": slow,
+        }
+
+    def reset(self):
+        with self._lock:
+            self._statements.clear()
+            self._slow.clear()
+
+
+def is_bounded_scan(sql: str) -> bool:
+    """True if a table scan in sql stops after its LIMIT (see LIMIT_PATTERN)"""
+    if not LIMIT_PATTERN.search(sql):
+        return False
+    return all(ROWID_ORDER_PATTERN.match(term.strip())
+               for order in ORDER_BY_PATTERN.findall(sql)
+               for term in order.split(","))
+
+
+def key_starts_with(sql: str, keywords: Sequence[str]) -> bool:
+    first = sql.split(None, 1)[0].upper() if sql.strip() else ""
+    return first in keywords
+
+
+def _printable(params: Any) -> Any:
+    """Parameters as JSON-friendly values (the first row for executemany)"""
+    if isinstance(params, dict):
+        return {k: _printable_value(v) for k, v in params.items()}
+    if isinstance(params, (list, tuple)):
+        return [_printable_value(v) for v in params]
+    return None if params is None else repr(params)
+
+
+def _printable_value(value: Any) -> Any:
+    if isinstance(value, (str, int, float)) or value is None:
+        return value
+    if isinstance(value, (list, tuple)):
+        return [_printable_value(v) for v in value]
+    return repr(value)
+
+
+def format_plan(plan: List[tuple]) -> str:
+    """Render plan rows as an indented tree, like the sqlite3 shell"""
+    depth = {0: -1}
+    lines = []
+    for node_id, parent, detail in plan:
+        level = depth.get(parent, -1) + 1
+        depth[node_id] = level
+        lines.append("  " * level + detail)
+    return "\n".join(lines)
+
+
+def format_report(report: Dict[str, Any], limit: Optional[int] = None) -> str:
+    """Human readable diagnostics report"""
+    lines = []
+    statements = report["statements"][:limit] if limit else report["statements"]
+    lines.append(f"{len(report['statements'])} distinct statement(s), "
+                 f"{len(report['full_scans'])} with a full scan of students, "
+                 f"{len(report['bounded_scans'])} with a bounded (LIMIT) scan")
+    for s in statements:
+        flags = []
+        if s["full_scan"]:
+            flags.append("FULL SCAN")
+        if s["bounded_scan"]:
+            flags.append("BOUNDED SCAN")
+        if s["temp_btree"]:
+            flags.append("TEMP B-TREE")
+        lines.append("")
+        lines.append(f"{s['calls']} call(s), total {s['total_ms']:.2f} ms, max {s['max_ms']:.2f} ms"
+                     + (f"  [{', '.join(flags)}]" if flags else ""))
+        lines.append(f"  {s['sql']}")
+        if s["plan_text"]:
+            lines.extend("    " + line for line in s["plan_text"].splitlines())
+        elif s["plan_error"]:
+            lines.append(f"    (no plan: {s['plan_error']})")
+
+    lines.append("")
+    lines.append(f"Slow queries (>= {report['slow_ms']} ms): {len(report['slow_queries'])}")
+    for entry in report["slow_queries"]:
+        lines.append(f"  {entry['elapsed_ms']:.2f} ms  {entry['sql']}  params={entry['params']}")
+    return "\n".join(lines)
+
+
+# ==================== CONNECTION WRAPPERS ====================
+
+class TracedCursor:
+    """sqlite3 cursor wrapper timing each statement until its rows are consumed"""
+
+    def __init__(self, cursor: sqlite3.Cursor, owner: "TracedConnection"):
+        self._cursor = cursor
+        self._owner = owner
+        self._pending = None  # [sql, params, elapsed]
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return self._timed(self._cursor.__next__)
+
+    def _timed(self, func, *args):
+        start = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            if self._pending is not None:
+                self._pending[2] += time.perf_counter() - start
+
+    def _start(self, sql: str, params: Any):
+        self.finish()
+        self._pending = [sql, params, 0.0]
+        self._owner._active.add(self)
+
+    def finish(self):
+        """Report the current statement (called automatically)"""
+        pending, self._pending = self._pending, None
+        if pending is not None:
+            self._owner._active.discard(self)
+            self._owner._diagnostics.observe(self._owner.raw, *pending)
+
+    def execute(self, sql: str, params: Any = ()):
+        self._start(sql, params)
+        self._timed(self._cursor.execute, sql, params)
+        return self
+
+    def executemany(self, sql: str, seq_of_params):
+        seq_of_params = seq_of_params if isinstance(seq_of_params, list) else list(seq_of_params)
+        self._start(sql, seq_of_params[0] if seq_of_params else ())
+        self._timed(self._cursor.executemany, sql, seq_of_params)
+        return self
+
+    def fetchone(self):
+        return self._timed(self._cursor.fetchone)
+
+    def fetchmany(self, size: int = None):
+        if size is None:
+            return self._timed(self._cursor.fetchmany)
+        return self._timed(self._cursor.fetchmany, size)
+
+    def fetchall(self):
+        return self._timed(self._cursor.fetchall)
+
+    def close(self):
+        self.finish()
+        self._cursor.close()
+
+
+class TracedConnection:
+    """Connection wrapper whose cursors report to a QueryDiagnostics"""
+
+    def __init__(self, conn, diagnostics: QueryDiagnostics):
+        self._conn = conn
+        self._diagnostics = diagnostics
+        self._active = set()
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def __enter__(self):
+        self._conn.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return self._conn.__exit__(exc_type, exc_value, traceback)
+
+    @property
+    def raw(self) -> sqlite3.Connection:
+        """The underlying sqlite3 connection"""
+        return getattr(self._conn, "raw", self._conn)
+
+    def cursor(self) -> TracedCursor:
+        return TracedCursor(self._conn.cursor(), self)
+
+    def execute(self, sql: str, params: Any = ()) -> TracedCursor:
+        return self.cursor().execute(sql, params)
+
+    def executemany(self, sql: str, seq_of_params) -> TracedCursor:
+        return self.cursor().executemany(sql, seq_of_params)
+
+    def close(self):
+        for cursor in list(self._active):
+            cursor.finish()
+        self._conn.close()
+
+
+# ==================== COMMAND LINE ====================
+
+def run_probe(db, sample_roll_no: Optional[int] = None):
+    """Run each read query of Database once so its plan is captured"""
+    page = db.get_students_page(limit=1)
+    roll_no = sample_roll_no or (page[0][0] if page else 1)
+    grades = db.grade_scale.grades
+
+    # The login lookup, without checking a password or touching the throttle
+    conn = db.get_connection()
+    conn.execute("SELECT id, password, role, disabled FROM admin WHERE username = ?",
+                 ("admin",)).fetchall()
+    conn.close()
+    db.search_student(roll_no)
+    db.get_all_students()
+    db.get_students_page(after_roll_no=roll_no, limit=100)
+    db.get_students_window(0, 100)
+    db.get_student_count()
+    db.get_class_average()
+    db.get_topper()
+    db.get_student_stats()
+    db.get_students_by_roll_nos([roll_no])
+    for batch in db.iter_marks():
+        pass
+    for _ in db.iter_students():
+        pass
+    db.search_by_name("a")
+    db.query_students(grades=grades[-1:], limit=100)
+    db.query_students(min_marks=50, max_marks=80, sort_by="marks", descending=True, limit=100)
+    db.query_students(name_prefix="a", sort_by="name", limit=100)
+    db.count_students(grades=grades[-2:], min_marks=60)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    # database imports this module, so import it only when run as a script
+    from database import SCHEMA_VERSION, Database
+
+    parser = argparse.ArgumentParser(description="Query plan and slow-query report for a students database")
+    parser.add_argument("database", nargs="?", default="students.db")
+    parser.add_argument("--slow-ms", type=float, default=50.0,
+                        help="log statements at least this slow (default 50)")
+    parser.add_argument("--roll-no", type=int, default=None,
+                        help="roll number used for point lookups (default: the first one)")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.database):
+        print(f"Error: {args.database} does not exist", file=sys.stderr)
+        return 2
+    # Database() would migrate an old schema; a report must not write
+    conn = sqlite3.connect(f"file:{args.database}?mode=ro", uri=True)
+    try:
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+    finally:
+        conn.close()
+    if version < SCHEMA_VERSION:
+        print(f"Error: {args.database} is at schema version {version}, expected "
+              f"{SCHEMA_VERSION} (run migrations.py --apply first)", file=sys.stderr)
+        return 2
+
+    db = Database(args.database, cache_size=0)
+    try:
+        diagnostics = db.enable_diagnostics(slow_ms=args.slow_ms)
+        run_probe(db, args.roll_no)
+        report = diagnostics.report()
+    finally:
+        db.close()
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(format_report(report))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
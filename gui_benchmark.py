@@ -0,0 +1,338 @@
+"""
+GUI Benchmark Module for Student Management System
+Measures dashboard responsiveness by driving StudentManagementApp headlessly
+
+Usage:
+    python gui_benchmark.py --sizes 1k,10k,100k --output gui_bench.json
+
+Without a DISPLAY an Xvfb server is started for the run (Xvfb must be
+installed). Each roster size gets a fresh database in a temporary
+directory. For every action the time from the button handler being
+called until its results are on screen is recorded, together with the
+longest event loop stall: a ticker is scheduled with root.after every
+few milliseconds, and any tick arriving late means the window could not
+repaint or react to input for that long.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tkinter as tk
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import main
+from benchmark import generate_students, parse_sizes, summarize
+from database import Database
+
+DEFAULT_SIZES = (1000, 10000, 100000)
+
+
+class VirtualDisplay:
+    """
+    Runs an Xvfb server for the duration of a with block
+    Does nothing if a display is already available, unless force=True
+    """
+
+    def __init__(self, size: str = "1280x1024x24", force: bool = False):
+        self.size = size
+        self.force = force
+        self.process: Optional[subprocess.Popen] = None
+        self._previous: Optional[str] = None
+
+    def __enter__(self):
+        self._previous = os.environ.get("DISPLAY")
+        if self._previous and not self.force:
+            return self
+
+        read_fd, write_fd = os.pipe()
+        try:
+            # -displayfd makes Xvfb pick a free display and report its number
+            self.process = subprocess.Popen(
+                ["Xvfb", "-displayfd", str(write_fd), "-screen", "0", self.size,
+                 "-nolisten", "tcp"],
+                pass_fds=(write_fd,),
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+        except FileNotFoundError:
+            os.close(read_fd)
+            os.close(write_fd)
+            raise RuntimeError("No DISPLAY is set and Xvfb is not installed")
+        os.close(write_fd)
+
+        with os.fdopen(read_fd) as reader:
+            display = reader.readline().strip()
+        if not display:
+            self.process.kill()
+            raise RuntimeError("Xvfb failed to start")
+        os.environ["DISPLAY"] = f":{display}"
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.process is not None:
+            self.process.terminate()
+            self.process.wait(timeout=5)
+            self.process = None
+            if self._previous is None:
+                os.environ.pop("DISPLAY", None)
+            else:
+                os.environ["DISPLAY"] = self._previous
+        return False
+
+
+class SilentMessagebox:
+    """Stands in for tkinter.messagebox so dialogs don't block the benchmark"""
+
+    def __init__(self):
+        self.shown: List[tuple] = []
+
+    def _record(self, kind, title, message=None, **options):
+        self.shown.append((kind, title, message))
+        return True
+
+    def showinfo(self, title=None, message=None, **options):
+        return self._record("info", title, message)
+
+    def showwarning(self, title=None, message=None, **options):
+        return self._record("warning", title, message)
+
+    def showerror(self, title=None, message=None, **options):
+        return self._record("error", title, message)
+
+    def askyesno(self, title=None, message=None, **options):
+        return self._record("yesno", title, message)
+
+
+class StallMonitor:
+    """Measures the longest delay of a periodic root.after tick"""
+
+    def __init__(self, root, interval_ms: int = 5):
+        self.root = root
+        self.interval = interval_ms / 1000
+        self.interval_ms = interval_ms
+        self.max_stall = 0.0
+        self._last = 0.0
+        self._after_id = None
+
+    def start(self):
+        self.reset()
+        self._after_id = self.root.after(self.interval_ms, self._tick)
+
+    def stop(self):
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+
+    def reset(self):
+        self.max_stall = 0.0
+        self._last = time.perf_counter()
+
+    def _tick(self):
+        now = time.perf_counter()
+        self.max_stall = max(self.max_stall, now - self._last - self.interval)
+        self._last = now
+        self._after_id = self.root.after(self.interval_ms, self._tick)
+
+
+# ==================== DRIVING THE APP ====================
+
+def pump_until_idle(app, timeout: float = 300.0):
+    """Run the Tk event loop until no database call is pending, then flush redraws"""
+    deadline = time.monotonic() + timeout
+    while True:
+        app.root.update()
+        if not app.executor.busy:
+            break
+        if time.monotonic() > deadline:
+            raise TimeoutError("The dashboard did not become idle in time")
+        time.sleep(0.0005)
+    app.root.update_idletasks()
+
+
+def pump_until_first_page(app, timeout: float = 300.0):
+    """Run the Tk event loop until the table has shown its first rows"""
+    deadline = time.monotonic() + timeout
+    while app.first_page_pending:
+        app.root.update()
+        if time.monotonic() > deadline:
+            raise TimeoutError("The dashboard did not show the table in time")
+        time.sleep(0.0005)
+
+
+def measure(app, monitor: StallMonitor, action: Callable[[], None], repeat: int,
+            timeout: float = 300.0) -> Dict[str, Any]:
+    """Time action() until the app is idle again, repeat times"""
+    latencies = []
+    stalls = []
+    for _ in range(repeat):
+        pump_until_idle(app, timeout)
+        monitor.reset()
+        start = time.perf_counter()
+        action()
+        pump_until_idle(app, timeout)
+        latencies.append(time.perf_counter() - start)
+        stalls.append(monitor.max_stall)
+
+    summary = summarize(latencies)
+    summary["max_stall_ms"] = round(max(stalls) * 1000, 3) if stalls else None
+    return summary
+
+
+def select_row(app, rng: random.Random):
+    """Focus and select a random visible row, as a click would"""
+    items = app.student_table.get_children()
+    if not items:
+        return
+    item = items[rng.randrange(len(items))]
+    app.student_table.selection_set(item)
+    app.student_table.focus(item)
+
+
+def benchmark_size(size: int, repeat: int = 5, seed: int = 0, virtual_table=None,
+                   tick_ms: int = 5, directory: Optional[str] = None) -> Dict[str, Any]:
+    """Populate a temporary database with size students and time dashboard actions"""
+    rng = random.Random(seed)
+    main.messagebox = SilentMessagebox()
+
+    with tempfile.TemporaryDirectory(prefix="sms-gui-bench-", dir=directory) as tmp:
+        db = Database(os.path.join(tmp, "bench.db"), cache_size=0)
+        try:
+            result = db.add_students_bulk(generate_students(size, seed), batch_size=1000)
+            if not result["success"]:
+                raise RuntimeError(f"Populating the benchmark database failed: {result['message']}")
+
+            start = time.perf_counter()
+            app = main.StudentManagementApp(virtual_table=virtual_table, db=db)
+            monitor = StallMonitor(app.root, tick_ms)
+            monitor.start()
+            try:
+                # The table starts loading once the window is mapped;
+                # wait for it to appear and then to finish
+                pump_until_first_page(app)
+                first_page_s = time.perf_counter() - start
+                pump_until_idle(app)
+                startup_s = time.perf_counter() - start
+                startup_stall = monitor.max_stall
+
+                def search():
+                    app.roll_entry.delete(0, tk.END)
+                    app.roll_entry.insert(0, str(rng.randint(1, size)))
+                    app.search_student()
+
+                def select_and_read():
+                    # A click selects a row, then get_cursor fills the form
+                    select_row(app, rng)
+                    app.get_cursor(None)
+
+                operations = {
+                    "load_all_students": measure(app, monitor, app.load_all_students, repeat),
+                }
+                virtual = app.virtual_table.active
+                operations["get_cursor"] = measure(app, monitor, select_and_read, repeat)
+                operations["search_student"] = measure(app, monitor, search, repeat)
+                operations["show_topper"] = measure(app, monitor, app.show_topper, repeat)
+            finally:
+                monitor.stop()
+                app.executor.shutdown()
+                app.root.destroy()
+        finally:
+            db.close()
+
+    return {
+        "students": size,
+        "virtual_table": virtual,
+        "first_page_s": round(first_page_s, 6),
+        "startup_s": round(startup_s, 6),
+        "startup_max_stall_ms": round(startup_stall * 1000, 3),
+        "operations": operations,
+    }
+
+
+def run_benchmarks(sizes: Sequence[int] = DEFAULT_SIZES, repeat: int = 5, seed: int = 0,
+                   virtual_table=None, tick_ms: int = 5, directory: Optional[str] = None,
+                   progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+    """Benchmark the dashboard for every roster size (a display must be available)"""
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "tk": tk.TkVersion,
+            "platform": platform.platform(),
+            "display": os.environ.get("DISPLAY"),
+            "repeat": repeat,
+            "tick_ms": tick_ms,
+            "virtual_table": virtual_table,
+            "seed": seed,
+        },
+        "runs": [],
+    }
+    for size in sizes:
+        run = benchmark_size(size, repeat=repeat, seed=seed, virtual_table=virtual_table,
+                             tick_ms=tick_ms, directory=directory)
+        report["runs"].append(run)
+        if progress is not None:
+            progress(run)
+    return report
+
+
+# ==================== COMMAND LINE ====================
+
+def format_run(run: Dict[str, Any]) -> str:
+    """Human readable table for one roster size"""
+    mode = "virtual" if run["virtual_table"] else "full"
+    lines = [
+        f"\n{run['students']:,} students ({mode} table, first page after {run['first_page_s']:.2f}s, "
+        f"ready after {run['startup_s']:.2f}s, "
+        f"longest stall {run['startup_max_stall_ms']:.1f} ms)",
+        f"  {'action':<20}{'calls':>7}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}{'stall ms':>10}",
+    ]
+    for name, stats in run["operations"].items():
+        lines.append(
+            f"  {name:<20}{stats['calls']:>7}{stats['p50_ms']:>10.1f}{stats['p95_ms']:>10.1f}"
+            f"{stats['max_ms']:>10.1f}{stats['max_stall_ms']:>10.1f}"
+        )
+    return "\n".join(lines)
+
+
+def main_cli(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark Student Management System dashboard responsiveness")
+    parser.add_argument("--sizes", type=parse_sizes, default=list(DEFAULT_SIZES),
+                        help="comma separated roster sizes, e.g. 1k,10k,100k")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per action (default 5)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--virtual", choices=("auto", "on", "off"), default="auto",
+                        help="virtual table mode (default: chosen by roster size)")
+    parser.add_argument("--tick-ms", type=int, default=5,
+                        help="event loop probe interval in milliseconds (default 5)")
+    parser.add_argument("--xvfb", action="store_true",
+                        help="start Xvfb even if DISPLAY is set")
+    parser.add_argument("--dir", default=None, help="directory for the temporary database")
+    parser.add_argument("--output", "-o", default=None, help="write the JSON report here")
+    args = parser.parse_args(argv)
+
+    virtual_table = {"auto": None, "on": True, "off": False}[args.virtual]
+    try:
+        with VirtualDisplay(force=args.xvfb):
+            report = run_benchmarks(args.sizes, repeat=args.repeat, seed=args.seed,
+                                    virtual_table=virtual_table, tick_ms=args.tick_ms,
+                                    directory=args.dir,
+                                    progress=lambda run: print(format_run(run), flush=True))
+    except (RuntimeError, tk.TclError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as out:
+            json.dump(report, out, indent=2)
+        print(f"\nReport written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
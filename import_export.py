@@ -0,0 +1,158 @@
+"""
+Import/Export Module for Student Management System
+Streams the students table to and from CSV and JSON Lines files
+"""
+
+import csv
+import json
+import os
+from typing import Any, Callable, Dict, IO, Iterator, Optional, Union
+
+from database import Database
+
+FIELDS = ("roll_no", "name", "marks", "grade")
+
+FORMATS = ("csv", "jsonl")
+
+PathOrFile = Union[str, os.PathLike, IO[str]]
+
+
+def detect_format(path: PathOrFile, fmt: Optional[str] = None) -> str:
+    """
+    Work out the file format from fmt or the file extension
+    Raises ValueError for unknown formats
+    """
+    if fmt is None:
+        name = getattr(path, "name", path)
+        extension = os.path.splitext(str(name))[1].lower().lstrip(".")
+        fmt = {"ndjson": "jsonl", "json": "jsonl"}.get(extension, extension)
+
+    fmt = fmt.lower()
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported format '{fmt}' (expected one of: {', '.join(FORMATS)})")
+    return fmt
+
+
+def _open(path: PathOrFile, mode: str):
+    """Open a path, or wrap an already open file so it is not closed by us"""
+    if hasattr(path, "read") or hasattr(path, "write"):
+        return _Borrowed(path)
+    return open(path, mode, newline="", encoding="utf-8")
+
+
+class _Borrowed:
+    """Context manager that yields a caller-owned file without closing it"""
+
+    def __init__(self, file):
+        self.file = file
+
+    def __enter__(self):
+        return self.file
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+# ==================== EXPORT ====================
+
+def export_students(db: Database, path: PathOrFile, fmt: Optional[str] = None,
+                    batch_size: int = 1000,
+                    progress: Optional[Callable[[int], None]] = None) -> int:
+    """
+    Stream every student to a CSV or JSONL file
+    progress, if given, is called with the running row count every batch_size rows
+    Returns the number of rows written
+    """
+    fmt = detect_format(path, fmt)
+    count = 0
+
+    with _open(path, "w") as out:
+        if fmt == "csv":
+            writer = csv.writer(out)
+            writer.writerow(FIELDS)
+            write_row = writer.writerow
+        else:
+            def write_row(row):
+                out.write(json.dumps(dict(zip(FIELDS, row)), ensure_ascii=False))
+                out.write("\n")
+
+        for row in db.iter_students(batch_size):
+            write_row(row)
+            count += 1
+            if progress is not None and count % batch_size == 0:
+                progress(count)
+
+    if progress is not None and count % batch_size != 0:
+        progress(count)
+    return count
+
+
+def export_csv(db: Database, path: PathOrFile, **kwargs) -> int:
+    """Stream every student to a CSV file"""
+    return export_students(db, path, fmt="csv", **kwargs)
+
+
+def export_jsonl(db: Database, path: PathOrFile, **kwargs) -> int:
+    """Stream every student to a JSON Lines file"""
+    return export_students(db, path, fmt="jsonl", **kwargs)
+
+
+# ==================== IMPORT ====================
+
+def read_csv_rows(file: IO[str]) -> Iterator[Dict[str, Any]]:
+    """
+    Lazily parse student rows from a CSV file
+    A header row with roll_no, name and marks columns is required; any grade
+    column is ignored because grades are recalculated on import
+    """
+    reader = csv.DictReader(file)
+    missing = {"roll_no", "name", "marks"} - set(reader.fieldnames or ())
+    if missing:
+        raise ValueError(f"CSV header is missing column(s): {', '.join(sorted(missing))}")
+
+    for row in reader:
+        yield row
+
+
+def read_jsonl_rows(file: IO[str]) -> Iterator[Dict[str, Any]]:
+    """
+    Lazily parse student rows from a JSON Lines file (one object per line)
+    Blank lines are skipped; malformed lines are yielded as empty rows so the
+    importer reports them as failures
+    """
+    for line in file:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = {}
+        yield row if isinstance(row, dict) else {}
+
+
+def import_students(db: Database, path: PathOrFile, fmt: Optional[str] = None,
+                    batch_size: int = 500, upsert: bool = False,
+                    progress: Optional[Callable[[int], None]] = None) -> Dict[str, Any]:
+    """
+    Stream students from a CSV or JSONL file into the database
+    Rows are parsed lazily and written through Database.add_students_bulk,
+    so memory use does not grow with file size
+    Returns the add_students_bulk result dict
+    """
+    fmt = detect_format(path, fmt)
+    read_rows = read_csv_rows if fmt == "csv" else read_jsonl_rows
+
+    with _open(path, "r") as src:
+        return db.add_students_bulk(read_rows(src), batch_size=batch_size,
+                                    upsert=upsert, progress=progress)
+
+
+def import_csv(db: Database, path: PathOrFile, **kwargs) -> Dict[str, Any]:
+    """Stream students from a CSV file into the database"""
+    return import_students(db, path, fmt="csv", **kwargs)
+
+
+def import_jsonl(db: Database, path: PathOrFile, **kwargs) -> Dict[str, Any]:
+    """Stream students from a JSON Lines file into the database"""
+    return import_students(db, path, fmt="jsonl", **kwargs)
@@ -0,0 +1,432 @@
+"""
+Instrumentation Module for Student Management System
+Call counts, latency histograms and rows touched for database and GUI calls
+
+Functions are wrapped with @instrumented(name) (or whole classes with
+@instrument_methods(prefix)). Wrapped calls cost a single flag check
+until a sink is added or profiling is started on the shared
+`instrumentation` registry:
+
+    from instrumentation import MemorySink, instrumentation
+    sink = instrumentation.add_sink(MemorySink())
+    ...
+    print(sink.snapshot()["db.search_student"])
+
+Sinks: MemorySink (aggregates in memory), LogSink (one log line per call)
+and PrometheusSink (aggregates rendered in the Prometheus text format).
+configure_from_env() sets sinks up from the SMS_METRICS variable, e.g.
+SMS_METRICS="log=calls.log,prometheus=metrics.prom".
+"""
+
+import functools
+import logging
+import os
+import threading
+import time
+import types
+from bisect import bisect_left
+from collections import namedtuple
+from typing import Any, Callable, Dict, List, Mapping, Optional
+
+# Upper bounds (seconds) of the latency histogram buckets
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CallRecord = namedtuple("CallRecord", "name elapsed rows error")
+
+
+def count_rows(result: Any) -> Optional[int]:
+    """
+    Rows touched by a call, judged from its return value
+    Row lists count their length, single rows and successful (success, message)
+    results count one, bulk result dicts count inserted + updated rows;
+    scalars (counts, averages, flags) are not row results and give None
+    """
+    if result is None:
+        return 0
+    if isinstance(result, list):
+        return len(result)
+    if isinstance(result, tuple):
+        if len(result) == 2 and isinstance(result[0], bool):
+            return 1 if result[0] else 0
+        return 1
+    if isinstance(result, dict) and "inserted" in result:
+        return result["inserted"] + result.get("updated", 0)
+    return None
+
+
+def no_rows(result: Any) -> None:
+    """Row counter for calls whose result is not rows (e.g. GUI callbacks)"""
+    return None
+
+
+# ==================== SINKS ====================
+
+class MemorySink:
+    """Aggregates calls per name: count, errors, total/min/max time, rows and a histogram"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, Dict[str, Any]] = {}
+
+    def record(self, call: CallRecord):
+        with self._lock:
+            metric = self._metrics.get(call.name)
+            if metric is None:
+                metric = self._metrics[call.name] = {
+                    "calls": 0,
+                    "errors": 0,
+                    "total_s": 0.0,
+                    "min_s": None,
+                    "max_s": 0.0,
+                    "rows": 0,
+                    # One extra slot for calls slower than the last bound
+                    "counts": [0] * (len(self.buckets) + 1),
+                }
+            metric["calls"] += 1
+            metric["total_s"] += call.elapsed
+            if metric["min_s"] is None or call.elapsed < metric["min_s"]:
+                metric["min_s"] = call.elapsed
+            if call.elapsed > metric["max_s"]:
+                metric["max_s"] = call.elapsed
+            if call.rows:
+                metric["rows"] += call.rows
+            if call.error is not None:
+                metric["errors"] += 1
+            metric["counts"][bisect_left(self.buckets, call.elapsed)] += 1
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Per-name metrics; "buckets" maps each upper bound (and "+Inf") to
+        the cumulative number of calls at or below it
+        """
+        with self._lock:
+            result = {}
+            for name, metric in self._metrics.items():
+                cumulative = 0
+                buckets = {}
+                for bound, count in zip(self.buckets + ("+Inf",), metric["counts"]):
+                    cumulative += count
+                    buckets[bound] = cumulative
+                result[name] = {
+                    "calls": metric["calls"],
+                    "errors": metric["errors"],
+                    "rows": metric["rows"],
+                    "total_s": metric["total_s"],
+                    "mean_ms": metric["total_s"] / metric["calls"] * 1000,
+                    "min_ms": metric["min_s"] * 1000,
+                    "max_ms": metric["max_s"] * 1000,
+                    "buckets": buckets,
+                }
+            return result
+
+    def reset(self):
+        with self._lock:
+            self._metrics.clear()
+
+    def flush(self):
+        pass
+
+
+class LogSink:
+    """
+    Writes one line per call to a logger
+    Given a path, a dedicated logger appending to that file is used
+    """
+
+    def __init__(self, path: Optional[str] = None, logger: Optional[logging.Logger] = None,
+                 level: int = logging.INFO):
+        self.level = level
+        if logger is not None:
+            self.logger = logger
+        else:
+            self.logger = logging.getLogger("sms.instrumentation" + (f".{path}" if path else ""))
+            if path and not self.logger.handlers:
+                handler = logging.FileHandler(path, encoding="utf-8")
+                handler.setFormatter(logging.Formatter("%(asctime)s %(threadName)s %(message)s"))
+                self.logger.addHandler(handler)
+                self.logger.setLevel(level)
+                self.logger.propagate = False
+
+    def record(self, call: CallRecord):
+        message = f"{call.name} {call.elapsed * 1000:.3f}ms"
+        if call.rows is not None:
+            message += f" rows={call.rows}"
+        if call.error is not None:
+            message += f" error={call.error}"
+        self.logger.log(self.level, message)
+
+    def flush(self):
+        for handler in self.logger.handlers:
+            handler.flush()
+
+
+class PrometheusSink(MemorySink):
+    """
+    MemorySink that renders its aggregates in the Prometheus text format
+    With a path, flush() writes them there (e.g. for node_exporter's
+    textfile collector)
+    """
+
+    def __init__(self, path: Optional[str] = None, buckets=DEFAULT_BUCKETS,
+                 namespace: str = "sms"):
+        super().__init__(buckets)
+        self.path = path
+        self.namespace = namespace
+
+    def render(self) -> str:
+        ns = self.namespace
+        metrics = self.snapshot()
+        lines = [
+            f"# HELP {ns}_call_duration_seconds Latency of instrumented calls",
+            f"# TYPE {ns}_call_duration_seconds histogram",
+        ]
+        for name, metric in sorted(metrics.items()):
+            label = _label(name)
+            for bound, count in metric["buckets"].items():
+                le = bound if isinstance(bound, str) else repr(float(bound))
+                lines.append(f'{ns}_call_duration_seconds_bucket{{name="{label}",le="{le}"}} {count}')
+            lines.append(f'{ns}_call_duration_seconds_sum{{name="{label}"}} {metric["total_s"]!r}')
+            lines.append(f'{ns}_call_duration_seconds_count{{name="{label}"}} {metric["calls"]}')
+
+        for suffix, key, help_text in (("errors", "errors", "Instrumented calls that raised"),
+                                       ("rows", "rows", "Rows returned or written")):
+            lines.append(f"# HELP {ns}_call_{suffix}_total {help_text}")
+            lines.append(f"# TYPE {ns}_call_{suffix}_total counter")
+            for name, metric in sorted(metrics.items()):
+                lines.append(f'{ns}_call_{suffix}_total{{name="{_label(name)}"}} {metric[key]}')
+        return "\n".join(lines) + "\n"
+
+    def flush(self):
+        if not self.path:
+            return
+        # Write then rename so scrapers never see a half-written file
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as out:
+            out.write(self.render())
+        os.replace(temp_path, self.path)
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# ==================== REGISTRY ====================
+
+class Instrumentation:
+    """
+    Dispatches call records to sinks and manages cProfile capture
+
+    Profiling can be started and stopped at any time. While it runs, every
+    instrumented call is profiled on the thread it runs on (one profiler
+    per thread, enabled around the outermost instrumented call), and
+    stop_profiling() merges them into a single pstats.Stats.
+    """
+
+    def __init__(self):
+        self.active = False
+        self.profiling = False
+        self._sinks: List[Any] = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._profiles: List[Any] = []
+        self._capture = 0
+
+    # ---- sinks ----
+
+    @property
+    def sinks(self) -> List[Any]:
+        return list(self._sinks)
+
+    def add_sink(self, sink):
+        """Start sending call records to sink; returns the sink"""
+        with self._lock:
+            self._sinks = self._sinks + [sink]
+            self._update_active()
+        return sink
+
+    def remove_sink(self, sink):
+        with self._lock:
+            self._sinks = [s for s in self._sinks if s is not sink]
+            self._update_active()
+
+    def flush(self):
+        """Flush every sink (e.g. write the Prometheus file)"""
+        for sink in self._sinks:
+            sink.flush()
+
+    def _update_active(self):
+        self.active = bool(self._sinks) or self.profiling
+
+    def record(self, name: str, elapsed: float, rows: Optional[int] = None,
+               error: Optional[str] = None):
+        call = CallRecord(name, elapsed, rows, error)
+        for sink in self._sinks:
+            sink.record(call)
+
+    # ---- calls ----
+
+    def call(self, name: str, func: Callable, args: tuple, kwargs: dict,
+             rows: Callable[[Any], Optional[int]] = count_rows) -> Any:
+        """Run func(*args, **kwargs), recording its latency and rows touched"""
+        if not self.active:
+            return func(*args, **kwargs)
+
+        profiler = self._enter_profile()
+        start = time.perf_counter()
+        try:
+            result = func(*args, **kwargs)
+        except BaseException as e:
+            self.record(name, time.perf_counter() - start, None, type(e).__name__)
+            raise
+        finally:
+            if profiler is not None:
+                self._exit_profile(profiler)
+
+        if isinstance(result, types.GeneratorType):
+            # Streaming reads: time the iteration, count the rows yielded
+            return self._iterate(name, result, start)
+        self.record(name, time.perf_counter() - start, rows(result))
+        return result
+
+    def _iterate(self, name: str, generator, start: float):
+        rows = 0
+        error = None
+        try:
+            for item in generator:
+                rows += len(item) if isinstance(item, list) else 1
+                yield item
+        except GeneratorExit:
+            raise
+        except BaseException as e:
+            error = type(e).__name__
+            raise
+        finally:
+            generator.close()
+            self.record(name, time.perf_counter() - start, rows, error)
+
+    # ---- profiling ----
+
+    def start_profiling(self):
+        """Start profiling instrumented calls (no-op if already running)"""
+        with self._lock:
+            if self.profiling:
+                return
+            self._capture += 1
+            self._profiles = []
+            self.profiling = True
+            self._update_active()
+
+    def stop_profiling(self) -> Optional["pstats.Stats"]:
+        """Stop profiling; returns the merged stats, or None if nothing ran"""
+        with self._lock:
+            if not self.profiling:
+                return None
+            self.profiling = False
+            self._update_active()
+            profiles, self._profiles = self._profiles, []
+
+        if not profiles:
+            return None
+
+        import pstats
+        stats = pstats.Stats(profiles[0])
+        for profile in profiles[1:]:
+            stats.add(profile)
+        return stats
+
+    def _enter_profile(self) -> Optional["cProfile.Profile"]:
+        if not self.profiling:
+            return None
+        local = self._local
+        if getattr(local, "capture", None) != self._capture:
+            local.capture = self._capture
+            # Imported here: profiling is rare and cProfile/pstats slow startup
+            import cProfile
+            local.profile = cProfile.Profile()
+            local.depth = 0
+            with self._lock:
+                self._profiles.append(local.profile)
+        if local.depth == 0:
+            try:
+                local.profile.enable()
+            except ValueError:
+                # Another profiler is active (single global profiler since 3.12)
+                return None
+        local.depth += 1
+        return local.profile
+
+    def _exit_profile(self, profile: "cProfile.Profile"):
+        local = self._local
+        local.depth -= 1
+        if local.depth == 0:
+            profile.disable()
+
+
+instrumentation = Instrumentation()
+
+
+# ==================== DECORATORS ====================
+
+def instrumented(name: str, rows: Callable[[Any], Optional[int]] = count_rows):
+    """Decorator recording every call of the function under name"""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            return instrumentation.call(name, func, args, kwargs, rows)
+        return wrapper
+    return decorate
+
+
+def instrument_methods(prefix: str, exclude=()):
+    """
+    Class decorator instrumenting every public method as "<prefix>.<method>"
+    exclude names cheap per-row helpers not worth timing
+    """
+    def decorate(cls):
+        for attr, value in list(vars(cls).items()):
+            if attr.startswith("_") or attr in exclude:
+                continue
+            if isinstance(value, staticmethod):
+                setattr(cls, attr, staticmethod(instrumented(f"{prefix}.{attr}")(value.__func__)))
+            elif isinstance(value, types.FunctionType):
+                setattr(cls, attr, instrumented(f"{prefix}.{attr}")(value))
+        return cls
+    return decorate
+
+
+def callback_name(func: Callable) -> str:
+    """Readable name for a callback, e.g. StudentManagementApp.show_topper.on_done"""
+    name = getattr(func, "__qualname__", None) or getattr(func, "__name__", repr(func))
+    return name.replace(".<locals>", "")
+
+
+# ==================== CONFIGURATION ====================
+
+def configure_from_env(environ: Optional[Mapping[str, str]] = None) -> List[Any]:
+    """
+    Add sinks listed in SMS_METRICS (comma separated): "memory",
+    "log" or "log=<path>", "prometheus" or "prometheus=<path>"
+    SMS_PROFILE=1 also starts profiling. Returns the sinks added.
+    """
+    environ = os.environ if environ is None else environ
+    sinks = []
+    for spec in environ.get("SMS_METRICS", "").split(","):
+        kind, _, path = spec.strip().partition("=")
+        kind = kind.lower()
+        if not kind:
+            continue
+        if kind == "memory":
+            sink = MemorySink()
+        elif kind == "log":
+            sink = LogSink(path or None)
+        elif kind == "prometheus":
+            sink = PrometheusSink(path or None)
+        else:
+            raise ValueError(f"Unknown metrics sink '{kind}' (expected memory, log or prometheus)")
+        sinks.append(instrumentation.add_sink(sink))
+
+    if environ.get("SMS_PROFILE", "").lower() in ("1", "true", "yes", "on"):
+        instrumentation.start_profiling()
+    return sinks
@@ -3,14 +3,128 @@ Student Management System - Main Application
 A complete GUI application with MODERN MINIMAL UI, login authentication and student management features
 """
 
+# Keep this import first: it records when startup began
+from startup_clock import STARTED as STARTUP_STARTED
+import bisect
+import json
+import os
+import sys
+import time
 import tkinter as tk
 from tkinter import ttk, messagebox
-from database import Database
+from auth import MANAGE_USERS, ROLES, WRITE, AuthenticationError, LoginThrottled, PermissionDenied
+from database import shared_database
+from db_executor import DBExecutor
+from instrumentation import configure_from_env, instrumentation, instrumented
+from virtual_table import VirtualTable
+
+# Rosters larger than this are shown with virtual scrolling
+VIRTUAL_TABLE_THRESHOLD = 5000
+
+# Rows fetched per background request when filling the table
+TABLE_PAGE_SIZE = 500
+
+# Name search waits this long (ms) after the last keystroke before querying
+NAME_SEARCH_DELAY = 200
+NAME_SEARCH_LIMIT = 100
+
+# Most recent changes shown in a student's history window
+HISTORY_LIMIT = 200
+
+# Sort choices in the filter bar -> Database.query_students sort keys
+SORT_OPTIONS = {
+    "Roll No": "roll_no",
+    "Name": "name",
+    "Marks": "marks",
+    "Grade": "grade",
+}
+
+
+class StartupTimer:
+    """
+    Time from process start to each startup milestone
+    Set SMS_STARTUP_REPORT=1 to print the report to stderr once the first
+    page of students is on screen, or to a file path to append it as JSON
+    """
+    
+    def __init__(self, started):
+        self.started = started
+        self.marks = []
+        self.reported = False
+    
+    def mark(self, phase):
+        self.marks.append((phase, time.perf_counter()))
+    
+    def as_dict(self):
+        """Milliseconds since process start for every milestone, in order"""
+        return {phase: round((at - self.started) * 1000, 1) for phase, at in self.marks}
+    
+    def report(self):
+        lines = ["Startup timing (ms since start):"]
+        previous = self.started
+        for phase, at in self.marks:
+            lines.append(f"  {phase:<20}{(at - self.started) * 1000:>9.1f}"
+                         f"  (+{(at - previous) * 1000:.1f})")
+            previous = at
+        return "\n".join(lines)
+    
+    def finish(self):
+        """Emit the report once, if SMS_STARTUP_REPORT asks for it"""
+        if self.reported:
+            return
+        self.reported = True
+        
+        target = os.environ.get("SMS_STARTUP_REPORT", "").strip()
+        if not target or target == "0":
+            return
+        if target == "1":
+            print(self.report(), file=sys.stderr)
+            return
+        entry = {"timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"), "phases": self.as_dict()}
+        with open(target, "a", encoding="utf-8") as out:
+            out.write(json.dumps(entry) + "\n")
+
+
+startup = StartupTimer(STARTUP_STARTED)
+startup.mark("modules imported")
+
+
+def apply_styles(root):
+    """
+    Configure the ttk theme and Treeview style once per Tk root,
+    before any ttk widget is created so nothing has to be restyled
+    """
+    if getattr(root, "sms_styled", False):
+        return
+    
+    style = ttk.Style(root)
+    style.theme_use("clam")
+    style.configure("Treeview",
+                    background="white",
+                    foreground="#111827",
+                    rowheight=30,
+                    fieldbackground="white",
+                    font=("Segoe UI", 10),
+                    borderwidth=0)
+    style.configure("Treeview.Heading",
+                    font=("Segoe UI", 11, "bold"),
+                    background="#f9fafb",
+                    foreground="#111827",
+                    borderwidth=1,
+                    relief=tk.FLAT)
+    style.map("Treeview.Heading",
+              background=[("active", "#e5e7eb")])
+    style.map("Treeview",
+              background=[("selected", "#2563eb")],
+              foreground=[("selected", "white")])
+    root.sms_styled = True
+
 
 class LoginWindow:
     """Login window for authentication"""
     
-    def __init__(self):
+    def __init__(self, db=None):
+        """db: Database to log in against; opened on the first attempt if None"""
         self.root = tk.Tk()
         self.root.title("Student Management System - Login")
         self.root.geometry("400x300")
@@ -19,8 +133,13 @@ class LoginWindow:
         # Center the window
         self.center_window()
         
-        # Initialize database
-        self.db = Database()
+        # The database is opened on the first login attempt, not before
+        # the window is shown
+        self.db = db
+        
+        # Opening the database and checking the password hash both take
+        # long enough to freeze the window, so they run on a worker thread
+        self.executor = DBExecutor(self.root)
         
         # Configure modern minimal colors
         self.bg_color = "#f4f6f8"
@@ -30,6 +149,7 @@ class LoginWindow:
         self.root.configure(bg=self.bg_color)
         
         self.create_widgets()
+        startup.mark("login shown")
         
     def center_window(self):
         """Center the window on screen"""
@@ -101,7 +221,7 @@ class LoginWindow:
         self.password_entry.grid(row=1, column=1, padx=10, pady=10)
         
         # Login button with modern styling
-        login_btn = tk.Button(
+        self.login_btn = login_btn = tk.Button(
             self.root,
             text="LOGIN",
             font=("Segoe UI", 11, "bold"),
@@ -134,8 +254,13 @@ class LoginWindow:
         # Bind Enter key to login
         self.root.bind('<Return>', lambda e: self.login())
     
+    @instrumented("gui.login")
     def login(self):
         """Handle login button click"""
+        if self.executor.busy:
+            # A login attempt is already running
+            return
+        
         username = self.username_entry.get().strip()
         password = self.password_entry.get().strip()
         
@@ -143,15 +268,35 @@ class LoginWindow:
             messagebox.showerror("Error", "Please enter username and password!")
             return
         
-        if self.db.verify_login(username, password):
-            self.root.destroy()
-            # Open main application
-            app = StudentManagementApp()
-            app.run()
-        else:
+        self.login_btn.config(state=tk.DISABLED)
+        self.executor.submit(self.authenticate, username, password,
+                             on_success=self.on_login, on_error=self.on_login_failed)
+    
+    def authenticate(self, username, password):
+        """Open the database if needed and log in (runs on the worker thread)"""
+        if self.db is None:
+            self.db = shared_database()
+            startup.mark("database ready")
+        return self.db.login(username, password)
+    
+    def on_login(self, session):
+        """Close the login window and open the main application"""
+        self.executor.shutdown()
+        self.root.destroy()
+        app = StudentManagementApp(db=self.db, session=session)
+        app.run()
+    
+    def on_login_failed(self, error):
+        """Re-enable the form and say why the login failed"""
+        self.login_btn.config(state=tk.NORMAL)
+        self.password_entry.delete(0, tk.END)
+        if isinstance(error, LoginThrottled):
+            messagebox.showerror("Login Locked", str(error))
+        elif isinstance(error, AuthenticationError):
             messagebox.showerror("Login Failed", "Invalid username or password!")
-            self.password_entry.delete(0, tk.END)
             self.username_entry.focus()
+        else:
+            messagebox.showerror("Error", f"Could not log in: {error}")
     
     def run(self):
         """Start the login window"""
@@ -161,13 +306,34 @@ class LoginWindow:
 class StudentManagementApp:
     """Main Student Management Application with MODERN MINIMAL UI"""
     
-    def __init__(self):
+    def __init__(self, virtual_table=None, db=None, session=None):
+        """
+        virtual_table: True/False forces virtual scrolling on or off,
+        None picks it automatically from the roster size
+        db: Database to use instead of the default students.db
+        session: the auth.Session from the login window; later actions use
+        it instead of asking for the password again
+        """
         self.root = tk.Tk()
         self.root.title("Student Management System - Dashboard")
         self.root.geometry("1000x600")
         
-        # Initialize database
-        self.db = Database()
+        # Initialize database (one per process, see shared_database)
+        self.db = db or shared_database()
+        self.session = session
+        if session is not None:
+            self.db.use_session(session)
+        self.virtual_mode = virtual_table
+        
+        # Table bookkeeping for in-place updates: roll_no -> Treeview item id,
+        # and the roll numbers in display order
+        self.row_index = {}
+        self.row_order = []
+        self.table_shows_all = False
+        # Rows from stripe_from on may have stale zebra tags, except the
+        # (start, end) position ranges in striped (see restripe_rows)
+        self.stripe_from = None
+        self.striped = []
         
         # Configure modern minimal colors
         self.bg_color = "#f4f6f8"
@@ -176,9 +342,44 @@ class StudentManagementApp:
         
         self.root.configure(bg=self.bg_color)
         
+        # Database calls run on a worker thread so the window never freezes;
+        # sessions are per thread, so the worker binds the user's session
+        self.executor = DBExecutor(
+            self.root,
+            on_busy_change=self.set_busy,
+            on_error=self.show_db_error,
+            initializer=lambda: self.db.use_session(session)
+        )
+        # Created on first use; analytics pulls in NumPy
+        self.analytics = None
+        self.idle_status = "Ready"
+        self.name_search_after_id = None
+        self.last_name_query = ""
+        
         self.create_widgets()
+        startup.mark("dashboard built")
+        
+        # Load the table once the window is on screen, so the first paint
+        # does not wait for it
+        self.first_page_pending = True
+        self.map_binding = self.root.bind("<Map>", self.on_first_map, add="+")
+    
+    def on_first_map(self, event):
+        """Start loading the table the first time the window is mapped"""
+        if event.widget is not self.root:
+            return
+        self.root.unbind("<Map>", self.map_binding)
+        startup.mark("window mapped")
         self.load_all_students()
     
+    def first_page_shown(self):
+        """Called whenever rows reach the table; reports startup the first time"""
+        if not self.first_page_pending:
+            return
+        self.first_page_pending = False
+        startup.mark("first page shown")
+        startup.finish()
+    
     def create_modern_button(self, parent, text, command, bg_color):
         """Create a modern flat button with hover effect"""
         btn = tk.Button(
@@ -218,6 +419,8 @@ class StudentManagementApp:
         
     def create_widgets(self):
         """Create all GUI widgets"""
+        apply_styles(self.root)
+        
         # ==================== HEADER ====================
         header_frame = tk.Frame(self.root, bg=self.header_color, height=60)
         header_frame.pack(fill=tk.X)
@@ -247,6 +450,15 @@ class StudentManagementApp:
         )
         logout_btn.pack(side=tk.RIGHT, padx=20)
         
+        if self.session is not None:
+            tk.Label(
+                header_frame,
+                text=f"{self.session.username} ({self.session.role})",
+                font=("Segoe UI", 10),
+                bg=self.header_color,
+                fg="#cbd5e1"
+            ).pack(side=tk.RIGHT)
+        
         # Hover effect for logout button
         logout_btn.bind("<Enter>", lambda e: logout_btn.config(bg="#b91c1c"))
         logout_btn.bind("<Leave>", lambda e: logout_btn.config(bg="#dc2626"))
@@ -328,26 +540,132 @@ class StudentManagementApp:
         )
         self.marks_entry.grid(row=0, column=5, padx=10, pady=8)
         
+        # As-you-type name search
+        tk.Label(
+            input_frame,
+            text="Find Name:",
+            font=("Segoe UI", 10),
+            bg=self.bg_color,
+            fg="#374151"
+        ).grid(row=1, column=0, padx=10, pady=8, sticky="e")
+        
+        self.name_search_entry = tk.Entry(
+            input_frame,
+            font=("Segoe UI", 10),
+            bd=1,
+            relief=tk.SOLID,
+            highlightthickness=1,
+            highlightbackground="#e5e7eb",
+            highlightcolor="#7c3aed"
+        )
+        self.name_search_entry.grid(row=1, column=1, columnspan=3, padx=10, pady=8, sticky="we")
+        self.name_search_entry.bind('<KeyRelease>', self.on_name_search_key)
+        
         # ==================== BUTTON FRAME ====================
         button_frame = tk.Frame(self.root, bg=self.bg_color)
         button_frame.pack(pady=15)
         
-        # Define modern minimal buttons with clean colors
+        # Define modern minimal buttons with clean colors; buttons needing a
+        # permission the session lacks are shown disabled
         buttons = [
-            ("Add", self.add_student, "#2563eb"),
-            ("Update", self.update_student, "#16a34a"),
-            ("Delete", self.delete_student, "#dc2626"),
-            ("Search", self.search_student, "#7c3aed"),
-            ("Show All", self.load_all_students, "#0ea5e9"),
-            ("Average", self.show_average, "#f59e0b"),
-            ("Topper", self.show_topper, "#14b8a6"),
-            ("Clear", self.clear_fields, "#6b7280")
+            ("Add", self.add_student, "#2563eb", WRITE),
+            ("Update", self.update_student, "#16a34a", WRITE),
+            ("Delete", self.delete_student, "#dc2626", WRITE),
+            ("Search", self.search_student, "#7c3aed", None),
+            ("Show All", self.load_all_students, "#0ea5e9", None),
+            ("Average", self.show_average, "#f59e0b", None),
+            ("Topper", self.show_topper, "#14b8a6", None),
+            ("Statistics", self.show_statistics, "#db2777", None),
+            ("History", self.show_history, "#b45309", None),
+            ("Clear", self.clear_fields, "#6b7280", None),
+            ("Users", self.open_users_window, "#475569", MANAGE_USERS)
         ]
         
-        for i, (text, command, color) in enumerate(buttons):
+        for i, (text, command, color, permission) in enumerate(buttons):
             btn = self.create_modern_button(button_frame, text, command, color)
             btn.config(width=12)
-            btn.grid(row=i//4, column=i%4, padx=12, pady=12)
+            if permission is not None and not self.can(permission):
+                btn.config(state=tk.DISABLED, cursor="", disabledforeground="#e5e7eb")
+            btn.grid(row=i//6, column=i%6, padx=12, pady=12)
+        
+        # ==================== FILTER FRAME ====================
+        filter_frame = tk.Frame(self.root, bg=self.bg_color)
+        filter_frame.pack(padx=20, fill=tk.X)
+        
+        def filter_label(text, column):
+            tk.Label(
+                filter_frame,
+                text=text,
+                font=("Segoe UI", 10),
+                bg=self.bg_color,
+                fg="#374151"
+            ).grid(row=0, column=column, padx=(10, 4), pady=4, sticky="e")
+        
+        def filter_entry(width, column):
+            entry = tk.Entry(
+                filter_frame,
+                font=("Segoe UI", 10),
+                width=width,
+                bd=1,
+                relief=tk.SOLID,
+                highlightthickness=1,
+                highlightbackground="#e5e7eb",
+                highlightcolor="#2563eb"
+            )
+            entry.grid(row=0, column=column, padx=4, pady=4)
+            return entry
+        
+        filter_label("Grade:", 0)
+        self.grade_filter = ttk.Combobox(
+            filter_frame,
+            values=["Any"] + list(reversed(self.db.grade_scale.grades)),
+            state="readonly",
+            width=5
+        )
+        self.grade_filter.set("Any")
+        self.grade_filter.grid(row=0, column=1, padx=4, pady=4)
+        
+        self.grade_scope = ttk.Combobox(
+            filter_frame,
+            values=["only", "or below", "or above"],
+            state="readonly",
+            width=9
+        )
+        self.grade_scope.set("only")
+        self.grade_scope.grid(row=0, column=2, padx=4, pady=4)
+        
+        filter_label("Marks:", 3)
+        self.min_marks_entry = filter_entry(6, 4)
+        filter_label("to", 5)
+        self.max_marks_entry = filter_entry(6, 6)
+        
+        filter_label("Name starts:", 7)
+        self.name_prefix_entry = filter_entry(12, 8)
+        
+        filter_label("Sort:", 9)
+        self.sort_choice = ttk.Combobox(
+            filter_frame,
+            values=list(SORT_OPTIONS),
+            state="readonly",
+            width=8
+        )
+        self.sort_choice.set("Roll No")
+        self.sort_choice.grid(row=0, column=10, padx=4, pady=4)
+        
+        self.sort_descending = tk.BooleanVar(value=False)
+        tk.Checkbutton(
+            filter_frame,
+            text="Desc",
+            variable=self.sort_descending,
+            font=("Segoe UI", 10),
+            bg=self.bg_color,
+            activebackground=self.bg_color
+        ).grid(row=0, column=11, padx=4, pady=4)
+        
+        self.create_modern_button(filter_frame, "Filter", self.apply_filters, "#0ea5e9") \
+            .grid(row=0, column=12, padx=(10, 4), pady=4)
+        self.create_modern_button(filter_frame, "Reset", self.reset_filters, "#6b7280") \
+            .grid(row=0, column=13, padx=4, pady=4)
         
         # ==================== TABLE FRAME ====================
         table_frame = tk.LabelFrame(
@@ -363,28 +681,6 @@ class StudentManagementApp:
         )
         table_frame.pack(padx=20, pady=10, fill=tk.BOTH, expand=True)
         
-        # Configure modern ttk style for Treeview
-        style = ttk.Style()
-        style.theme_use("clam")
-        style.configure("Treeview",
-                        background="white",
-                        foreground="#111827",
-                        rowheight=30,
-                        fieldbackground="white",
-                        font=("Segoe UI", 10),
-                        borderwidth=0)
-        style.configure("Treeview.Heading",
-                        font=("Segoe UI", 11, "bold"),
-                        background="#f9fafb",
-                        foreground="#111827",
-                        borderwidth=1,
-                        relief=tk.FLAT)
-        style.map("Treeview.Heading",
-                  background=[("active", "#e5e7eb")])
-        style.map("Treeview",
-                  background=[("selected", "#2563eb")],
-                  foreground=[("selected", "white")])
-        
         # Scrollbar
         scroll_y = tk.Scrollbar(table_frame, orient=tk.VERTICAL)
         scroll_x = tk.Scrollbar(table_frame, orient=tk.HORIZONTAL)
@@ -393,7 +689,7 @@ class StudentManagementApp:
         self.student_table = ttk.Treeview(
             table_frame,
             columns=("Roll No", "Name", "Marks", "Grade"),
-            yscrollcommand=scroll_y.set,
+            yscrollcommand=lambda first, last: self.on_table_scroll(scroll_y, first, last),
             xscrollcommand=scroll_x.set,
             height=10
         )
@@ -419,6 +715,14 @@ class StudentManagementApp:
         
         self.student_table.pack(fill=tk.BOTH, expand=True)
         
+        # Virtual scrolling controller, attached only for large rosters; its
+        # count and window queries run on the executor like every table load
+        self.virtual_table = VirtualTable(
+            self.student_table, scroll_y,
+            submit=lambda func, *args, **kwargs: self.executor.submit(func, *args, key="table", **kwargs),
+            on_render=self.first_page_shown
+        )
+        
         # Configure row colors with modern palette
         self.student_table.tag_configure('oddrow', background='#ffffff')
         self.student_table.tag_configure('evenrow', background='#f9fafb')
@@ -426,6 +730,9 @@ class StudentManagementApp:
         # Bind row selection
         self.student_table.bind('<ButtonRelease-1>', self.get_cursor)
         
+        # F12 starts/stops profiling of database calls and handlers
+        self.root.bind('<F12>', self.toggle_profiling)
+        
         # Status bar
         self.status_bar = tk.Label(
             self.root,
@@ -469,6 +776,7 @@ class StudentManagementApp:
         
         return (roll_no, name, marks)
     
+    @instrumented("gui.add_student")
     def add_student(self):
         """Add new student to database"""
         data = self.validate_inputs()
@@ -476,16 +784,20 @@ class StudentManagementApp:
             return
         
         roll_no, name, marks = data
-        success, message = self.db.add_student(roll_no, name, marks)
         
-        if success:
-            messagebox.showinfo("Success", message)
-            self.clear_fields()
-            self.load_all_students()
-            self.status_bar.config(text=f"Student {name} added successfully")
-        else:
-            messagebox.showerror("Error", message)
+        def on_done(result):
+            success, message = result
+            if success:
+                messagebox.showinfo("Success", message)
+                self.clear_fields()
+                self.apply_student_change(roll_no)
+                self.status_bar.config(text=f"Student {name} added successfully")
+            else:
+                messagebox.showerror("Error", message)
+        
+        self.executor.submit(self.db.add_student, roll_no, name, marks, on_success=on_done)
     
+    @instrumented("gui.update_student")
     def update_student(self):
         """Update existing student record"""
         data = self.validate_inputs()
@@ -503,16 +815,19 @@ class StudentManagementApp:
         if not confirm:
             return
         
-        success, message = self.db.update_student(roll_no, name, marks)
-        
-        if success:
-            messagebox.showinfo("Success", message)
-            self.clear_fields()
-            self.load_all_students()
-            self.status_bar.config(text=f"Student {name} updated successfully")
-        else:
-            messagebox.showerror("Error", message)
+        def on_done(result):
+            success, message = result
+            if success:
+                messagebox.showinfo("Success", message)
+                self.clear_fields()
+                self.apply_student_change(roll_no)
+                self.status_bar.config(text=f"Student {name} updated successfully")
+            else:
+                messagebox.showerror("Error", message)
+        
+        self.executor.submit(self.db.update_student, roll_no, name, marks, on_success=on_done)
     
+    @instrumented("gui.delete_student")
     def delete_student(self):
         """Delete student from database"""
         roll_no = self.roll_entry.get().strip()
@@ -536,16 +851,19 @@ class StudentManagementApp:
         if not confirm:
             return
         
-        success, message = self.db.delete_student(roll_no)
-        
-        if success:
-            messagebox.showinfo("Success", message)
-            self.clear_fields()
-            self.load_all_students()
-            self.status_bar.config(text=f"Student with Roll No {roll_no} deleted")
-        else:
-            messagebox.showerror("Error", message)
+        def on_done(result):
+            success, message = result
+            if success:
+                messagebox.showinfo("Success", message)
+                self.clear_fields()
+                self.apply_student_change(roll_no, deleted=True)
+                self.status_bar.config(text=f"Student with Roll No {roll_no} deleted")
+            else:
+                messagebox.showerror("Error", message)
+        
+        self.executor.submit(self.db.delete_student, roll_no, on_success=on_done)
     
+    @instrumented("gui.search_student")
     def search_student(self):
         """Search for student by roll number"""
         roll_no = self.roll_entry.get().strip()
@@ -560,74 +878,622 @@ class StudentManagementApp:
             messagebox.showerror("Error", "Invalid Roll Number!")
             return
         
-        result = self.db.search_student(roll_no)
+        def on_done(result):
+            if result:
+                # Clear table and show only searched student
+                self.show_rows([result])
+                
+                # Fill entry fields with student data
+                self.name_entry.delete(0, tk.END)
+                self.name_entry.insert(0, result[1])
+                self.marks_entry.delete(0, tk.END)
+                self.marks_entry.insert(0, result[2])
+                
+                self.status_bar.config(text=f"Found student: {result[1]}")
+            else:
+                messagebox.showinfo("Not Found", f"No student found with Roll No: {roll_no}")
+                self.status_bar.config(text=f"Student with Roll No {roll_no} not found")
+        
+        # Keyed "table" so it supersedes a table load still in flight
+        self.executor.submit(self.db.search_student, roll_no, on_success=on_done, key="table")
+    
+    def on_name_search_key(self, event):
+        """Debounce keystrokes in the name search box"""
+        if self.name_search_after_id is not None:
+            self.root.after_cancel(self.name_search_after_id)
+        self.name_search_after_id = self.root.after(NAME_SEARCH_DELAY, self.search_by_name)
+    
+    @instrumented("gui.search_by_name")
+    def search_by_name(self):
+        """Show ranked name matches for the text in the name search box"""
+        self.name_search_after_id = None
+        query = self.name_search_entry.get().strip()
         
-        if result:
-            # Clear table and show only searched student
-            self.student_table.delete(*self.student_table.get_children())
-            self.student_table.insert('', tk.END, values=result, tags=('oddrow',))
-            
-            # Fill entry fields with student data
-            self.name_entry.delete(0, tk.END)
-            self.name_entry.insert(0, result[1])
-            self.marks_entry.delete(0, tk.END)
-            self.marks_entry.insert(0, result[2])
-            
-            self.status_bar.config(text=f"Found student: {result[1]}")
-        else:
-            messagebox.showinfo("Not Found", f"No student found with Roll No: {roll_no}")
-            self.status_bar.config(text=f"Student with Roll No {roll_no} not found")
+        if query == self.last_name_query:
+            return
+        self.last_name_query = query
+        
+        if not query:
+            self.load_all_students()
+            return
+        
+        def on_done(matches):
+            self.show_rows(matches)
+            self.status_bar.config(text=f"{len(matches)} match(es) for '{query}'")
+        
+        self.executor.submit(self.db.search_by_name, query, NAME_SEARCH_LIMIT,
+                             on_success=on_done, key="table")
+    
+    def use_virtual_table(self, total):
+        """Decide whether a roster of total rows is shown with virtual scrolling"""
+        if self.virtual_mode is None:
+            return total > VIRTUAL_TABLE_THRESHOLD
+        return self.virtual_mode
+    
+    def show_rows(self, rows):
+        """Replace the table contents with a few rows (search results, topper)"""
+        self.virtual_table.detach()
+        self.student_table.delete(*self.student_table.get_children())
+        self.reset_row_index()
+        self.table_shows_all = False
+        for i, student in enumerate(rows):
+            tag = 'oddrow' if i % 2 == 0 else 'evenrow'
+            item = self.student_table.insert('', tk.END, values=student, tags=(tag,))
+            self.row_index[student[0]] = item
+            self.row_order.append(student[0])
+    
+    def read_filters(self):
+        """
+        Build Database.query_students filters from the filter bar
+        Returns None (after showing an error) if the input is invalid
+        """
+        filters = {}
+        
+        grade = self.grade_filter.get()
+        if grade != "Any":
+            scope = self.grade_scope.get()
+            if scope == "only":
+                filters["grades"] = [grade]
+            else:
+                direction = "below" if scope == "or below" else "above"
+                filters["grades"] = self.db.grade_scale.grades_from(grade, direction)
+        
+        for key, entry in (("min_marks", self.min_marks_entry),
+                           ("max_marks", self.max_marks_entry)):
+            text = entry.get().strip()
+            if text:
+                try:
+                    filters[key] = float(text)
+                except ValueError:
+                    messagebox.showerror("Error", "Marks filter must be a valid number!")
+                    return None
+        
+        name_prefix = self.name_prefix_entry.get().strip()
+        if name_prefix:
+            filters["name_prefix"] = name_prefix
+        
+        return filters
+    
+    @instrumented("gui.apply_filters")
+    def apply_filters(self):
+        """Show the students matching the filter bar, sorted as selected"""
+        filters = self.read_filters()
+        if filters is None:
+            return
+        
+        order = {
+            "sort_by": SORT_OPTIONS[self.sort_choice.get()],
+            "descending": self.sort_descending.get(),
+        }
+        
+        def query(offset=0, limit=None):
+            return self.db.query_students(**filters, **order, limit=limit, offset=offset)
+        
+        def on_rows(rows):
+            self.show_rows(rows)
+            self.status_bar.config(text=f"{len(rows)} student(s) match the filters")
+        
+        def on_count(total):
+            if self.use_virtual_table(total):
+                # Too many matches for one Treeview: page them in virtually
+                self.reset_row_index()
+                self.table_shows_all = False
+                self.virtual_table.attach(lambda: self.db.count_students(**filters), query, total)
+                self.status_bar.config(text=f"{total} student(s) match the filters")
+            else:
+                self.executor.submit(query, on_success=on_rows, key="table")
+        
+        self.executor.submit(self.db.count_students, **filters, on_success=on_count, key="table")
+    
+    @instrumented("gui.reset_filters")
+    def reset_filters(self):
+        """Clear the filter bar and show all students"""
+        self.grade_filter.set("Any")
+        self.grade_scope.set("only")
+        self.min_marks_entry.delete(0, tk.END)
+        self.max_marks_entry.delete(0, tk.END)
+        self.name_prefix_entry.delete(0, tk.END)
+        self.sort_choice.set("Roll No")
+        self.sort_descending.set(False)
+        self.load_all_students()
     
+    @instrumented("gui.load_all_students")
     def load_all_students(self):
         """Load and display all students in table"""
+        # Clicking again (or searching) cancels a load that is still running
+        self.executor.submit(self.db.get_student_count, on_success=self.show_all_students,
+                             key="table")
+    
+    def show_all_students(self, total):
+        """Fill the table with all students once the count is known"""
+        if self.use_virtual_table(total):
+            # Only the visible rows become Treeview items, fetched on demand
+            self.reset_row_index()
+            self.table_shows_all = True
+            self.virtual_table.attach(self.db.get_student_count, self.db.get_students_window, total)
+            self.status_bar.config(text=f"Total Students: {total}")
+            return
+        
+        self.virtual_table.detach()
         self.student_table.delete(*self.student_table.get_children())
+        self.reset_row_index()
+        self.table_shows_all = False
+        
+        # Fetch page by page in the background, inserting each page as it arrives
+        self.load_next_page(None)
+    
+    def load_next_page(self, after_roll_no):
+        """Request the page of students after after_roll_no"""
+        self.executor.submit(self.db.get_students_page, after_roll_no, TABLE_PAGE_SIZE,
+                             on_success=self.append_page, key="table")
+    
+    def append_page(self, page):
+        """Insert a page of students and request the next one"""
+        for student in page:
+            position = len(self.row_order)
+            tag = 'evenrow' if position % 2 == 0 else 'oddrow'
+            item = self.student_table.insert('', tk.END, values=student, tags=(tag,))
+            self.row_index[student[0]] = item
+            self.row_order.append(student[0])
+        self.first_page_shown()
+        
+        if len(page) == TABLE_PAGE_SIZE:
+            self.load_next_page(page[-1][0])
+            self.status_bar.config(text=f"Loading students... {len(self.row_order)}")
+            return
         
-        students = self.db.get_all_students()
+        self.table_shows_all = True
+        self.status_bar.config(text=f"Total Students: {len(self.row_order)}")
+    
+    def apply_student_change(self, roll_no, deleted=False):
+        """Patch the table after a single add/update/delete instead of reloading it"""
+        if self.virtual_table.active:
+            # Only the visible window is on screen, so just redraw it
+            self.virtual_table.refresh()
+            return
         
-        for i, student in enumerate(students):
-            tag = 'evenrow' if i % 2 == 0 else 'oddrow'
-            self.student_table.insert('', tk.END, values=student, tags=(tag,))
+        if not self.table_shows_all:
+            # A search/topper result is on screen; go back to the full list
+            self.load_all_students()
+            return
         
-        total = len(students)
-        self.status_bar.config(text=f"Total Students: {total}")
+        if deleted:
+            self.remove_table_row(roll_no)
+        else:
+            def on_done(student):
+                if student and self.table_shows_all:
+                    self.upsert_table_row(student)
+            
+            self.executor.submit(self.db.search_student, roll_no, on_success=on_done)
     
-    def show_average(self):
-        """Calculate and display class average"""
-        average = self.db.get_class_average()
+    def upsert_table_row(self, student):
+        """Update a student's row in place, or insert it at its sorted position"""
+        roll_no = student[0]
+        item = self.row_index.get(roll_no)
         
-        if average is not None:
-            messagebox.showinfo(
-                "Class Average",
-                f"📊 Class Average Marks: {average:.2f}%"
-            )
-            self.status_bar.config(text=f"Class average: {average:.2f}%")
+        if item is not None:
+            self.student_table.item(item, values=student)
+            return
+        
+        position = bisect.bisect_left(self.row_order, roll_no)
+        self.row_order.insert(position, roll_no)
+        self.row_index[roll_no] = self.student_table.insert('', position, values=student)
+        self.restripe_rows(position)
+    
+    def remove_table_row(self, roll_no):
+        """Remove a student's row from the table"""
+        item = self.row_index.pop(roll_no, None)
+        if item is None:
+            return
+        
+        position = bisect.bisect_left(self.row_order, roll_no)
+        del self.row_order[position]
+        self.student_table.delete(item)
+        self.restripe_rows(position)
+    
+    def reset_row_index(self):
+        """Forget the table bookkeeping before the rows are replaced"""
+        self.row_index = {}
+        self.row_order = []
+        self.stripe_from = None
+        self.striped = []
+    
+    def restripe_rows(self, start):
+        """
+        Mark the zebra tags of rows from start onwards stale after an
+        insert/remove and re-tag the ones on screen
+        Rows off screen are re-tagged as they scroll into view, so an edit
+        costs about one screenful of item updates however long the table is
+        """
+        if self.stripe_from is None or start <= self.stripe_from:
+            self.stripe_from = start
+            self.striped = []
         else:
-            messagebox.showinfo("No Data", "No students in database!")
+            # Rows after start shifted by one, so their tags are stale again
+            self.striped = [(low, min(high, start)) for low, high in self.striped if low < start]
+        self.restripe_visible()
+    
+    def restripe_visible(self):
+        """Re-tag the stale rows that are (about to be) on screen"""
+        if self.stripe_from is None:
+            return
+        total = len(self.row_order)
+        top, bottom = self.student_table.yview()
+        # One screenful of margin: yview can lag behind a just-inserted row
+        margin = int(self.student_table.cget("height"))
+        start = max(self.stripe_from, int(top * total) - margin)
+        end = min(total, int(bottom * total) + margin)
+        if start >= end:
+            return
+        
+        for i in range(start, end):
+            if any(low <= i < high for low, high in self.striped):
+                continue
+            tag = 'evenrow' if i % 2 == 0 else 'oddrow'
+            self.student_table.item(self.row_index[self.row_order[i]], tags=(tag,))
+        
+        # Merge the new range into the striped ones
+        ranges = []
+        for low, high in sorted(self.striped + [(start, end)]):
+            if ranges and low <= ranges[-1][1]:
+                ranges[-1] = (ranges[-1][0], max(ranges[-1][1], high))
+            else:
+                ranges.append((low, high))
+        if ranges[0][0] <= self.stripe_from and ranges[0][1] >= total:
+            self.stripe_from = None
+            ranges = []
+        self.striped = ranges
+    
+    def on_table_scroll(self, scrollbar, first, last):
+        """Treeview yscrollcommand in normal mode: move the scrollbar, fix stale stripes"""
+        scrollbar.set(first, last)
+        self.restripe_visible()
+    
+    @instrumented("gui.show_average")
+    def show_average(self):
+        """Calculate and display class average"""
+        def on_done(average):
+            if average is not None:
+                messagebox.showinfo(
+                    "Class Average",
+                    f"📊 Class Average Marks: {average:.2f}%"
+                )
+                self.status_bar.config(text=f"Class average: {average:.2f}%")
+            else:
+                messagebox.showinfo("No Data", "No students in database!")
+        
+        self.executor.submit(self.db.get_class_average, on_success=on_done, key="average")
     
+    @instrumented("gui.show_topper")
     def show_topper(self):
         """Find and display class topper"""
-        topper = self.db.get_topper()
+        def on_done(topper):
+            if topper:
+                roll_no, name, marks, grade = topper
+                
+                # Highlight topper in table
+                self.show_rows([topper])
+                
+                messagebox.showinfo(
+                    "Class Topper 🏆",
+                    f"Topper Details:\n\n"
+                    f"Roll No: {roll_no}\n"
+                    f"Name: {name}\n"
+                    f"Marks: {marks}\n"
+                    f"Grade: {grade}"
+                )
+                
+                self.status_bar.config(text=f"Class Topper: {name} ({marks} marks)")
+            else:
+                messagebox.showinfo("No Data", "No students in database!")
+        
+        self.executor.submit(self.db.get_topper, on_success=on_done, key="table")
+    
+    @instrumented("gui.show_statistics")
+    def show_statistics(self):
+        """Compute grade distribution and percentiles and show them in a window"""
+        def on_done(stats):
+            if stats["count"] == 0:
+                messagebox.showinfo("No Data", "No students in database!")
+                return
+            self.open_statistics_window(stats)
+            self.status_bar.config(
+                text=f"Statistics: {stats['count']} students, median {stats['median']:.2f}"
+            )
         
-        if topper:
-            roll_no, name, marks, grade = topper
+        if self.analytics is None:
+            from analytics import GradeAnalytics
+            self.analytics = GradeAnalytics(self.db)
+        self.executor.submit(self.analytics.compute, on_success=on_done, key="statistics")
+    
+    def open_statistics_window(self, stats):
+        """Statistics view: summary, grade histogram, percentiles and rankings"""
+        window = tk.Toplevel(self.root)
+        window.title("Class Statistics")
+        window.configure(bg=self.bg_color)
+        window.geometry("640x560")
+        
+        # Summary line
+        summary = (
+            f"Students: {stats['count']}    Mean: {stats['mean']:.2f}    "
+            f"Median: {stats['median']:.2f}    Std Dev: {stats['std_dev']:.2f}    "
+            f"Min: {stats['min']:.1f}    Max: {stats['max']:.1f}"
+        )
+        tk.Label(
+            window,
+            text=summary,
+            font=("Segoe UI", 10, "bold"),
+            bg=self.bg_color,
+            fg="#111827"
+        ).pack(padx=20, pady=(15, 5), anchor=tk.W)
+        
+        # Grade histogram
+        canvas_width, canvas_height = 600, 200
+        canvas = tk.Canvas(window, width=canvas_width, height=canvas_height,
+                           bg="white", highlightthickness=0)
+        canvas.pack(padx=20, pady=10)
+        
+        grade_counts = stats["grade_counts"]
+        largest = max(grade_counts.values()) or 1
+        slot = canvas_width / len(grade_counts)
+        for i, (grade, count) in enumerate(grade_counts.items()):
+            bar_height = (canvas_height - 50) * count / largest
+            x0 = i * slot + slot * 0.2
+            x1 = (i + 1) * slot - slot * 0.2
+            y1 = canvas_height - 25
+            canvas.create_rectangle(x0, y1 - bar_height, x1, y1, fill=self.button_color, width=0)
+            canvas.create_text((x0 + x1) / 2, y1 - bar_height - 10, text=str(count),
+                               font=("Segoe UI", 9))
+            canvas.create_text((x0 + x1) / 2, y1 + 12, text=grade,
+                               font=("Segoe UI", 10, "bold"))
+        
+        # Percentiles
+        percentiles = "    ".join(
+            f"P{p}: {value:.1f}" for p, value in stats["percentiles"].items()
+        )
+        tk.Label(
+            window,
+            text=percentiles,
+            font=("Segoe UI", 10),
+            bg=self.bg_color,
+            fg="#374151"
+        ).pack(padx=20, pady=5, anchor=tk.W)
+        
+        # Top and bottom students side by side
+        lists_frame = tk.Frame(window, bg=self.bg_color)
+        lists_frame.pack(padx=20, pady=10, fill=tk.BOTH, expand=True)
+        
+        for column, (title, students) in enumerate((
+            (f"Top {len(stats['top'])}", stats["top"]),
+            (f"Bottom {len(stats['bottom'])}", stats["bottom"]),
+        )):
+            frame = tk.LabelFrame(
+                lists_frame,
+                text=f"  {title}  ",
+                font=("Segoe UI", 10, "bold"),
+                bg=self.bg_color,
+                fg="#111827",
+                bd=0
+            )
+            frame.grid(row=0, column=column, padx=10, sticky="nsew")
+            lists_frame.columnconfigure(column, weight=1)
             
-            # Highlight topper in table
-            self.student_table.delete(*self.student_table.get_children())
-            self.student_table.insert('', tk.END, values=topper, tags=('oddrow',))
+            for roll_no, name, marks, grade in students:
+                tk.Label(
+                    frame,
+                    text=f"{roll_no}  {name}  {marks} ({grade})",
+                    font=("Segoe UI", 9),
+                    bg=self.bg_color,
+                    fg="#374151",
+                    anchor=tk.W
+                ).pack(fill=tk.X)
+    
+    @instrumented("gui.show_history")
+    def show_history(self):
+        """Show the change history of the student in the Roll No field"""
+        roll_no = self.roll_entry.get().strip()
+        
+        if not roll_no:
+            messagebox.showerror("Error", "Please enter or select a Roll Number to see its history!")
+            return
+        
+        try:
+            roll_no = int(roll_no)
+        except ValueError:
+            messagebox.showerror("Error", "Invalid Roll Number!")
+            return
+        
+        def on_done(entries):
+            if not entries:
+                messagebox.showinfo("No History", f"No changes recorded for Roll No: {roll_no}")
+                return
+            self.open_history_window(roll_no, entries)
+            self.status_bar.config(text=f"{len(entries)} change(s) for Roll No {roll_no}")
+        
+        self.executor.submit(self.db.get_student_history, roll_no, HISTORY_LIMIT,
+                             on_success=on_done, key="history")
+    
+    def open_history_window(self, roll_no, entries):
+        """History view: one row per change, newest first, old -> new values"""
+        window = tk.Toplevel(self.root)
+        window.title(f"History - Roll No {roll_no}")
+        window.configure(bg=self.bg_color)
+        window.geometry("820x380")
+        
+        columns = ("When", "Who", "Action", "Name", "Marks", "Grade")
+        history_table = ttk.Treeview(window, columns=columns, show="headings", height=12)
+        for column, width in zip(columns, (150, 100, 70, 220, 110, 90)):
+            history_table.heading(column, text=column)
+            history_table.column(column, width=width)
+        
+        scrollbar = ttk.Scrollbar(window, orient=tk.VERTICAL, command=history_table.yview)
+        history_table.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y, pady=15, padx=(0, 20))
+        history_table.pack(padx=(20, 0), pady=15, fill=tk.BOTH, expand=True)
+        
+        def change(old, new):
+            if old is None:
+                return new
+            if new is None or old == new:
+                return old
+            return f"{old} \u2192 {new}"
+        
+        for entry in entries:
+            history_table.insert('', tk.END, values=(
+                time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(entry.changed_at)),
+                entry.username or "(local)",
+                entry.action,
+                change(entry.old_name, entry.new_name),
+                change(entry.old_marks, entry.new_marks),
+                change(entry.old_grade, entry.new_grade),
+            ))
+    
+    def can(self, permission):
+        """True if the logged in user may do this (see Database.sessionless_permissions)"""
+        if self.session is None:
+            return permission in self.db.sessionless_permissions
+        return self.session.allows(permission)
+    
+    @instrumented("gui.open_users_window")
+    def open_users_window(self):
+        """User management: create users, change roles and passwords, disable users"""
+        if not self.can(MANAGE_USERS):
+            return
+        
+        window = tk.Toplevel(self.root)
+        window.title("Users")
+        window.configure(bg=self.bg_color)
+        window.geometry("560x420")
+        
+        users_table = ttk.Treeview(window, columns=("User", "Role", "Status"),
+                                   show="headings", height=10)
+        for column, width in (("User", 240), ("Role", 120), ("Status", 120)):
+            users_table.heading(column, text=column)
+            users_table.column(column, width=width)
+        users_table.pack(padx=20, pady=(15, 10), fill=tk.BOTH, expand=True)
+        
+        form = tk.Frame(window, bg=self.bg_color)
+        form.pack(padx=20, fill=tk.X)
+        
+        def form_label(text, column):
+            tk.Label(form, text=text, font=("Segoe UI", 10), bg=self.bg_color, fg="#374151") \
+                .grid(row=0, column=column, padx=(0, 5), sticky="e")
+        
+        form_label("User:", 0)
+        username_entry = tk.Entry(form, font=("Segoe UI", 10), width=14, bd=1, relief=tk.SOLID)
+        username_entry.grid(row=0, column=1, padx=(0, 10))
+        form_label("Password:", 2)
+        password_entry = tk.Entry(form, font=("Segoe UI", 10), width=12, show="*", bd=1, relief=tk.SOLID)
+        password_entry.grid(row=0, column=3, padx=(0, 10))
+        form_label("Role:", 4)
+        role_choice = ttk.Combobox(form, values=ROLES, state="readonly", width=8)
+        role_choice.set(ROLES[0])
+        role_choice.grid(row=0, column=5)
+        
+        def refresh():
+            self.executor.submit(self.db.list_users, on_success=show_users, key="users")
+        
+        def show_users(users):
+            users_table.delete(*users_table.get_children())
+            for username, role, disabled in users:
+                users_table.insert('', tk.END, values=(username, role, "disabled" if disabled else "active"))
+        
+        def on_select(event):
+            selected = users_table.focus()
+            if not selected:
+                return
+            username, role, _ = users_table.item(selected, "values")
+            username_entry.delete(0, tk.END)
+            username_entry.insert(0, username)
+            role_choice.set(role)
+        
+        users_table.bind('<<TreeviewSelect>>', on_select)
+        
+        def run(func, *args):
+            username = username_entry.get().strip()
+            if not username:
+                messagebox.showerror("Error", "Please enter or select a user!", parent=window)
+                return
             
-            messagebox.showinfo(
-                "Class Topper 🏆",
-                f"Topper Details:\n\n"
-                f"Roll No: {roll_no}\n"
-                f"Name: {name}\n"
-                f"Marks: {marks}\n"
-                f"Grade: {grade}"
-            )
+            def on_done(result):
+                success, message = result
+                if success:
+                    password_entry.delete(0, tk.END)
+                    self.status_bar.config(text=message)
+                    refresh()
+                else:
+                    messagebox.showerror("Error", message, parent=window)
             
-            self.status_bar.config(text=f"Class Topper: {name} ({marks} marks)")
+            self.executor.submit(func, username, *args, on_success=on_done)
+        
+        actions = tk.Frame(window, bg=self.bg_color)
+        actions.pack(pady=15)
+        for i, (text, command, color) in enumerate((
+            ("Create", lambda: run(self.db.create_user, password_entry.get(), role_choice.get()), "#2563eb"),
+            ("Set Role", lambda: run(self.db.set_user_role, role_choice.get()), "#16a34a"),
+            ("Set Password", lambda: run(self.db.change_password, password_entry.get()), "#7c3aed"),
+            ("Disable", lambda: run(self.db.set_user_disabled, True), "#dc2626"),
+            ("Enable", lambda: run(self.db.set_user_disabled, False), "#6b7280"),
+        )):
+            self.create_modern_button(actions, text, command, color).grid(row=0, column=i, padx=6)
+        
+        refresh()
+    
+    def set_busy(self, busy):
+        """Show a busy cursor and status while database calls are running"""
+        if busy:
+            self.idle_status = self.status_bar.cget("text")
+            self.root.config(cursor="watch")
+            self.status_bar.config(text="Working...")
         else:
-            messagebox.showinfo("No Data", "No students in database!")
+            self.root.config(cursor="")
+            # Restore the old text unless a callback already set a new one
+            if self.status_bar.cget("text") == "Working...":
+                self.status_bar.config(text=self.idle_status)
+    
+    def toggle_profiling(self, event=None):
+        """Start profiling, or stop it and save the profile to a .pstats file"""
+        if not instrumentation.profiling:
+            instrumentation.start_profiling()
+            self.status_bar.config(text="Profiling... press F12 again to stop")
+            return
+        
+        stats = instrumentation.stop_profiling()
+        if stats is None:
+            self.status_bar.config(text="Profiling stopped (nothing was recorded)")
+            return
+        path = time.strftime("profile-%Y%m%d-%H%M%S.pstats")
+        stats.dump_stats(path)
+        self.status_bar.config(text=f"Profile saved to {path}")
     
+    def show_db_error(self, error):
+        """Report an unexpected database error from a background call"""
+        if isinstance(error, PermissionDenied):
+            messagebox.showerror("Permission Denied", str(error))
+            return
+        messagebox.showerror("Database Error", f"Error: {str(error)}")
+    
+    @instrumented("gui.clear_fields")
     def clear_fields(self):
         """Clear all input fields"""
         self.roll_entry.delete(0, tk.END)
@@ -636,6 +1502,7 @@ class StudentManagementApp:
         self.roll_entry.focus()
         self.status_bar.config(text="Fields cleared")
     
+    @instrumented("gui.get_cursor")
     def get_cursor(self, event):
         """Get data from selected row in table"""
         cursor_row = self.student_table.focus()
@@ -652,6 +1519,7 @@ class StudentManagementApp:
             self.marks_entry.delete(0, tk.END)
             self.marks_entry.insert(0, row[2])
     
+    @instrumented("gui.logout")
     def logout(self):
         """Logout and return to login screen"""
         confirm = messagebox.askyesno(
@@ -660,18 +1528,26 @@ class StudentManagementApp:
         )
         
         if confirm:
+            self.executor.shutdown()
+            if self.session is not None:
+                self.db.logout(self.session.token)
             self.root.destroy()
-            login = LoginWindow()
+            login = LoginWindow(db=self.db)
             login.run()
     
     def run(self):
         """Start the main application"""
         self.root.mainloop()
+        self.executor.shutdown()
+        instrumentation.flush()
 
 
 # ==================== MAIN ENTRY POINT ====================
 
 if __name__ == "__main__":
+    # Optional metrics sinks and profiling (see instrumentation.py)
+    configure_from_env()
+    
     # Start with login window
     login = LoginWindow()
     login.run()
\ No newline at end of file
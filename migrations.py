@@ -0,0 +1,480 @@
+"""
+Migrations Module for Student Management System
+Versioned schema upgrades for students.db, tracked in PRAGMA user_version
+
+A Migration moves the database from version - 1 to version by running its
+steps in order. SQLStep and FunctionStep each run in one transaction.
+ChunkedStep rewrites a large table a bounded chunk of rows at a time and
+commits after each chunk, so other connections keep reading and writing
+while it runs. Finished steps and the position of a chunked step are
+recorded in the same transaction as the work, so an interrupted upgrade
+resumes where it stopped. Steps may run again after a crash between
+commits and must therefore be idempotent (CREATE ... IF NOT EXISTS,
+updates that compute the same result twice).
+
+Database applies pending migrations when it opens a file. For a large
+production database, upgrade it ahead of time from the command line:
+
+    python migrations.py students.db             # show the version and pending steps
+    python migrations.py students.db --dry-run   # time the upgrade on a copy
+    python migrations.py students.db --apply --chunk-size 2000 --pause-ms 10
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+PROGRESS_TABLE = "schema_migration_progress"
+
+PROGRESS_SCHEMA = f"""
+    CREATE TABLE IF NOT EXISTS {PROGRESS_TABLE} (
+        version INTEGER NOT NULL,
+        step INTEGER NOT NULL,
+        done INTEGER NOT NULL DEFAULT 0,
+        last_key,
+        rows_done INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (version, step)
+    )
+"""
+
+DEFAULT_CHUNK_SIZE = 1000
+
+# Sleep between chunks so writers waiting on the lock get a turn
+DEFAULT_PAUSE = 0.005
+
+
+def add_column(conn: sqlite3.Connection, table: str, column: str, definition: str):
+    """ALTER TABLE ... ADD COLUMN, skipped if the column exists (keeps steps idempotent)"""
+    existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+    if column not in existing:
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+
+class MigrationError(Exception):
+    """A migration step failed; the database stays at the previous version"""
+
+
+class StepContext:
+    """What a running step may use: its connection, chunking settings and progress"""
+
+    def __init__(self, migrator: "Migrator", conn: sqlite3.Connection,
+                 version: int, step: int, description: str):
+        self.migrator = migrator
+        self.conn = conn
+        self.version = version
+        self.step = step
+        self.description = description
+        self.rows = 0
+        self.chunks = 0
+        self.longest_chunk = 0.0
+
+    def load_position(self) -> Tuple[Any, int]:
+        """(last_key, rows_done) saved by an earlier, interrupted run"""
+        row = self.conn.execute(
+            f"SELECT last_key, rows_done FROM {PROGRESS_TABLE} WHERE version = ? AND step = ?",
+            (self.version, self.step)
+        ).fetchone()
+        return (row[0], row[1]) if row else (None, 0)
+
+    def save_position(self, last_key: Any, rows_done: int):
+        """Record progress; call inside the chunk's transaction"""
+        self.conn.execute(
+            f"INSERT OR REPLACE INTO {PROGRESS_TABLE} (version, step, done, last_key, rows_done) "
+            "VALUES (?, ?, 0, ?, ?)",
+            (self.version, self.step, last_key, rows_done)
+        )
+
+    def report(self, rows_done: int, rows_total: Optional[int]):
+        self.migrator.report({
+            "version": self.version,
+            "step": self.step,
+            "description": self.description,
+            "rows_done": rows_done,
+            "rows_total": rows_total,
+        })
+
+
+class Step:
+    """One unit of a migration"""
+
+    def __init__(self, description: str):
+        self.description = description
+
+    def run(self, context: StepContext):
+        raise NotImplementedError
+
+
+class SQLStep(Step):
+    """
+    Statements run in one transaction
+    statements may be a callable taking the connection, for DDL that
+    depends on the SQLite build (e.g. FTS5)
+    """
+
+    def __init__(self, description: str,
+                 statements: Union[Sequence[str], Callable[[sqlite3.Connection], Iterable[str]]]):
+        super().__init__(description)
+        self.statements = statements
+
+    def run(self, context: StepContext):
+        conn = context.conn
+        statements = self.statements(conn) if callable(self.statements) else self.statements
+        for statement in statements:
+            conn.execute(statement)
+
+
+class FunctionStep(Step):
+    """func(conn) run in one transaction"""
+
+    def __init__(self, description: str, func: Callable[[sqlite3.Connection], None]):
+        super().__init__(description)
+        self.func = func
+
+    def run(self, context: StepContext):
+        self.func(context.conn)
+
+
+class ChunkedStep(Step):
+    """
+    Rewrite a table chunk by chunk, in key order
+    Each chunk selects (key, *columns) for the next chunk_size rows after
+    the last key done (optionally only rows matching where) and passes
+    them to apply(conn, rows). Every chunk is its own short transaction.
+    chunk_size overrides the migrator's for steps with costly rows.
+    """
+
+    def __init__(self, description: str, table: str, columns: Sequence[str],
+                 apply: Callable[[sqlite3.Connection, List[tuple]], None],
+                 key: str = "rowid", where: Optional[str] = None,
+                 chunk_size: Optional[int] = None):
+        super().__init__(description)
+        self.table = table
+        self.columns = list(columns)
+        self.apply = apply
+        self.key = key
+        self.where = where
+        self.chunk_size = chunk_size
+
+    def _select_sql(self, first: bool) -> str:
+        conditions = [] if first else [f"{self.key} > ?"]
+        if self.where:
+            conditions.append(f"({self.where})")
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        return (f"SELECT {', '.join([self.key] + self.columns)} FROM {self.table}{where} "
+                f"ORDER BY {self.key} LIMIT ?")
+
+    def count(self, conn: sqlite3.Connection) -> int:
+        where = f" WHERE {self.where}" if self.where else ""
+        return conn.execute(f"SELECT COUNT(*) FROM {self.table}{where}").fetchone()[0]
+
+    def run(self, context: StepContext):
+        conn = context.conn
+        migrator = context.migrator
+        chunk_size = self.chunk_size or migrator.chunk_size
+
+        # The caller opened a transaction for this step; chunks make their own
+        conn.execute("COMMIT")
+        last_key, rows_done = context.load_position()
+        context.rows = rows_done
+        total = self.count(conn)
+        context.report(rows_done, total)
+
+        while True:
+            started = time.perf_counter()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Another process opening the file may be running this step
+                # too: go on from the position it saved, or stop if it is done
+                if migrator._step_done(conn, context.version, context.step):
+                    rows = []
+                else:
+                    last_key, rows_done = context.load_position()
+                    if last_key is None:
+                        rows = conn.execute(self._select_sql(True), (chunk_size,)).fetchall()
+                    else:
+                        rows = conn.execute(self._select_sql(False),
+                                            (last_key, chunk_size)).fetchall()
+                if rows:
+                    self.apply(conn, rows)
+                    last_key = rows[-1][0]
+                    rows_done += len(rows)
+                    context.save_position(last_key, rows_done)
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            if not rows:
+                # Leave the transaction open for the caller to finish the step
+                break
+            conn.execute("COMMIT")
+
+            elapsed = time.perf_counter() - started
+            context.longest_chunk = max(context.longest_chunk, elapsed)
+            context.chunks += 1
+            context.rows = rows_done
+            context.report(rows_done, total)
+            if len(rows) < chunk_size:
+                conn.execute("BEGIN IMMEDIATE")
+                break
+            if migrator.pause > 0:
+                time.sleep(migrator.pause)
+
+
+class Migration:
+    """Upgrade from version - 1 to version"""
+
+    def __init__(self, version: int, description: str, steps: Sequence[Step]):
+        self.version = version
+        self.description = description
+        self.steps = list(steps)
+
+    def __repr__(self):
+        return f"Migration({self.version}, {self.description!r})"
+
+
+class Migrator:
+    """
+    Applies migrations to one database file
+    connect opens a new sqlite3 connection to it; the migrator uses a
+    connection of its own and manages transactions explicitly
+    progress, if given, receives a dict for every chunk and finished step
+    """
+
+    def __init__(self, connect: Callable[[], sqlite3.Connection], migrations: Sequence[Migration],
+                 chunk_size: int = DEFAULT_CHUNK_SIZE, pause: float = DEFAULT_PAUSE,
+                 progress: Optional[Callable[[Dict[str, Any]], None]] = None):
+        versions = [migration.version for migration in migrations]
+        if versions != list(range(1, len(versions) + 1)):
+            raise ValueError(f"Migration versions must be 1, 2, 3, ... in order, got {versions}")
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+        self.connect = connect
+        self.migrations = list(migrations)
+        self.chunk_size = chunk_size
+        self.pause = pause
+        self.progress = progress
+
+    @property
+    def latest_version(self) -> int:
+        return self.migrations[-1].version if self.migrations else 0
+
+    def report(self, event: Dict[str, Any]):
+        if self.progress is not None:
+            self.progress(event)
+
+    def _open(self) -> sqlite3.Connection:
+        conn = self.connect()
+        # Transactions are begun and committed explicitly below
+        conn.isolation_level = None
+        return conn
+
+    def current_version(self) -> int:
+        conn = self._open()
+        try:
+            return conn.execute("PRAGMA user_version").fetchone()[0]
+        finally:
+            conn.close()
+
+    def pending(self, target: Optional[int] = None) -> List[Migration]:
+        """Migrations not yet applied, up to target (default: the latest)"""
+        current = self.current_version()
+        target = self.latest_version if target is None else target
+        return [m for m in self.migrations if current < m.version <= target]
+
+    def migrate(self, target: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Apply pending migrations up to target (default: the latest)
+        Returns the timing of every step that ran
+        """
+        target = self.latest_version if target is None else target
+        if not 0 <= target <= self.latest_version:
+            raise ValueError(f"Unknown schema version {target} (latest is {self.latest_version})")
+
+        timings = []
+        conn = self._open()
+        try:
+            current = conn.execute("PRAGMA user_version").fetchone()[0]
+            if current > self.latest_version:
+                raise MigrationError(
+                    f"Database schema version {current} is newer than this program "
+                    f"supports ({self.latest_version})"
+                )
+            if target < current:
+                raise MigrationError(f"Cannot downgrade from version {current} to {target}")
+
+            for migration in self.migrations:
+                if current < migration.version <= target:
+                    timings.extend(self._apply(conn, migration))
+        finally:
+            conn.close()
+        return timings
+
+    @staticmethod
+    def _step_done(conn: sqlite3.Connection, version: int, step: int) -> bool:
+        """True if another run (or process) already finished this step"""
+        if conn.execute("PRAGMA user_version").fetchone()[0] >= version:
+            return True
+        return conn.execute(
+            f"SELECT 1 FROM {PROGRESS_TABLE} WHERE version = ? AND step = ? AND done = 1",
+            (version, step)
+        ).fetchone() is not None
+
+    def _apply(self, conn: sqlite3.Connection, migration: Migration) -> List[Dict[str, Any]]:
+        conn.execute(PROGRESS_SCHEMA)
+
+        timings = []
+        last_step = len(migration.steps) - 1
+        for number, step in enumerate(migration.steps):
+            context = StepContext(self, conn, migration.version, number, step.description)
+            started = time.perf_counter()
+            conn.execute("BEGIN IMMEDIATE")
+            # Checked under the write lock, so two processes opening the
+            # same file at once do not both run the step
+            if self._step_done(conn, migration.version, number):
+                conn.execute("ROLLBACK")
+                continue
+            try:
+                step.run(context)
+                if self._step_done(conn, migration.version, number):
+                    # Another process finished this (chunked) step meanwhile
+                    conn.execute("COMMIT")
+                    continue
+                conn.execute(
+                    f"INSERT OR REPLACE INTO {PROGRESS_TABLE} (version, step, done, rows_done) "
+                    "VALUES (?, ?, 1, ?)",
+                    (migration.version, number, context.rows)
+                )
+                if number == last_step:
+                    # The version moves in the same transaction as the last step
+                    conn.execute(f"DELETE FROM {PROGRESS_TABLE} WHERE version = ?", (migration.version,))
+                    conn.execute(f"PRAGMA user_version = {int(migration.version)}")
+                conn.execute("COMMIT")
+            except Exception as e:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                raise MigrationError(
+                    f"Migration {migration.version} step {number + 1} "
+                    f"({step.description}) failed: {e}"
+                ) from e
+
+            timing = {
+                "version": migration.version,
+                "step": number,
+                "description": step.description,
+                "seconds": round(time.perf_counter() - started, 6),
+                "rows": context.rows,
+                "chunks": context.chunks,
+                "longest_chunk_ms": round(context.longest_chunk * 1000, 3),
+            }
+            timings.append(timing)
+            self.report(dict(timing, finished=True))
+
+        if not migration.steps:
+            conn.execute(f"PRAGMA user_version = {int(migration.version)}")
+        return timings
+
+    def dry_run(self, path: str, target: Optional[int] = None,
+                directory: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Time the upgrade on a temporary copy of the database at path
+        (made with the SQLite backup API, so it is consistent while in use)
+        """
+        source = sqlite3.connect(path)
+        with tempfile.TemporaryDirectory(prefix="sms-migrate-", dir=directory) as tmp:
+            copy_path = os.path.join(tmp, os.path.basename(path))
+            copy = sqlite3.connect(copy_path)
+            try:
+                source.backup(copy)
+            finally:
+                copy.close()
+                source.close()
+
+            dry = Migrator(lambda: sqlite3.connect(copy_path), self.migrations,
+                           chunk_size=self.chunk_size, pause=self.pause, progress=self.progress)
+            return dry.migrate(target)
+
+
+# ==================== COMMAND LINE ====================
+
+def format_timings(timings: List[Dict[str, Any]]) -> str:
+    lines = [f"  {'version':>7}  {'step':<46}{'seconds':>10}{'rows':>10}{'longest chunk ms':>18}"]
+    for timing in timings:
+        lines.append(
+            f"  {timing['version']:>7}  {timing['description'][:45]:<46}{timing['seconds']:>10.3f}"
+            f"{timing['rows']:>10}{timing['longest_chunk_ms']:>18.1f}"
+        )
+    return "\n".join(lines)
+
+
+def print_progress(event: Dict[str, Any]):
+    if event.get("finished") or not event.get("rows_total"):
+        return
+    percent = event["rows_done"] * 100 / event["rows_total"]
+    print(f"  v{event['version']} {event['description']}: "
+          f"{event['rows_done']}/{event['rows_total']} rows ({percent:.0f}%)",
+          file=sys.stderr, flush=True)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    # database imports this module, so import it only when run as a script
+    from database import MIGRATIONS
+
+    parser = argparse.ArgumentParser(description="Upgrade the schema of a students database")
+    parser.add_argument("database", nargs="?", default="students.db")
+    action = parser.add_mutually_exclusive_group()
+    action.add_argument("--apply", action="store_true", help="apply pending migrations")
+    action.add_argument("--dry-run", action="store_true",
+                        help="apply them to a temporary copy and report timings")
+    parser.add_argument("--target", type=int, default=None, help="stop at this version")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f"rows per transaction in chunked steps (default {DEFAULT_CHUNK_SIZE})")
+    parser.add_argument("--pause-ms", type=float, default=DEFAULT_PAUSE * 1000,
+                        help="pause between chunks in milliseconds")
+    parser.add_argument("--json", action="store_true", help="print timings as JSON")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.database):
+        print(f"Error: {args.database} does not exist", file=sys.stderr)
+        return 2
+
+    migrator = Migrator(lambda: sqlite3.connect(args.database), MIGRATIONS,
+                        chunk_size=args.chunk_size, pause=args.pause_ms / 1000,
+                        progress=None if args.json else print_progress)
+    current = migrator.current_version()
+    pending = migrator.pending(args.target)
+    if not (args.apply or args.dry_run):
+        print(f"{args.database}: schema version {current}, latest {migrator.latest_version}")
+        for migration in pending:
+            print(f"  pending v{migration.version}: {migration.description}")
+            for step in migration.steps:
+                print(f"    - {step.description}")
+        return 0
+    if not pending:
+        print(f"{args.database} is up to date (version {current})")
+        return 0
+
+    try:
+        if args.dry_run:
+            timings = migrator.dry_run(args.database, args.target,
+                                       directory=os.path.dirname(os.path.abspath(args.database)))
+        else:
+            timings = migrator.migrate(args.target)
+    except (MigrationError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    if args.json:
+        print(json.dumps(timings, indent=2))
+    else:
+        print(f"{'Dry run' if args.dry_run else 'Migrated'}: version {current} -> "
+              f"{pending[-1].version}")
+        print(format_timings(timings))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
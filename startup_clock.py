@@ -0,0 +1,9 @@
+"""
+Startup Clock for Student Management System
+Imported first by main.py, so the time it records comes before every other
+import and the startup report includes them
+"""
+
+import time
+
+STARTED = time.perf_counter()
@@ -0,0 +1,111 @@
+"""
+Student Cache Module for Student Management System
+In-process LRU cache for student lookups by roll number
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+# Returned by LRUCache.get on a miss (None is a valid cached value)
+MISSING = object()
+
+
+class LRUCache:
+    """
+    Thread-safe least recently used cache with an optional time to live
+
+    Holds at most maxsize entries; adding one more evicts the entry that
+    was used longest ago. Entries older than ttl seconds are treated as
+    misses, which bounds how stale a value can get when another process
+    writes to the same database file. maxsize=0 disables caching.
+
+    Reads that race with writes are handled with a generation counter:
+    call begin() before reading the backing store and pass the token to
+    put(). If any key was invalidated in between, the value may predate
+    the write and is not cached.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = 30.0):
+        if maxsize < 0:
+            raise ValueError("maxsize must not be negative")
+        self.maxsize = maxsize
+        self.ttl = ttl
+
+        self._lock = threading.Lock()
+        # key -> (value, stored_at)
+        self._entries: "OrderedDict[Hashable, Tuple[Any, float]]" = OrderedDict()
+        self._generation = 0
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "expired": 0,
+            "invalidations": 0,
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # ==================== LOOKUP ====================
+
+    def get(self, key: Hashable) -> Any:
+        """Return the cached value for key, or MISSING"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats["misses"] += 1
+                return MISSING
+
+            value, stored_at = entry
+            if self.ttl is not None and time.monotonic() - stored_at > self.ttl:
+                del self._entries[key]
+                self._stats["expired"] += 1
+                self._stats["misses"] += 1
+                return MISSING
+
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return value
+
+    def begin(self) -> int:
+        """Token for a read of the backing store, to be passed to put()"""
+        return self._generation
+
+    def put(self, key: Hashable, value: Any, token: Optional[int] = None):
+        """
+        Cache value under key, evicting the least recently used entry if full
+        Skipped if token is given and an invalidation happened since begin()
+        """
+        if self.maxsize == 0:
+            return
+        with self._lock:
+            if token is not None and token != self._generation:
+                return
+            self._entries[key] = (value, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    # ==================== INVALIDATION ====================
+
+    def invalidate(self, key: Hashable):
+        """Drop key after its backing row changed"""
+        with self._lock:
+            self._generation += 1
+            self._entries.pop(key, None)
+            self._stats["invalidations"] += 1
+
+    def clear(self):
+        """Drop every entry, e.g. after a bulk write"""
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._stats["invalidations"] += 1
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss/eviction counters and the current size"""
+        with self._lock:
+            return dict(self._stats, size=len(self._entries), maxsize=self.maxsize)
@@ -0,0 +1,33 @@
+"""
+Shared fixtures for the Student Management System tests
+The modules under test live at the repository root, next to main.py
+"""
+
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from auth import HashPolicy  # noqa: E402  (needs ROOT on sys.path)
+
+# Cheap hashes keep login tests fast; production uses DEFAULT_HASH_POLICY
+FAST_HASH_POLICY = HashPolicy("scrypt", n=16, r=1, p=1)
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "students.db")
+
+
+@pytest.fixture
+def db(db_path):
+    """A migrated Database on a fresh file, closed after the test"""
+    from database import Database
+
+    database = Database(db_path, password_policy=FAST_HASH_POLICY)
+    yield database
+    database.close()
@@ -0,0 +1,81 @@
+import asyncio
+import threading
+
+import pytest
+
+from async_database import AsyncDatabase
+from auth import PermissionDenied
+from database import Database
+
+from conftest import FAST_HASH_POLICY
+
+
+@pytest.fixture
+def async_db(db_path):
+    return AsyncDatabase(database=Database(db_path, pool_size=6, password_policy=FAST_HASH_POLICY))
+
+
+def test_concurrent_tasks_keep_their_own_sessions(async_db):
+    async def scenario():
+        async with async_db:
+            admin = await async_db.login("admin", "1234")
+            async_db.use_session(admin)
+            for username, role in (("ed", "editor"), ("vi", "viewer")):
+                assert (await async_db.create_user(username, f"{username}-pass", role))[0]
+
+            async def act(username, roll_nos):
+                async_db.use_session(await async_db.login(username, f"{username}-pass"))
+                results = []
+                for roll_no in roll_nos:
+                    try:
+                        results.append((await async_db.add_student(roll_no, username, 50))[0])
+                    except PermissionDenied:
+                        results.append("denied")
+                return results
+
+            # Tasks copy the context, so each one's use_session stays its own
+            editor, viewer = await asyncio.gather(act("ed", range(1, 21)),
+                                                  act("vi", range(101, 121)))
+            history = await async_db.get_audit_log(limit=100)
+            # This task still acts as admin after the others logged in
+            assert (await async_db.add_student(500, "Admin Entry", 90))[0]
+            latest = await async_db.get_student_history(500)
+            return editor, viewer, history, latest
+
+    editor, viewer, history, latest = asyncio.run(scenario())
+
+    assert editor == [True] * 20
+    assert viewer == ["denied"] * 20
+    assert {entry.username for entry in history} == {"ed"}
+    assert sorted(entry.roll_no for entry in history) == list(range(1, 21))
+    assert [entry.username for entry in latest] == ["admin"]
+
+
+def test_login_upgrade_runs_on_the_writer(async_db, monkeypatch):
+    store = async_db.db.store_password_upgrade
+    threads = []
+
+    def record_thread(upgrade):
+        threads.append(threading.current_thread().name)
+        store(upgrade)
+
+    monkeypatch.setattr(async_db.db, "store_password_upgrade", record_thread)
+
+    async def scenario():
+        async with async_db:
+            session = await async_db.login("admin", "1234")
+            return session, await async_db.verify_login("admin", "1234")
+
+    session, verified = asyncio.run(scenario())
+    assert session.role == "admin" and verified
+    # Only the first login rehashes (from the default to the test policy)
+    assert len(threads) == 1 and threads[0].startswith("async-db-write")
+
+
+def test_closed_database_refuses_calls(async_db):
+    async def scenario():
+        await async_db.close()
+        with pytest.raises(RuntimeError, match="closed"):
+            await async_db.get_student_count()
+
+    asyncio.run(scenario())
@@ -0,0 +1,182 @@
+import sqlite3
+import threading
+
+import pytest
+
+from audit import AUDIT_SCHEMA, AuditLog, make_entry
+
+
+@pytest.fixture
+def connect(db_path):
+    conn = sqlite3.connect(db_path)
+    for statement in AUDIT_SCHEMA:
+        conn.execute(statement)
+    conn.commit()
+    conn.close()
+    return lambda: sqlite3.connect(db_path, timeout=10)
+
+
+def logged(connect):
+    conn = connect()
+    rows = conn.execute("SELECT roll_no FROM audit_log ORDER BY id").fetchall()
+    conn.close()
+    return [row[0] for row in rows]
+
+
+def entries(roll_nos, username="tester"):
+    return [make_entry("insert", roll_no, username, after=("Name", 50.0, "C")) for roll_no in roll_nos]
+
+
+# ==================== WRITER ====================
+
+def test_flush_waits_for_queued_entries(connect):
+    log = AuditLog(connect, batch_size=10, linger=0.1)
+    log.record(entries(range(25)))
+    assert log.flush(timeout=5)
+    assert logged(connect) == list(range(25))
+    stats = log.stats()
+    assert (stats["queued"], stats["written"], stats["pending"]) == (25, 25, 0)
+    assert stats["batches"] >= 3
+    log.close()
+
+
+def test_full_queue_blocks_instead_of_dropping(connect):
+    log = AuditLog(connect, max_queue=5, batch_size=2, linger=0.0)
+    log.record(entries(range(100)))
+    log.close()
+    assert logged(connect) == list(range(100))
+    assert log.stats()["dropped"] == 0
+
+
+def test_close_writes_entries_recorded_concurrently(connect):
+    log = AuditLog(connect, max_queue=20, batch_size=8)
+    producers = [
+        threading.Thread(target=lambda start=start: [log.record(entries([start + i]))
+                                                     for i in range(200)])
+        for start in (0, 1000, 2000)
+    ]
+    for thread in producers:
+        thread.start()
+    log.close()
+    for thread in producers:
+        thread.join()
+    assert len(logged(connect)) == 600
+
+
+def test_record_after_close_writes_directly(connect):
+    log = AuditLog(connect)
+    log.record(entries([1]))
+    log.close()
+    log.record(entries([2]))
+    assert logged(connect) == [1, 2]
+    assert log.stats()["direct"] == 1
+
+
+def test_dead_writer_falls_back_to_direct_writes(connect):
+    log = AuditLog(connect)
+    log.record(entries([1]))
+    assert log.flush(timeout=5)
+    # Stop the writer behind the log's back
+    log._queue.put(None)
+    log._thread.join(5)
+
+    log.record(entries([2]))
+    assert logged(connect) == [1, 2]
+    log.close()
+
+
+def test_connect_failures_are_retried(connect):
+    failures = [sqlite3.OperationalError("unable to open database file")] * 2
+
+    def flaky_connect():
+        if failures:
+            raise failures.pop()
+        return connect()
+
+    log = AuditLog(flaky_connect, retries=3)
+    log.record(entries([1]))
+    assert log.flush(timeout=5)
+    assert logged(connect) == [1]
+    assert log.stats()["connect_failures"] == 2
+    log.close()
+
+
+def test_batch_is_dropped_after_the_last_retry():
+    def broken_connect():
+        raise sqlite3.OperationalError("unable to open database file")
+
+    log = AuditLog(broken_connect, retries=1)
+    log.record(entries([1, 2]))
+    assert log.flush(timeout=5)
+    stats = log.stats()
+    assert stats["dropped"] == 2 and stats["connect_failures"] == 2
+    log.close()
+
+
+def test_log_is_append_only(connect):
+    log = AuditLog(connect)
+    log.record(entries([1]))
+    log.close()
+    conn = connect()
+    with pytest.raises(sqlite3.IntegrityError, match="append-only"):
+        conn.execute("DELETE FROM audit_log")
+    with pytest.raises(sqlite3.IntegrityError, match="append-only"):
+        conn.execute("UPDATE audit_log SET username = 'someone'")
+    conn.close()
+
+
+# ==================== DATABASE ====================
+
+def test_history_is_newest_first_with_before_and_after(db):
+    with db.bound_session(db.login("admin", "1234")):
+        db.add_student(1, "Asha", 40)
+        db.update_student(1, "Asha K", 85)
+        db.delete_student(1)
+
+    history = db.get_student_history(1)
+
+    assert [entry.action for entry in history] == ["delete", "update", "insert"]
+    assert {entry.username for entry in history} == {"admin"}
+    delete, update, insert = history
+    assert (insert.old_name, insert.new_name, insert.new_marks) == (None, "Asha", 40)
+    assert (update.old_name, update.old_marks, update.new_name, update.new_marks) == \
+        ("Asha", 40, "Asha K", 85)
+    assert (delete.old_name, delete.new_name) == ("Asha K", None)
+
+
+def test_history_keeps_order_within_the_same_timestamp(db, monkeypatch):
+    import audit
+    monkeypatch.setattr(audit.time, "time", lambda: 1700000000.0)
+    db.add_student(1, "Asha", 10)
+    db.update_student(1, "Asha", 20)
+    db.update_student(1, "Asha", 30)
+    assert [entry.new_marks for entry in db.get_student_history(1)] == [30, 20, 10]
+
+
+def test_history_filters(db):
+    db.add_student(1, "Asha", 40)
+    db.add_student(2, "Ravi", 50)
+    db.delete_student(2)
+    assert [entry.roll_no for entry in db.get_audit_log(action="insert")] == [2, 1]
+    assert [entry.action for entry in db.get_audit_log(roll_no=2)] == ["delete", "insert"]
+    assert db.get_audit_log(username="nobody") == []
+    with pytest.raises(ValueError):
+        db.get_audit_log(action="rename")
+
+
+def test_transaction_entries_appear_only_on_commit(db):
+    with pytest.raises(RuntimeError):
+        with db.transaction():
+            db.add_student(1, "Asha", 40)
+            raise RuntimeError("abort")
+    assert db.get_student_history(1) == []
+
+    with db.transaction():
+        db.add_student(2, "Ravi", 50)
+        db.update_student(2, "Ravi", 60)
+    assert [entry.action for entry in db.get_student_history(2)] == ["update", "insert"]
+
+
+def test_bulk_import_is_audited(db):
+    db.add_students_bulk([(roll_no, f"Student {roll_no}", 60) for roll_no in range(1, 51)])
+    assert len(db.get_audit_log(action="insert", limit=1000)) == 50
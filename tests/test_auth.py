@@ -0,0 +1,159 @@
+import sqlite3
+
+import pytest
+
+from auth import (DEFAULT_HASH_POLICY, AuthenticationError, HashPolicy, LoginThrottle,
+                  LoginThrottled, SessionManager, is_hashed)
+
+from conftest import FAST_HASH_POLICY
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+def stored_password(db, username="admin"):
+    conn = sqlite3.connect(db.db_name)
+    password = conn.execute("SELECT password FROM admin WHERE username = ?", (username,)).fetchone()[0]
+    conn.close()
+    return password
+
+
+# ==================== HASHING ====================
+
+def test_hash_verifies_only_the_right_password():
+    stored = FAST_HASH_POLICY.hash("correct horse")
+    assert is_hashed(stored)
+    assert FAST_HASH_POLICY.verify("correct horse", stored)
+    assert not FAST_HASH_POLICY.verify("wrong horse", stored)
+    assert FAST_HASH_POLICY.hash("correct horse") != stored
+
+
+def test_plaintext_and_other_policies_need_rehash():
+    assert FAST_HASH_POLICY.needs_rehash("1234")
+    assert FAST_HASH_POLICY.needs_rehash(HashPolicy("scrypt", n=32, r=1, p=1).hash("x"))
+    assert not FAST_HASH_POLICY.needs_rehash(FAST_HASH_POLICY.hash("x"))
+
+
+def test_corrupt_hash_fails_closed():
+    assert not FAST_HASH_POLICY.verify("1234", "scrypt$16$1$1$not-base64$")
+
+
+def test_policy_parse():
+    assert HashPolicy.parse("scrypt:n=32,r=2,p=1").describe() == "scrypt:n=32,r=2,p=1"
+    with pytest.raises(ValueError):
+        HashPolicy.parse("scrypt:cost=3")
+
+
+# ==================== THROTTLE ====================
+
+def test_throttle_locks_after_max_failures():
+    clock = FakeClock()
+    throttle = LoginThrottle(max_failures=3, window=60, lockout=30, clock=clock)
+    for _ in range(2):
+        throttle.failure("admin")
+    assert throttle.check("admin") == 0
+
+    throttle.failure("admin")
+    assert throttle.check("admin") == 30
+    assert throttle.check("someone-else") == 0
+
+    clock.advance(30)
+    assert throttle.check("admin") == 0
+
+
+def test_throttle_lockouts_escalate_up_to_max():
+    clock = FakeClock()
+    throttle = LoginThrottle(max_failures=1, window=60, lockout=30, max_lockout=100, clock=clock)
+    lockouts = []
+    for _ in range(4):
+        throttle.failure("admin")
+        lockouts.append(throttle.check("admin"))
+        clock.advance(lockouts[-1])
+    assert lockouts == [30, 60, 100, 100]
+
+
+def test_throttle_success_resets():
+    throttle = LoginThrottle(max_failures=2)
+    throttle.failure("admin")
+    throttle.success("admin")
+    throttle.failure("admin")
+    assert throttle.check("admin") == 0
+
+
+def test_throttle_forgets_oldest_usernames():
+    throttle = LoginThrottle(max_entries=2)
+    for username in ("a", "b", "c"):
+        throttle.failure(username)
+    assert throttle.stats()["tracked"] == 2
+
+
+# ==================== LOGIN ====================
+
+def test_login_upgrades_the_stored_hash(db):
+    # The migration hashed the default admin with the default policy
+    before = stored_password(db)
+    assert DEFAULT_HASH_POLICY.verify("1234", before)
+
+    session = db.login("admin", "1234")
+
+    assert (session.username, session.role) == ("admin", "admin")
+    after = stored_password(db)
+    assert after != before
+    assert not FAST_HASH_POLICY.needs_rehash(after)
+    assert FAST_HASH_POLICY.verify("1234", after)
+
+
+def test_wrong_password_is_rejected_then_throttled(db):
+    for _ in range(db.throttle.max_failures):
+        with pytest.raises(AuthenticationError) as error:
+            db.login("admin", "wrong")
+        assert not isinstance(error.value, LoginThrottled)
+
+    # Even the right password is refused while locked out
+    with pytest.raises(LoginThrottled):
+        db.login("admin", "1234")
+
+
+def test_unknown_user_is_rejected(db):
+    with pytest.raises(AuthenticationError):
+        db.login("nobody", "1234")
+
+
+# ==================== SESSIONS ====================
+
+def test_session_expires_after_ttl():
+    clock = FakeClock()
+    sessions = SessionManager(ttl=60, clock=clock)
+    session = sessions.create("admin", "admin")
+    assert sessions.get(session.token) is session
+
+    clock.advance(60)
+    assert sessions.get(session.token) is None
+    assert not session.allows("read")
+
+
+def test_session_idle_timeout():
+    clock = FakeClock()
+    sessions = SessionManager(ttl=3600, idle_timeout=10, clock=clock)
+    session = sessions.create("admin", "admin")
+    clock.advance(9)
+    assert sessions.get(session.token) is session
+    clock.advance(11)
+    assert sessions.get(session.token) is None
+
+
+def test_revoke_user_keeps_one_session():
+    sessions = SessionManager()
+    keep = sessions.create("admin", "admin")
+    other = sessions.create("admin", "admin")
+    sessions.revoke_user("admin", keep=keep.token)
+    assert sessions.get(keep.token) is keep
+    assert sessions.get(other.token) is None and not other.active
@@ -0,0 +1,52 @@
+import json
+
+import pytest
+
+import benchmark
+from benchmark import generate_students, parse_sizes, percentile, summarize
+
+
+def test_generate_students_is_reproducible():
+    first = list(generate_students(50, seed=3))
+    assert first == list(generate_students(50, seed=3))
+    assert [row[0] for row in first] == list(range(1, 51))
+    assert all(0 <= marks <= 100 for _, _, marks in first)
+    assert next(generate_students(1, start=1000))[0] == 1000
+
+
+def test_percentile_interpolates():
+    values = [1.0, 2.0, 3.0, 4.0]
+    assert percentile(values, 0) == 1.0
+    assert percentile(values, 50) == 2.5
+    assert percentile(values, 100) == 4.0
+    assert percentile([], 95) == 0.0
+
+
+def test_summarize():
+    summary = summarize([0.002, 0.001, 0.003])
+    assert summary["calls"] == 3
+    assert summary["p50_ms"] == 2.0
+    assert summary["max_ms"] == 3.0
+    assert summary["ops_per_sec"] == pytest.approx(500.0)
+
+
+def test_parse_sizes():
+    assert parse_sizes("1k, 10_000,2.5m") == [1000, 10000, 2500000]
+    with pytest.raises(ValueError):
+        parse_sizes("lots")
+
+
+def test_small_run_times_every_operation(tmp_path, capsys):
+    output = tmp_path / "bench.json"
+    assert benchmark.main(["--sizes", "200", "--ops", "20", "--heavy-ops", "1",
+                           "--dir", str(tmp_path), "--output", str(output)]) == 0
+
+    report = json.loads(output.read_text())
+    run, = report["runs"]
+    assert run["students"] == 200
+    assert run["operations"]["search_student"]["calls"] == 20
+    assert run["operations"]["verify_login"]["calls"] == 1
+    assert set(run["operations"]) >= {"add_student", "update_student", "delete_student"}
+    assert "200 students" in capsys.readouterr().out
+    # The temporary database is removed afterwards
+    assert [path.name for path in tmp_path.iterdir()] == ["bench.json"]
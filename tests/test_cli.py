@@ -0,0 +1,102 @@
+import io
+import json
+
+import pytest
+
+import cli
+
+
+@pytest.fixture
+def run(db_path, capsys):
+    """Run the CLI against a temporary database; returns (exit code, stdout, stderr)"""
+    def run(*argv, stdin=None):
+        code = cli.main(["--db", db_path, *argv],
+                        stdin=io.StringIO(stdin) if stdin is not None else None)
+        captured = capsys.readouterr()
+        return code, captured.out, captured.err
+    return run
+
+
+def test_add_search_and_list(run):
+    assert run("add", "101", "Asha Rao", "88.5")[0] == 0
+    assert run("add", "102", "Ravi", "45")[0] == 0
+
+    code, out, _ = run("search", "101")
+    assert code == 0 and "Asha Rao" in out
+
+    code, out, _ = run("--output", "jsonl", "list", "--sort", "marks", "--desc")
+    rows = [json.loads(line) for line in out.splitlines()]
+    assert [row["roll_no"] for row in rows] == [101, 102]
+
+
+def test_invalid_input_fails(run):
+    code, _, err = run("add", "101", "Asha", "150")
+    assert code == 1 and "Error" in err
+    code, _, err = run("add", "101", "Asha")
+    assert code == 2
+
+
+def test_missing_student_fails(run):
+    code, _, err = run("delete", "999")
+    assert code == 1 and err
+
+
+def test_export_and_import_round_trip(run, tmp_path, capsys):
+    run("add", "1", "Asha", "70")
+    run("add", "2", "Ravi", "80")
+    path = str(tmp_path / "students.csv")
+    assert run("export", path)[0] == 0
+
+    other = str(tmp_path / "other.db")
+    assert cli.main(["--db", other, "import", path]) == 0
+    capsys.readouterr()
+    assert cli.main(["--db", other, "--output", "csv", "list", "--no-header"]) == 0
+    assert capsys.readouterr().out.splitlines() == ["1,Asha,70.0,B+", "2,Ravi,80.0,A"]
+
+
+def test_batch_runs_in_one_transaction(run):
+    code, _, err = run("--batch", stdin="# nightly\nadd 1 Asha 70\n\nadd 2 Ravi 80\nadd 1 Dup 50\n")
+    assert code == 1
+    assert err.startswith("line 5: ")
+
+    code, out, _ = run("--output", "csv", "list", "--no-header")
+    assert out.splitlines() == ["1,Asha,70.0,B+", "2,Ravi,80.0,A"]
+
+
+def test_atomic_batch_rolls_back_on_failure(run):
+    code, _, err = run("--batch", "--atomic", stdin="add 1 Asha 70\nadd 1 Dup 50\n")
+    assert code == 1 and "rolled back" in err
+    assert run("search", "1")[0] == 1
+
+
+def test_user_commands_need_a_login(run, monkeypatch):
+    code, _, err = run("users")
+    assert code == 1 and "(use --user)" in err
+
+    monkeypatch.setenv("SMS_PASSWORD", "1234")
+    code, out, _ = run("--user", "admin", "users")
+    assert code == 0 and "admin" in out
+
+
+def test_wrong_password_is_refused(run, monkeypatch):
+    monkeypatch.setenv("SMS_PASSWORD", "wrong")
+    code, _, err = run("--user", "admin", "list")
+    assert code == 1 and "Invalid" in err
+
+
+def test_viewer_cannot_write(run, monkeypatch):
+    monkeypatch.setenv("SMS_PASSWORD", "1234")
+    monkeypatch.setenv("SMS_NEW_PASSWORD", "viewer-pass")
+    assert run("--user", "admin", "user-add", "clerk", "viewer")[0] == 0
+
+    monkeypatch.setenv("SMS_PASSWORD", "viewer-pass")
+    code, _, err = run("--user", "clerk", "add", "1", "Asha", "70")
+    assert code == 1 and "not allowed" in err
+
+
+def test_history_shows_changes(run):
+    run("add", "1", "Asha", "70")
+    run("update", "1", "Asha", "75")
+    code, out, _ = run("history", "1")
+    assert code == 0
+    assert out.index("update") < out.index("insert")
@@ -0,0 +1,112 @@
+import sqlite3
+import threading
+
+import pytest
+
+from connection_pool import ConnectionPool
+
+
+@pytest.fixture
+def pool(db_path):
+    pool = ConnectionPool(db_path, max_size=2, idle_timeout=60.0)
+    yield pool
+    pool.close()
+
+
+def test_thread_gets_its_own_connection_back(pool):
+    first = pool.acquire()
+    raw = first.raw
+    first.close()
+
+    second = pool.acquire()
+    assert second.raw is raw
+    second.close()
+
+    stats = pool.stats()
+    assert (stats["opens"], stats["hits"], stats["misses"]) == (1, 1, 1)
+    assert stats["idle"] == 1 and stats["in_use"] == 0
+
+
+def test_close_twice_releases_once(pool):
+    conn = pool.acquire()
+    conn.close()
+    conn.close()
+    assert pool.stats()["idle"] == 1
+
+
+def test_full_pool_recycles_another_threads_idle_connection(pool):
+    # Two live threads at once, so they have different thread ids
+    barrier = threading.Barrier(2)
+
+    def use_connection():
+        conn = pool.acquire()
+        barrier.wait()
+        conn.close()
+
+    threads = [threading.Thread(target=use_connection) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert pool.stats()["idle"] == 2
+
+    # Both idle connections belong to other threads and the pool is full
+    conn = pool.acquire()
+    conn.close()
+
+    stats = pool.stats()
+    assert stats["evictions"] == 1
+    assert stats["opens"] == 3
+    assert stats["open"] == 2
+
+
+def test_acquire_times_out_when_every_connection_is_in_use(pool):
+    held = [pool.acquire(), pool.acquire()]
+    with pytest.raises(TimeoutError):
+        pool.acquire(timeout=0.05)
+    assert pool.stats()["waits"] == 1
+    for conn in held:
+        conn.close()
+
+
+def test_waiting_thread_gets_released_connection(pool):
+    held = [pool.acquire(), pool.acquire()]
+    acquired = threading.Event()
+
+    def wait_for_connection():
+        pool.acquire(timeout=5).close()
+        acquired.set()
+
+    thread = threading.Thread(target=wait_for_connection)
+    thread.start()
+    held.pop().close()
+    thread.join(5)
+    assert acquired.is_set()
+    held.pop().close()
+
+
+def test_idle_connections_expire(db_path):
+    pool = ConnectionPool(db_path, max_size=2, idle_timeout=0.0)
+    pool.acquire().close()
+    pool.prune()
+    stats = pool.stats()
+    assert stats["expired"] == 1 and stats["open"] == 0 and stats["closes"] == 1
+    pool.close()
+
+
+def test_release_discards_uncommitted_changes(pool):
+    conn = pool.acquire()
+    conn.execute("CREATE TABLE t (x)")
+    conn.commit()
+    conn.execute("INSERT INTO t VALUES (1)")
+    conn.close()
+
+    conn = pool.acquire()
+    assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 0
+    conn.close()
+
+
+def test_closed_pool_refuses_connections(pool):
+    pool.close()
+    with pytest.raises(sqlite3.ProgrammingError):
+        pool.acquire()
@@ -0,0 +1,87 @@
+from contextlib import ExitStack
+
+import pytest
+
+tk = pytest.importorskip("tkinter")
+
+import gui_benchmark  # noqa: E402  (after the tkinter check)
+import main  # noqa: E402
+from gui_benchmark import SilentMessagebox, StallMonitor, VirtualDisplay  # noqa: E402
+
+
+class FakeRoot:
+    """Records root.after callbacks instead of running an event loop"""
+
+    def __init__(self):
+        self.scheduled = []
+
+    def after(self, ms, callback):
+        self.scheduled.append(callback)
+        return len(self.scheduled)
+
+    def after_cancel(self, after_id):
+        self.scheduled[after_id - 1] = None
+
+
+def test_silent_messagebox_records_dialogs():
+    box = SilentMessagebox()
+    assert box.askyesno("Delete", "Delete student 1?")
+    box.showerror("Error", "Invalid marks")
+    assert box.shown == [("yesno", "Delete", "Delete student 1?"), ("error", "Error", "Invalid marks")]
+
+
+def test_stall_monitor_reports_late_ticks(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(gui_benchmark.time, "perf_counter", lambda: now[0])
+    root = FakeRoot()
+    monitor = StallMonitor(root, interval_ms=5)
+    monitor.start()
+
+    now[0] = 0.005
+    root.scheduled[-1]()
+    assert monitor.max_stall == pytest.approx(0.0)
+
+    # The next tick arrives 100 ms late
+    now[0] = 0.110
+    root.scheduled[-1]()
+    assert monitor.max_stall == pytest.approx(0.1)
+
+    monitor.stop()
+    assert root.scheduled[-1] is None
+
+
+def test_virtual_display_needs_xvfb_without_a_display(monkeypatch, tmp_path):
+    monkeypatch.delenv("DISPLAY", raising=False)
+    monkeypatch.setenv("PATH", str(tmp_path))
+    with pytest.raises(RuntimeError, match="Xvfb is not installed"):
+        with VirtualDisplay():
+            pass
+
+
+def test_virtual_display_keeps_an_existing_display(monkeypatch):
+    monkeypatch.setenv("DISPLAY", ":42")
+    with VirtualDisplay() as display:
+        assert display.process is None
+
+
+@pytest.fixture
+def display():
+    """A usable display: the current one, or Xvfb; skips the test otherwise"""
+    with ExitStack() as stack:
+        try:
+            stack.enter_context(VirtualDisplay())
+            tk.Tk().destroy()
+        except (RuntimeError, tk.TclError) as e:
+            pytest.skip(f"no display available: {e}")
+        yield
+
+
+def test_small_dashboard_run(display, monkeypatch, tmp_path):
+    # benchmark_size swaps in a SilentMessagebox; put the real one back after
+    monkeypatch.setattr(main, "messagebox", main.messagebox)
+    run = gui_benchmark.benchmark_size(200, repeat=2, directory=str(tmp_path))
+    assert run["students"] == 200
+    assert set(run["operations"]) == {"load_all_students", "get_cursor", "search_student",
+                                      "show_topper"}
+    assert all(stats["calls"] == 2 for stats in run["operations"].values())
+    assert "200 students" in gui_benchmark.format_run(run)
@@ -0,0 +1,99 @@
+import pytest
+
+from instrumentation import (CallRecord, Instrumentation, MemorySink, PrometheusSink,
+                             configure_from_env, count_rows, instrumentation)
+
+
+@pytest.fixture
+def sink():
+    """A MemorySink on the shared registry, removed after the test"""
+    sink = instrumentation.add_sink(MemorySink())
+    yield sink
+    instrumentation.remove_sink(sink)
+
+
+def test_count_rows():
+    assert count_rows([(1,), (2,)]) == 2
+    assert count_rows((True, "ok")) == 1
+    assert count_rows((False, "duplicate")) == 0
+    assert count_rows((1, "Asha", 80.0, "A")) == 1
+    assert count_rows({"inserted": 3, "updated": 2}) == 5
+    assert count_rows(None) == 0
+    assert count_rows(42.5) is None
+
+
+def test_inactive_registry_records_nothing():
+    registry = Instrumentation()
+    assert not registry.active
+    assert registry.call("noop", lambda: 7, (), {}) == 7
+
+    sink = registry.add_sink(MemorySink())
+    assert registry.active
+    registry.remove_sink(sink)
+    assert not registry.active
+
+
+def test_calls_errors_and_generators_are_recorded():
+    registry = Instrumentation()
+    sink = registry.add_sink(MemorySink())
+
+    registry.call("rows", lambda: [1, 2, 3], (), {})
+    with pytest.raises(KeyError):
+        registry.call("fails", lambda: {}["missing"], (), {})
+    assert list(registry.call("stream", lambda: (batch for batch in ([1, 2], [3])), (), {})) == [[1, 2], [3]]
+
+    metrics = sink.snapshot()
+    assert (metrics["rows"]["calls"], metrics["rows"]["rows"]) == (1, 3)
+    assert metrics["fails"]["errors"] == 1
+    assert metrics["stream"]["rows"] == 3
+    assert metrics["rows"]["buckets"]["+Inf"] == 1
+
+
+def test_histogram_buckets_are_cumulative():
+    sink = MemorySink(buckets=(0.01, 0.1))
+    for elapsed in (0.005, 0.05, 0.5):
+        sink.record(CallRecord("call", elapsed, None, None))
+    assert sink.snapshot()["call"]["buckets"] == {0.01: 1, 0.1: 2, "+Inf": 3}
+
+
+def test_prometheus_file_is_written(tmp_path):
+    path = tmp_path / "metrics.prom"
+    sink = PrometheusSink(str(path), buckets=(0.1,))
+    sink.record(CallRecord('db."quoted"', 0.05, 2, None))
+    sink.flush()
+    text = path.read_text()
+    assert 'sms_call_duration_seconds_bucket{name="db.\\"quoted\\"",le="0.1"} 1' in text
+    assert 'sms_call_rows_total{name="db.\\"quoted\\""} 2' in text
+
+
+def test_database_methods_are_instrumented(db, sink):
+    db.add_student(1, "Asha", 80)
+    db.search_student(1)
+    db.get_all_students()
+
+    metrics = sink.snapshot()
+    assert metrics["db.add_student"]["calls"] == 1
+    assert metrics["db.search_student"]["rows"] == 1
+    assert "db.calculate_grade" not in metrics
+
+
+def test_profiling_collects_stats(db):
+    instrumentation.start_profiling()
+    try:
+        db.get_student_count()
+    finally:
+        stats = instrumentation.stop_profiling()
+    if stats is not None:
+        # None when another profiler (e.g. coverage) owns the interpreter
+        assert any("get_student_count" in function[2] for function in stats.stats)
+
+
+def test_configure_from_env(tmp_path):
+    sinks = configure_from_env({"SMS_METRICS": f"memory, prometheus={tmp_path / 'm.prom'}"})
+    try:
+        assert [type(sink) for sink in sinks] == [MemorySink, PrometheusSink]
+    finally:
+        for sink in sinks:
+            instrumentation.remove_sink(sink)
+    with pytest.raises(ValueError):
+        configure_from_env({"SMS_METRICS": "statsd"})
@@ -0,0 +1,185 @@
+import sqlite3
+import threading
+
+import pytest
+
+from auth import is_hashed
+from database import MIGRATIONS, SCHEMA_VERSION, Database, fts_support
+from migrations import PROGRESS_TABLE, MigrationError, Migrator
+
+from conftest import FAST_HASH_POLICY
+
+
+def make_old_database(path, students=2500):
+    """A students.db as written before versioned migrations: two tables, plaintext admin"""
+    conn = sqlite3.connect(path)
+    conn.execute("""
+        CREATE TABLE students (
+            roll_no INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            marks REAL NOT NULL,
+            grade TEXT NOT NULL
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE admin (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT UNIQUE NOT NULL,
+            password TEXT NOT NULL
+        )
+    """)
+    conn.execute("INSERT INTO admin (username, password) VALUES ('admin', 'secret')")
+    conn.executemany(
+        "INSERT INTO students VALUES (?, ?, ?, 'A')",
+        [(roll_no, f"Student{roll_no} Moreau", roll_no % 97) for roll_no in range(1, students + 1)]
+    )
+    conn.commit()
+    conn.close()
+
+
+def migrator(path, **kwargs):
+    return Migrator(lambda: sqlite3.connect(path, timeout=30), MIGRATIONS, **kwargs)
+
+
+def expected_stats(path):
+    conn = sqlite3.connect(path)
+    row = conn.execute(
+        "SELECT COUNT(*), SUM(marks), MIN(marks), MAX(marks), "
+        "(SELECT MIN(roll_no) FROM students WHERE marks = (SELECT MAX(marks) FROM students)) "
+        "FROM students"
+    ).fetchone()
+    conn.close()
+    return row
+
+
+def stored_stats(path):
+    conn = sqlite3.connect(path)
+    row = conn.execute(
+        "SELECT student_count, marks_total, min_marks, max_marks, topper_roll_no "
+        "FROM student_stats"
+    ).fetchone()
+    conn.close()
+    return row
+
+
+def fill_step():
+    return next(step for step in MIGRATIONS[0].steps if step.description == "fill student_stats")
+
+
+def test_fresh_database_is_created_at_the_latest_version(db):
+    assert db.get_schema_version() == SCHEMA_VERSION
+    assert db.get_student_count() == 0
+    assert db.verify_login("admin", "1234")
+
+
+def test_old_database_is_upgraded_in_chunks(db_path):
+    make_old_database(db_path)
+    events = []
+
+    timings = migrator(db_path, chunk_size=1000, progress=events.append).migrate()
+
+    assert timings[-1]["version"] == SCHEMA_VERSION
+    assert stored_stats(db_path) == expected_stats(db_path)
+    fill = [event for event in events
+            if event["description"] == "fill student_stats" and not event.get("finished")]
+    assert [event["rows_done"] for event in fill] == [0, 1000, 2000, 2500]
+    assert all(event["rows_total"] == 2500 for event in fill)
+
+    database = Database(db_path, password_policy=FAST_HASH_POLICY)
+    try:
+        assert database.get_student_count() == 2500
+        assert database.verify_login("admin", "secret")
+        if fts_support()[0]:
+            assert [row[0] for row in database.search_by_name("student12 ")][:1] == [12]
+        # Writes are accepted again once the upgrade is done
+        assert database.add_student(9999, "New Student", 75)[0]
+    finally:
+        database.close()
+
+
+def test_default_admin_password_is_hashed(db_path):
+    make_old_database(db_path, students=0)
+    migrator(db_path).migrate()
+    conn = sqlite3.connect(db_path)
+    password = conn.execute("SELECT password FROM admin WHERE username = 'admin'").fetchone()[0]
+    conn.close()
+    assert is_hashed(password)
+
+
+def test_interrupted_upgrade_resumes_after_the_last_chunk(db_path, monkeypatch):
+    make_old_database(db_path)
+    step = fill_step()
+    original = step.apply
+    calls = []
+
+    def fail_on_second_chunk(conn, rows):
+        calls.append(rows[0][0])
+        if len(calls) == 2:
+            raise RuntimeError("power cut")
+        original(conn, rows)
+
+    monkeypatch.setattr(step, "apply", fail_on_second_chunk)
+    with pytest.raises(MigrationError, match="power cut"):
+        migrator(db_path, chunk_size=1000).migrate()
+
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == 0
+    assert conn.execute(
+        f"SELECT last_key, rows_done FROM {PROGRESS_TABLE} WHERE done = 0"
+    ).fetchone() == (1000, 1000)
+    # Other programs may not change students while the fill is unfinished
+    with pytest.raises(sqlite3.IntegrityError, match="being upgraded"):
+        conn.execute("INSERT INTO students VALUES (9999, 'Late', 50, 'C')")
+    conn.close()
+
+    monkeypatch.setattr(step, "apply", original)
+    migrator(db_path, chunk_size=1000).migrate()
+
+    assert stored_stats(db_path) == expected_stats(db_path)
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+    assert conn.execute(f"SELECT COUNT(*) FROM {PROGRESS_TABLE}").fetchone()[0] == 0
+    conn.close()
+
+
+def test_concurrent_upgrades_fill_each_row_once(db_path):
+    make_old_database(db_path, students=5000)
+    errors = []
+
+    def upgrade():
+        try:
+            migrator(db_path, chunk_size=250, pause=0.001).migrate()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=upgrade) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert stored_stats(db_path) == expected_stats(db_path)
+    if fts_support()[0]:
+        conn = sqlite3.connect(db_path)
+        assert conn.execute(
+            "SELECT COUNT(*) FROM students_fts WHERE students_fts MATCH 'moreau'"
+        ).fetchone()[0] == 5000
+        conn.execute("INSERT INTO students_fts (students_fts) VALUES ('integrity-check')")
+        conn.rollback()
+        conn.close()
+
+
+def test_dry_run_leaves_the_file_alone(db_path):
+    make_old_database(db_path, students=100)
+    timings = migrator(db_path).dry_run(db_path)
+    assert timings[-1]["version"] == SCHEMA_VERSION
+    assert migrator(db_path).current_version() == 0
+
+
+def test_newer_schema_is_refused(db_path):
+    conn = sqlite3.connect(db_path)
+    conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION + 1}")
+    conn.close()
+    with pytest.raises(MigrationError, match="newer"):
+        migrator(db_path).migrate()
@@ -0,0 +1,105 @@
+import threading
+
+import pytest
+
+from auth import MANAGE_USERS, WRITE, AuthenticationError, PermissionDenied
+from database import Database
+
+from conftest import FAST_HASH_POLICY
+
+
+@pytest.fixture
+def admin(db):
+    return db.login("admin", "1234")
+
+
+@pytest.fixture
+def users(db, admin):
+    """Log in as each role, after creating a viewer and an editor"""
+    with db.bound_session(admin):
+        assert db.create_user("viewer1", "viewer-pass", "viewer")[0]
+        assert db.create_user("editor1", "editor-pass", "editor")[0]
+    return {
+        "admin": admin,
+        "viewer": db.login("viewer1", "viewer-pass"),
+        "editor": db.login("editor1", "editor-pass"),
+    }
+
+
+def test_viewer_cannot_change_students(db, users):
+    db.add_student(1, "Asha", 80)
+    with db.bound_session(users["viewer"]):
+        for call in (lambda: db.add_student(2, "Ravi", 70),
+                     lambda: db.update_student(1, "Asha", 90),
+                     lambda: db.delete_student(1)):
+            with pytest.raises(PermissionDenied) as error:
+                call()
+            assert error.value.permission == WRITE
+        # Reading is allowed
+        assert db.search_student(1)[1] == "Asha"
+    assert db.search_student(1)[2] == 80
+    assert db.search_student(2) is None
+
+
+def test_editor_changes_students_but_not_users(db, users):
+    with db.bound_session(users["editor"]):
+        assert db.add_student(2, "Ravi", 70)[0]
+        with pytest.raises(PermissionDenied) as error:
+            db.create_user("intruder", "intruder-pass", "admin")
+        assert error.value.permission == MANAGE_USERS
+
+
+def test_user_management_needs_an_admin_session(db_path, db):
+    with pytest.raises(PermissionDenied, match="log in"):
+        db.list_users()
+
+    trusted = Database(db_path, password_policy=FAST_HASH_POLICY, trusted=True)
+    try:
+        assert ("admin", "admin", False) in trusted.list_users()
+    finally:
+        trusted.close()
+
+
+def test_role_change_applies_to_live_sessions(db, users):
+    viewer = users["viewer"]
+    with db.bound_session(users["admin"]):
+        assert db.set_user_role("viewer1", "editor")[0]
+    with db.bound_session(viewer):
+        assert db.add_student(3, "Meera", 65)[0]
+
+
+def test_disabling_a_user_ends_their_sessions(db, users):
+    editor = users["editor"]
+    with db.bound_session(users["admin"]):
+        assert db.set_user_disabled("editor1")[0]
+    assert not editor.active
+    with db.bound_session(editor):
+        with pytest.raises(PermissionDenied, match="ended"):
+            db.add_student(4, "Kiran", 55)
+    with pytest.raises(AuthenticationError, match="disabled"):
+        db.login("editor1", "editor-pass")
+
+
+def test_last_admin_cannot_be_demoted(db, admin):
+    with db.bound_session(admin):
+        ok, _ = db.set_user_role("admin", "viewer")
+    assert not ok
+
+
+def test_sessions_are_bound_per_thread(db, users):
+    db.use_session(users["viewer"])
+    results = {}
+
+    def write_as_editor():
+        db.use_session(users["editor"])
+        results["editor"] = db.add_student(5, "Dev", 60)[0]
+
+    thread = threading.Thread(target=write_as_editor)
+    thread.start()
+    thread.join()
+
+    assert results["editor"]
+    assert db.session is users["viewer"]
+    with pytest.raises(PermissionDenied):
+        db.add_student(6, "Isha", 61)
+    db.use_session(None)
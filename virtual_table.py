@@ -0,0 +1,262 @@
+"""
+Virtual Table Module for Student Management System
+Virtual scrolling for ttk.Treeview: only the rows on screen exist as Tk items
+"""
+
+import tkinter as tk
+from typing import Callable, List, Optional, Sequence, Tuple
+
+
+class VirtualTable:
+    """
+    Drives a ttk.Treeview and its vertical scrollbar in virtual mode
+
+    The Treeview only ever holds as many items as fit on screen. Rows come
+    from a data source (count + fetch(offset, limit) callables) and are
+    fetched on demand as the scrollbar moves; a window of buffer_rows
+    before and after the visible rows is kept in memory so small scrolls
+    don't hit the database. Items are reused, so scrolling only updates
+    their values and zebra tags.
+
+    submit(func, *args, on_success=callback) runs a data source call in the
+    background and delivers its result on the Tk thread (DBExecutor.submit);
+    without it, count and fetch run inline. on_render is called after rows
+    are drawn.
+    """
+
+    def __init__(self, tree, scrollbar, row_height: int = 30, buffer_rows: int = 50,
+                 submit: Optional[Callable] = None,
+                 on_render: Optional[Callable[[], None]] = None):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.row_height = row_height
+        self.buffer_rows = buffer_rows
+        self.submit = submit
+        self.on_render = on_render
+
+        self.active = False
+        self.total = 0
+        self.offset = 0
+        self.visible_rows = max(1, int(tree.cget("height")))
+
+        self._count: Callable[[], int] = lambda: 0
+        self._fetch: Callable[[int, int], List[Tuple]] = lambda offset, limit: []
+        self._items: List[str] = []
+        self._bindings: List[Tuple[str, str]] = []
+        # The Treeview's own yscrollcommand, restored by detach()
+        self._yscrollcommand = ""
+        self._cache_start = 0
+        self._cache: List[Tuple] = []
+        # True when the cached window reaches the end of the source
+        self._cache_at_end = False
+        # Bumped when the source changes, so late results are ignored
+        self._generation = 0
+
+    # ==================== MODE SWITCHING ====================
+
+    def attach(self, count: Callable[[], int], fetch: Callable[[int, int], List[Tuple]],
+               total: Optional[int] = None):
+        """
+        Switch the Treeview to virtual mode backed by the given data source
+        total, if the caller already counted the rows, skips the count call
+        """
+        self._count = count
+        self._fetch = fetch
+
+        if not self.active:
+            self.active = True
+            self.tree.delete(*self.tree.get_children())
+            self._items = []
+            self._yscrollcommand = self.tree.cget("yscrollcommand")
+            self.tree.configure(yscrollcommand="")
+            self.scrollbar.config(command=self.yview)
+            self._bindings = [
+                (sequence, self.tree.bind(sequence, handler, add="+"))
+                for sequence, handler in (
+                    ("<MouseWheel>", self._on_mousewheel),
+                    ("<Button-4>", self._on_mousewheel),
+                    ("<Button-5>", self._on_mousewheel),
+                    ("<Configure>", self._on_configure),
+                    ("<Up>", self._on_arrow),
+                    ("<Down>", self._on_arrow),
+                    ("<Prior>", self._on_page),
+                    ("<Next>", self._on_page),
+                )
+            ]
+
+        # Size the window from the widget if it is already on screen
+        height = self.tree.winfo_height()
+        if height > self.row_height:
+            self.visible_rows = max(1, (height - self.row_height) // self.row_height)
+
+        self.offset = 0
+        self.refresh(total)
+
+    def show_rows(self, rows: Sequence[Tuple]):
+        """Show a fixed list of rows in virtual mode"""
+        rows = list(rows)
+        self.attach(lambda: len(rows), lambda offset, limit: rows[offset:offset + limit])
+
+    def detach(self):
+        """Return the Treeview to normal mode (the caller repopulates it)"""
+        if not self.active:
+            return
+        self.active = False
+        for sequence, funcid in self._bindings:
+            self.tree.unbind(sequence, funcid)
+        self._bindings = []
+        self.tree.delete(*self.tree.get_children())
+        self._items = []
+        self._cache = []
+        self.tree.configure(yscrollcommand=self._yscrollcommand or self.scrollbar.set)
+        self.scrollbar.config(command=self.tree.yview)
+
+    # ==================== DATA ====================
+
+    def refresh(self, total: Optional[int] = None):
+        """Drop cached rows, re-count the source and redraw the visible window"""
+        self._generation += 1
+        self._cache = []
+        self._cache_at_end = False
+        if total is not None:
+            self._set_total(total)
+        else:
+            self._call(self._count, on_done=self._set_total)
+
+    def _set_total(self, total: int):
+        self.total = total
+        self._render()
+
+    def _call(self, func: Callable, *args, on_done: Callable):
+        """Run a data source call through submit (or inline) and pass its result to on_done"""
+        generation = self._generation
+
+        def deliver(result):
+            # Results for a source that was replaced or refreshed meanwhile are stale
+            if self.active and generation == self._generation:
+                on_done(result)
+
+        if self.submit is None:
+            deliver(func(*args))
+        else:
+            self.submit(func, *args, on_success=deliver)
+
+    def _rows(self, offset: int, limit: int) -> Optional[List[Tuple]]:
+        """Rows [offset, offset + limit) from the cache, or None on a miss"""
+        cache_end = self._cache_start + len(self._cache)
+        end = min(offset + limit, self.total)
+        if self._cache_start <= offset and (end <= cache_end or self._cache_at_end):
+            start = offset - self._cache_start
+            return self._cache[start:start + limit]
+        return None
+
+    def _load(self, offset: int):
+        """Fetch the window around offset, then render again"""
+        start = max(0, offset - self.buffer_rows)
+        limit = self.visible_rows + 2 * self.buffer_rows
+
+        def on_rows(rows):
+            self._cache_start = start
+            self._cache = list(rows)
+            self._cache_at_end = len(self._cache) < limit
+            self._render()
+
+        self._call(self._fetch, start, limit, on_done=on_rows)
+
+    # ==================== RENDERING ====================
+
+    def _render(self):
+        """Sync the Treeview items with the rows at the current offset"""
+        self.offset = max(0, min(self.offset, self.total - self.visible_rows))
+        rows = self._rows(self.offset, self.visible_rows) if self.total else []
+        if rows is None:
+            # Keep the old rows on screen until the new window arrives
+            self._update_scrollbar()
+            self._load(self.offset)
+            return
+
+        # Grow or shrink the pool of Tk items to match the visible rows
+        while len(self._items) < len(rows):
+            self._items.append(self.tree.insert('', tk.END))
+        if len(self._items) > len(rows):
+            self.tree.delete(*self._items[len(rows):])
+            del self._items[len(rows):]
+
+        for i, (item, row) in enumerate(zip(self._items, rows)):
+            tag = 'evenrow' if (self.offset + i) % 2 == 0 else 'oddrow'
+            self.tree.item(item, values=row, tags=(tag,))
+
+        self._update_scrollbar()
+        if self.on_render is not None:
+            self.on_render()
+
+    def _update_scrollbar(self):
+        if self.total <= 0:
+            self.scrollbar.set(0.0, 1.0)
+            return
+        first = self.offset / self.total
+        last = min(1.0, (self.offset + self.visible_rows) / self.total)
+        self.scrollbar.set(first, last)
+
+    def scroll_to(self, offset: int):
+        """Make the row at offset the first visible row"""
+        previous = self.offset
+        self.offset = offset
+        self._render()
+        if self.offset != previous:
+            # Selection is positional, so it would now point at another row
+            selection = self.tree.selection()
+            if selection:
+                self.tree.selection_remove(*selection)
+
+    # ==================== EVENTS ====================
+
+    def yview(self, *args):
+        """Scrollbar command: handles 'moveto fraction' and 'scroll n units|pages'"""
+        if not args:
+            return
+        if args[0] == "moveto":
+            self.scroll_to(int(float(args[1]) * self.total))
+        elif args[0] == "scroll":
+            step = int(args[1])
+            if args[2] == "pages":
+                step *= max(1, self.visible_rows - 1)
+            self.scroll_to(self.offset + step)
+
+    def _on_mousewheel(self, event):
+        if event.num == 4:
+            step = -3
+        elif event.num == 5:
+            step = 3
+        else:
+            step = -3 if event.delta > 0 else 3
+        self.scroll_to(self.offset + step)
+        return "break"
+
+    def _on_arrow(self, event):
+        # Scroll when moving past the first or last visible row
+        focus = self.tree.focus()
+        if not self._items or focus not in self._items:
+            return None
+        if event.keysym == "Up" and focus == self._items[0] and self.offset > 0:
+            self.scroll_to(self.offset - 1)
+        elif event.keysym == "Down" and focus == self._items[-1]:
+            self.scroll_to(self.offset + 1)
+        else:
+            return None
+        # Keep the edge row selected as its contents move
+        self.tree.selection_set(focus)
+        self.tree.focus(focus)
+        return "break"
+
+    def _on_page(self, event):
+        step = max(1, self.visible_rows - 1)
+        self.scroll_to(self.offset + (-step if event.keysym == "Prior" else step))
+        return "break"
+
+    def _on_configure(self, event):
+        # The heading takes roughly one row height
+        rows = max(1, (event.height - self.row_height) // self.row_height)
+        if rows != self.visible_rows:
+            self.visible_rows = rows
+            self._render()